@@ -1,19 +1,25 @@
 import pandas as pd
 from shiny import App, ui, render, reactive
 import os
-from loadjson import extract_orgs_from_json
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from reference_snapshot import load_reference_data
+from loadjson import OrgRegistry
+from instrumentation import telemetry
 import url_general_adapter as urlscrapper
+from retrieval_service import RetrievalService
 
 filename = "C:/Users/KrisJ/Desktop/SWA_CODE/options.xlsx"
+json_dir = "C:/Users/KrisJ/Desktop/SWA_CODE/AUSTRALIA ANZSIC"
 
-xls = pd.ExcelFile(filename)
+# Options and organisations come from a compiled snapshot, rebuilt only when the sources change
+with telemetry.stage("load_reference_data"):
+    reference_data = load_reference_data(filename, json_dir)
 
 def get_options(sheet_name):
-    df = pd.read_excel(xls, sheet_name=sheet_name)
-    df.columns = df.columns.str.strip()
-    df["Value"] = df["Value"].astype(str)
-    df["Label"] = df["Label"].astype(str)
-    return dict(zip(df["Value"], df["Label"])), dict(zip(df["Value"], df["Value"]))
+    pairs = reference_data["options"][sheet_name]
+    return {v: l for v, l in pairs}, {v: v for v, _ in pairs}
 
 country_labels, country_values = get_options("Geolocation")
 industry_labels, industry_values = get_options("Industry")
@@ -22,8 +28,75 @@ year_labels, year_values = get_options("Year")
 doc_labels, doc_values = get_options("Document Type")
 freq_labels, freq_values = get_options("Frequency")
 
-json_dir = "C:/Users/KrisJ/Desktop/SWA_CODE/AUSTRALIA ANZSIC"
-org_data = extract_orgs_from_json(json_dir)
+org_registry = OrgRegistry(reference_data["orgs"])
+
+# Model, corpus and embeddings are loaded in the background on first request and kept warm for evidence lookups
+retrieval_service = RetrievalService()
+
+# URL discovery runs off the Shiny event loop so the session stays responsive; one run at a time,
+# since every run merges into the same generated_urls.csv and shares the search quota
+discovery_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="url-discovery")
+
+
+class DiscoveryJob:
+    # Progress and partial results of one session's background generate_urls run
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.future = None
+        self.cancel_event = threading.Event()
+        self.done = 0
+        self.total = 0
+        self.rows = []
+        self.status = ""
+
+    @property
+    def running(self):
+        return self.future is not None and not self.future.done()
+
+    def start(self, user_inputs, matched_orgs):
+        with self._lock:
+            self.cancel_event = threading.Event()
+            self.done = 0
+            self.total = len(matched_orgs) if user_inputs.get("doc_labels") else 0
+            self.rows = []
+            self.status = "Running"
+        self.future = discovery_executor.submit(
+            urlscrapper.generate_urls, user_inputs, matched_orgs,
+            progress=self.on_progress, cancel_event=self.cancel_event)
+        self.future.add_done_callback(self.on_finished)
+
+    def cancel(self):
+        if self.running:
+            self.cancel_event.set()
+            with self._lock:
+                self.status = "Cancelling"
+
+    def on_progress(self, done, total, org_name, new_rows):
+        with self._lock:
+            self.done = done
+            self.total = total
+            self.rows.extend(new_rows)
+
+    def on_finished(self, future):
+        with self._lock:
+            if future.exception() is not None:
+                self.status = f"Failed: {future.exception()}"
+            elif self.cancel_event.is_set():
+                self.status = "Cancelled"
+            else:
+                self.status = "Finished"
+            telemetry.event("discovery_job", status=self.status, orgs_done=self.done, orgs=self.total,
+                            urls=len(self.rows))
+
+    def snapshot(self):
+        with self._lock:
+            return {
+                "done": self.done,
+                "total": self.total,
+                "status": self.status,
+                "rows": list(self.rows),
+            }
+
 
 def make_multiselect_with_placeholder(id, label, choices, placeholder):
     return ui.input_selectize(id, label, choices=choices, multiple=True, options={"placeholder": placeholder})
@@ -54,6 +127,27 @@ app_ui = ui.page_sidebar(
         )
     ),
 
+    ui.card(
+        ui.tags.h3("\U0001F50E URL Discovery", style="color: #2c3e50;"),
+        ui.output_ui("discovery_progress"),
+        ui.input_action_button("cancel", "\u23F9 Cancel", class_="btn btn-outline-danger btn-sm mt-2", style="width: 120px;"),
+        ui.output_data_frame("discovery_results"),
+        class_="p-3"
+    ),
+
+    ui.card(
+        ui.tags.h3("\U0001F4D1 Evidence Lookup", style="color: #2c3e50;"),
+        ui.output_ui("lookup_org"),
+        ui.input_action_button("load_index", "\u23F3 Load evidence index", class_="btn btn-outline-secondary btn-sm mb-2",
+                               style="width: 200px;"),
+        ui.input_text_area("lookup_question", "SDG question", rows=2, width="100%",
+                           placeholder="e.g. What is your organization's recycling rate?"),
+        ui.input_action_button("lookup", "\U0001F50D Find evidence", class_="btn btn-primary btn-sm", style="width: 160px;"),
+        ui.output_text("lookup_status"),
+        ui.output_data_frame("lookup_results"),
+        class_="p-3"
+    ),
+
     ui.tags.footer(
         ui.tags.hr(),
         ui.tags.p("\U0001F30E Sustainable World Alliance • Powered by RNB Media", style="text-align:center; font-size: 0.9em; color: #666;")
@@ -91,19 +185,25 @@ def server(input, output, session):
             return ""
 
         selected_divisions = input.industry()
-        matched_orgs = [f"• {org['organisation_name']}" for org in org_data if org.get("division") in selected_divisions]
+        matched_orgs = [f"• {org.organisation_name}" for org in org_registry.by_division(selected_divisions)]
 
         if not matched_orgs:
             return "No matching organizations found."
 
         return "\n".join(matched_orgs)
 
+    job = DiscoveryJob()
+
     @reactive.effect
+    @reactive.event(input.submit)
     def _():
         if input.submit():
             submit_clicked.set(True)
             if missing_fields():
                 return
+            if job.running:
+                ui.notification_show("URL discovery is already running for this session.", type="warning")
+                return
 
             user_inputs = {
                 "country": input.country(),
@@ -112,12 +212,99 @@ def server(input, output, session):
                 "sdg_labels": [sdg_labels.get(s, s) for s in input.sdg()],
                 "year": input.year(),
                 "doc_type_raw": input.document_type(),
-                "doc_labels": [doc_labels.get(d, d) for d in input.document_type()]
+                "doc_labels": [doc_labels.get(d, d) for d in input.document_type()],
+                "Frequency": input.Frequency()
             }
-            print("DEBUG sdg_labels from UI =", user_inputs["sdg_labels"])
             selected_divisions = input.industry()
-            matched_orgs = [org for org in org_data if org.get("division") in selected_divisions]
-            urlscrapper.generate_urls(user_inputs, matched_orgs)
+            matched_orgs = org_registry.orgs_for_divisions(selected_divisions)
+            telemetry.event("ui_submit", divisions=list(selected_divisions), orgs=len(matched_orgs),
+                            sdg_labels=user_inputs["sdg_labels"], doc_labels=user_inputs["doc_labels"])
+            job.start(user_inputs, matched_orgs)
+
+    @reactive.effect
+    @reactive.event(input.cancel)
+    def _():
+        job.cancel()
+
+    @output
+    @render.ui
+    def discovery_progress():
+        input.submit()
+        state = job.snapshot()
+        if job.running:
+            reactive.invalidate_later(0.5)
+        if not state["status"]:
+            return ui.tags.p("Submit to start URL discovery.", style="color: #666;")
+        percent = int(100 * state["done"] / state["total"]) if state["total"] else 100
+        return ui.tags.div(
+            ui.tags.div(
+                ui.tags.div(f"{percent}%", class_="progress-bar bg-success", role="progressbar",
+                            style=f"width: {percent}%;"),
+                class_="progress", style="height: 20px;"
+            ),
+            ui.tags.p(
+                f"{state['status']} • {state['done']}/{state['total']} organizations searched • "
+                f"{len(state['rows'])} URLs found",
+                style="margin-top: 6px;"
+            )
+        )
+
+    @output
+    @render.data_frame
+    def discovery_results():
+        input.submit()
+        if job.running:
+            reactive.invalidate_later(1)
+        return pd.DataFrame(job.snapshot()["rows"])
+
+    lookup_result = reactive.value(None)
+
+    @output
+    @render.ui
+    def lookup_org():
+        input.load_index()
+        if not retrieval_service.ready:
+            if retrieval_service.loading:
+                reactive.invalidate_later(2)
+            return ui.tags.p(f"Evidence index: {retrieval_service.status}", style="color: #666;")
+        return ui.input_selectize("lookup_org_name", "Organization", choices=retrieval_service.orgs())
+
+    @reactive.effect
+    @reactive.event(input.load_index)
+    def _():
+        # Starts the load, or retries it after a failure; a no-op while loading or once ready
+        retrieval_service.start()
+
+    @reactive.effect
+    @reactive.event(input.lookup)
+    def _():
+        if not retrieval_service.ready:
+            ui.notification_show("Load the evidence index first.", type="warning")
+            return
+        org, question = input.lookup_org_name(), input.lookup_question().strip()
+        if not org or not question:
+            ui.notification_show("Pick an organization and enter a question.", type="warning")
+            return
+        start = time.perf_counter()
+        hits, cached = retrieval_service.query(org, question)
+        lookup_result.set((hits, cached, time.perf_counter() - start))
+
+    @output
+    @render.text
+    def lookup_status():
+        if lookup_result() is None:
+            return ""
+        hits, cached, elapsed = lookup_result()
+        return f"{len(hits)} sentences in {elapsed * 1000:.0f} ms{' (cached)' if cached else ''}"
+
+    @output
+    @render.data_frame
+    def lookup_results():
+        if lookup_result() is None:
+            return pd.DataFrame()
+        hits = lookup_result()[0]
+        return pd.DataFrame([{"Score": h["score"], "Sentence": h["sentence"], "Page": h["page"],
+                              "URL": " | ".join(h["urls"]), "Document Type": h["document_type"]} for h in hits])
 
     @reactive.calc
     def missing_fields():
@@ -1,72 +1,122 @@
 import pandas as pd
-import re
+import glob
+import hashlib
+import json
 import os
 
-# Load URL datasets and SDG Questions
-df_q = pd.read_csv("C:/Users/KrisJ/Desktop/SWA_CODE/Division URL/generated_urls_Q.csv")
-df_b = pd.read_csv("C:/Users/KrisJ/Desktop/SWA_CODE/Division URL/generated_urls_B.csv")
-df_c = pd.read_csv("C:/Users/KrisJ/Desktop/SWA_CODE/Division URL/generated_urls_C.csv")
-df_d = pd.read_csv("C:/Users/KrisJ/Desktop/SWA_CODE/Division URL/generated_urls_D.csv")
-df_j = pd.read_csv("C:/Users/KrisJ/Desktop/SWA_CODE/Division URL/generated_urls_J.csv")
-urls_df = pd.concat([df_b, df_c, df_d, df_j, df_q], ignore_index=True)
-sdg_questions_df = pd.read_csv("C:/Users/KrisJ/Desktop/Python/SDGs&Questions.csv")
+# Division URL files are discovered by glob, so new divisions need no code change
+division_url_dir = "C:/Users/KrisJ/Desktop/SWA_CODE/Division URL"
+sdg_questions_path = "C:/Users/KrisJ/Desktop/Python/SDGs&Questions.csv"
 output_path = os.path.dirname(os.path.abspath(__file__))
 
-# Extract numeric SDG IDs from the "SDG_Goals" column
-def extract_sdg_ids(text):
-    return re.findall(r"Goal (\d+)", text)
-
-urls_df["SDG_Goal_IDs"] = urls_df["SDG_Goals"].apply(extract_sdg_ids)
-urls_exploded = urls_df.explode("SDG_Goal_IDs").copy()
-urls_exploded["SDG_Goal_IDs"] = urls_exploded["SDG_Goal_IDs"].astype(str)
-
-# Extract Goal number for merging
-sdg_questions_df["Goal_Number"] = sdg_questions_df["SDG Goal"].str.extract(r"Goal (\d+)")
-
-# Merge on SDG Goal number
-merged_df = urls_exploded.merge(
-    sdg_questions_df,
-    left_on="SDG_Goal_IDs",
-    right_on="Goal_Number",
-    how="left"
-)
-
-# Final column selection
-final_df = merged_df[[
-    "Organization",
-    "Country",
-    "Industry",
-    "SDG Goal",
-    "Question",
-    "Possible Answers",
-    "SDGID",
-    "QuestionID"
-]].rename(columns={
-    "Question": "SDG Question",
-    "Possible Answers": "Answer Options",
-    "SDGID": "SDG Goal ID",
-    "QuestionID": "SDG Ques ID"
-})
-
-# Combine industries for same organization & question
-final_df = final_df.groupby(["Organization", "Country", "SDG Goal", "SDG Question", "Answer Options", "SDG Goal ID", "SDG Ques ID"], as_index=False).agg({
-    "Industry": lambda x: " | ".join(sorted(set(x)))
-})
-deduplicated_df = final_df.drop_duplicates(subset=["Organization", "SDG Ques ID"]).copy()
+# Per-division intermediate results, reused while the division file is unchanged
+state_dir = os.path.join(output_path, "cache", "sdg_split")
+manifest_path = os.path.join(state_dir, "manifest.json")
+
+group_keys = ["Organization", "Country", "SDG Goal", "SDG Question", "Answer Options", "SDG Goal ID", "SDG Ques ID"]
+
+
+def file_fingerprint(path):
+    with open(path, "rb") as f:
+        return hashlib.sha1(f.read()).hexdigest()
+
+
+def load_questions(path):
+    questions = pd.read_csv(path)
+    # Extract Goal number for merging
+    questions["Goal_Number"] = questions["SDG Goal"].str.extract(r"Goal (\d+)", expand=False)
+    return questions.rename(columns={
+        "Question": "SDG Question",
+        "Possible Answers": "Answer Options",
+        "SDGID": "SDG Goal ID",
+        "QuestionID": "SDG Ques ID"
+    })[["Goal_Number", "SDG Goal", "SDG Question", "Answer Options", "SDG Goal ID", "SDG Ques ID"]]
+
+
+def connect_division(urls_path, questions):
+    # One row per (org, industry, SDG question) for a single division URL file
+    urls_df = pd.read_csv(urls_path, usecols=["Organization", "Country", "Industry", "SDG_Goals"])
+    urls_df = urls_df.drop_duplicates()
+
+    # Extract numeric SDG IDs from the "SDG_Goals" column without a per-row Python function
+    goal_ids = urls_df["SDG_Goals"].astype(str).str.extractall(r"Goal (\d+)")[0]
+    goal_ids = goal_ids.reset_index(level="match", drop=True).rename("Goal_Number")
+    urls_exploded = urls_df.drop(columns=["SDG_Goals"]).join(goal_ids, how="inner").drop_duplicates()
+
+    # Merge on SDG Goal number
+    merged = urls_exploded.merge(questions, on="Goal_Number", how="inner")
+    return merged[group_keys + ["Industry"]]
+
+
+def combine(per_division):
+    if per_division:
+        combined = pd.concat(per_division, ignore_index=True)
+    else:
+        combined = pd.DataFrame(columns=group_keys + ["Industry"])
+    for col in group_keys:
+        combined[col] = combined[col].astype("category")
+
+    # Combine industries for same organization & question: unique, sorted, " | "-joined
+    combined = combined.drop_duplicates().sort_values("Industry", kind="stable")
+    final_df = combined.groupby(group_keys, observed=True, sort=True)["Industry"].agg(" | ".join).reset_index()
+    return final_df.drop_duplicates(subset=["Organization", "SDG Ques ID"]).copy()
+
+
+# Load state from the previous run
+manifest = {}
+if os.path.exists(manifest_path):
+    with open(manifest_path, "r", encoding="utf-8") as f:
+        manifest = json.load(f)
+os.makedirs(state_dir, exist_ok=True)
+
+questions_hash = file_fingerprint(sdg_questions_path)
+full_rebuild = manifest.get("questions") != questions_hash
+sdg_questions_df = load_questions(sdg_questions_path)
+
+division_files = sorted(glob.glob(os.path.join(division_url_dir, "generated_urls_*.csv")))
+per_division = []
+division_state = {}
+changed_goals = set()
+for path in division_files:
+    name = os.path.basename(path)
+    digest = file_fingerprint(path)
+    cache_file = os.path.join(state_dir, f"{os.path.splitext(name)[0]}.pkl")
+    previous = manifest.get("divisions", {}).get(name)
+    if not full_rebuild and previous == digest and os.path.exists(cache_file):
+        division_df = pd.read_pickle(cache_file)
+    else:
+        if os.path.exists(cache_file):
+            changed_goals.update(pd.read_pickle(cache_file)["SDG Goal"].unique())
+        division_df = connect_division(path, sdg_questions_df)
+        division_df.to_pickle(cache_file)
+        changed_goals.update(division_df["SDG Goal"].unique())
+        print(f"Processed {name}")
+    division_state[name] = digest
+    per_division.append(division_df)
+
+# Divisions whose URL file disappeared
+for name in set(manifest.get("divisions", {})) - set(division_state):
+    cache_file = os.path.join(state_dir, f"{os.path.splitext(name)[0]}.pkl")
+    if os.path.exists(cache_file):
+        changed_goals.update(pd.read_pickle(cache_file)["SDG Goal"].unique())
+        os.remove(cache_file)
+
+deduplicated_df = combine(per_division)
 
 # Save merged and deduplicated results
 deduplicated_df.to_csv(os.path.join(output_path, "deduplicated_sdg_questions_by_organization.csv"), index=False)
 
-# Filter for SDG 5, 7, 12, 17
-df_5 = deduplicated_df[deduplicated_df["SDG Goal"].str.contains("Goal 5")].copy()
-df_7 = deduplicated_df[deduplicated_df["SDG Goal"].str.contains("Goal 7")].copy()
-df_12 = deduplicated_df[deduplicated_df["SDG Goal"].str.contains("Goal 12")].copy()
-df_17 = deduplicated_df[deduplicated_df["SDG Goal"].str.contains("Goal 17")].copy()
+# Export one file per SDG goal in a single pass; only goals touched by changed divisions are rewritten
+goal_numbers = deduplicated_df["SDG Goal"].str.extract(r"Goal (\d+)", expand=False)
+changed_numbers = {g for g in pd.Series(sorted(changed_goals), dtype=str).str.extract(r"Goal (\d+)", expand=False).dropna()}
+written = 0
+for goal, goal_df in deduplicated_df.groupby(goal_numbers, sort=False):
+    goal_file = os.path.join(output_path, f"sdg{goal}_questions.csv")
+    if full_rebuild or goal in changed_numbers or not os.path.exists(goal_file):
+        goal_df.to_csv(goal_file, index=False)
+        written += 1
 
-# Export split datasets
-df_5.to_csv(os.path.join(output_path, "sdg5_questions.csv"), index=False)
-df_7.to_csv(os.path.join(output_path, "sdg7_questions.csv"), index=False)
-df_12.to_csv(os.path.join(output_path, "sdg12_questions.csv"), index=False)
-df_17.to_csv(os.path.join(output_path, "sdg17_questions.csv"), index=False)
+with open(manifest_path, "w", encoding="utf-8") as f:
+    json.dump({"questions": questions_hash, "divisions": division_state}, f, indent=2)
 
-print("All SDG split files and merged dataset saved successfully.")
+print(f"All SDG split files and merged dataset saved successfully ({written} goal files updated).")
@@ -0,0 +1,226 @@
+# Benchmarks for the filtering and discovery paths.
+# Generates a synthetic workload in a scratch directory, then times and memory-profiles
+# each stage: corpus load, page/sentence segmentation, corpus build, keyword matching,
+# embedding + retrieval (skipped when sentence-transformers is not installed) and
+# generate_urls against the local Custom Search stub. Results are written as JSON so runs
+# can be compared with --compare.
+
+import os
+import sys
+import json
+import time
+import shutil
+import platform
+import argparse
+import tempfile
+import tracemalloc
+import contextlib
+from datetime import datetime
+
+import numpy as np
+
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.dirname(BENCH_DIR))
+
+from synthetic_corpus import write_corpus, write_questions, TOPIC_WORDS
+from sentence_corpus import iter_documents, segment_document, build_corpus
+from sdg_pipeline import load_questions
+from filter_strategies import KeywordStrategy, SbertStrategy
+from retrieval_engine import GroupedRetriever, normalise_rows
+from customsearch_stub import start_stub_server
+from search_cache import SearchCache
+from url_general_adapter import generate_urls, make_search_client
+from instrumentation import configure
+from encoding_backend import BACKENDS
+
+RESULTS_DIR = os.path.join(BENCH_DIR, "results")
+EMBEDDING_DIM = 384
+
+
+def measure(results, name, fn, verbose=False):
+    # Run fn() once, recording wall time, CPU time and the tracemalloc peak; fn returns a dict of counts
+    tracemalloc.start()
+    wall, cpu = time.perf_counter(), time.process_time()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(sys.stdout if verbose else devnull):
+        extra = fn() or {}
+    wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    results[name] = {"wall_s": round(wall, 4), "cpu_s": round(cpu, 4), "peak_mb": round(peak / 2 ** 20, 2), **extra}
+    print(f"⏱️ {name:<22} {wall:8.3f}s wall {cpu:8.3f}s cpu {peak / 2 ** 20:9.1f} MB peak  {extra}")
+    return extra
+
+
+def synthetic_keywords(question):
+    # Stand-in for KeyBERT: the topic words the generator put into the question
+    words = [w.strip("?.,").lower() for w in question.split()]
+    return [w for w in words if w in TOPIC_WORDS]
+
+
+def run(args):
+    work_dir = args.work_dir or tempfile.mkdtemp(prefix="swa-bench-")
+    output_dir = os.path.join(work_dir, "output")
+    # Keep the stages' own telemetry out of the real log
+    configure(log_path=os.path.join(work_dir, "telemetry.jsonl"))
+    stages = {}
+    state = {}
+
+    def generate():
+        names = write_corpus(work_dir, args.orgs, args.documents, args.pages, args.sentences_per_page, args.seed)
+        state["names"] = names
+        state["question_files"] = write_questions(work_dir, names, args.questions_per_goal, args.seed)
+        return {"orgs": len(names), "question_files": len(state["question_files"])}
+
+    def corpus_load():
+        state["documents"] = list(iter_documents(output_dir))
+        return {"documents": len(state["documents"])}
+
+    def segmentation():
+        sentences = 0
+        for _, doc in state["documents"]:
+            pages, _, _ = segment_document(doc["Raw Content"])
+            sentences += len(pages)
+        return {"sentences": sentences}
+
+    def corpus_build():
+        corpus = build_corpus(output_dir, os.path.join(work_dir, "corpus"))
+        state["sentences"] = corpus.load_sentences()
+        return {"sentences": len(state["sentences"])}
+
+    def load():
+        state["questions"], state["goal"] = load_questions(state["question_files"])
+        questions = state["questions"]
+        state["units"] = questions.groupby([state["goal"], questions["Organization"]], sort=False).indices
+        return {"questions": len(questions), "units": len(state["units"])}
+
+    def keyword_matching():
+        strategy = KeywordStrategy()
+        strategy.index_sentences(state["sentences"])
+        strategy.keywords = [synthetic_keywords(q) for q in state["questions"]["SDG Question"]]
+        matched = 0
+        for (_, org), rows in state["units"].items():
+            matched += sum(1 for result in strategy.run_unit(org, rows) if result[0])
+        return {"questions_with_matches": matched}
+
+    def retrieval():
+        # Random unit vectors isolate the scoring/top-k cost from the encoder
+        rng = np.random.default_rng(args.seed)
+        sentences = state["sentences"]
+        embeddings = rng.standard_normal((len(sentences), EMBEDDING_DIM), dtype=np.float32)
+        retriever = GroupedRetriever(sentences, embeddings)
+        queries = normalise_rows(rng.standard_normal((len(state["questions"]), EMBEDDING_DIM), dtype=np.float32))
+        hits = 0
+        for (_, org), rows in state["units"].items():
+            for row_hits in retriever.search_block(queries[list(rows)], org):
+                retriever.format_hits(row_hits)
+                hits += len(row_hits)
+        return {"hits": hits}
+
+    def embedding_retrieval():
+        strategy = SbertStrategy(cache_dir=os.path.join(work_dir, "embeddings"), backend=args.encode_backend,
+                                 encode_workers=args.encode_workers)
+        strategy.prepare(state["questions"], state["sentences"])
+        answered = 0
+        for (_, org), rows in state["units"].items():
+            answered += sum(1 for result in strategy.run_unit(org, rows) if result[0])
+        return {"questions_with_matches": answered}
+
+    def discovery():
+        server, base_url = start_stub_server(latency=args.stub_latency)
+        cache = SearchCache(os.path.join(work_dir, "search_cache.sqlite"))
+        client = make_search_client(base_url=base_url, per_minute=10 ** 6, max_workers=args.discovery_workers,
+                                    cache=cache)
+        orgs = [{"organisation_name": name, "division": "Division Z", "industry": "Synthetic Industry"}
+                for name in state["names"][:args.discovery_orgs]]
+        user_inputs = {
+            "year": "2020",
+            "Frequency": "1",
+            "doc_labels": ["PDF", "HTML"],
+            "sdg_labels": ["Goal 5"],
+            "country": ["AU"],
+            "output_path": os.path.join(work_dir, "generated_urls.csv"),
+            "crawl_ledger_path": os.path.join(work_dir, "crawl_ledger.sqlite"),
+        }
+        try:
+            df = generate_urls(user_inputs, orgs, client=client, max_workers=args.discovery_workers)
+        finally:
+            client.close()
+            cache.close()
+            server.shutdown()
+        return {"orgs": len(orgs), "requests": server.state.requests, "urls": len(df)}
+
+    try:
+        measure(stages, "generate", generate, args.verbose)
+        measure(stages, "corpus_load", corpus_load, args.verbose)
+        measure(stages, "segmentation", segmentation, args.verbose)
+        measure(stages, "corpus_build", corpus_build, args.verbose)
+        measure(stages, "load_questions", load, args.verbose)
+        measure(stages, "keyword_matching", keyword_matching, args.verbose)
+        measure(stages, "retrieval", retrieval, args.verbose)
+        try:
+            import sentence_transformers  # noqa: F401
+        except ImportError:
+            stages["embedding_retrieval"] = {"skipped": "sentence-transformers is not installed"}
+            print("⏩ embedding_retrieval skipped (sentence-transformers is not installed)")
+        else:
+            measure(stages, "embedding_retrieval", embedding_retrieval, args.verbose)
+        measure(stages, "discovery", discovery, args.verbose)
+    finally:
+        if not args.keep:
+            shutil.rmtree(work_dir, ignore_errors=True)
+
+    return {
+        "timestamp": datetime.now().isoformat(timespec="seconds"),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "scale": {
+            "orgs": args.orgs, "documents": args.documents, "pages": args.pages,
+            "sentences_per_page": args.sentences_per_page, "questions_per_goal": args.questions_per_goal,
+            "discovery_orgs": args.discovery_orgs, "encode_backend": args.encode_backend,
+            "encode_workers": args.encode_workers, "seed": args.seed,
+        },
+        "stages": stages,
+    }
+
+
+def compare(report, baseline_path):
+    with open(baseline_path, "r", encoding="utf-8") as f:
+        baseline = json.load(f)
+    if baseline.get("scale") != report["scale"]:
+        print("⚠️ Baseline was run at a different scale; ratios are not comparable")
+    print(f"{'stage':<22} {'baseline':>10} {'current':>10} {'ratio':>8}")
+    for name, stage in report["stages"].items():
+        before = baseline.get("stages", {}).get(name, {})
+        if "wall_s" in stage and "wall_s" in before and before["wall_s"]:
+            print(f"{name:<22} {before['wall_s']:>10.3f} {stage['wall_s']:>10.3f} "
+                  f"{stage['wall_s'] / before['wall_s']:>7.2f}x")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark the SDG filtering and URL discovery stages")
+    parser.add_argument("--orgs", type=int, default=20)
+    parser.add_argument("--documents", type=int, default=5, help="Documents per organisation")
+    parser.add_argument("--pages", type=int, default=10, help="Pages per document")
+    parser.add_argument("--sentences-per-page", type=int, default=12)
+    parser.add_argument("--questions-per-goal", type=int, default=5)
+    parser.add_argument("--discovery-orgs", type=int, default=50, help="Organisations searched against the stub")
+    parser.add_argument("--discovery-workers", type=int, default=8)
+    parser.add_argument("--stub-latency", type=float, default=0.02, help="Seconds the stub waits per request")
+    parser.add_argument("--encode-backend", choices=BACKENDS, default="fp32")
+    parser.add_argument("--encode-workers", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--work-dir", help="Scratch directory (default: a new temporary directory)")
+    parser.add_argument("--keep", action="store_true", help="Keep the scratch directory")
+    parser.add_argument("--output", help="Result JSON path (default: benchmarks/results/bench-<timestamp>.json)")
+    parser.add_argument("--compare", help="Earlier result JSON to compare wall times against")
+    parser.add_argument("--verbose", action="store_true", help="Show the stages' own progress output")
+    args = parser.parse_args()
+
+    report = run(args)
+    output = args.output or os.path.join(RESULTS_DIR, f"bench-{datetime.now():%Y%m%d-%H%M%S}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, "w", encoding="utf-8") as f:
+        json.dump(report, f, indent=2)
+    print(f"✅ Benchmark results saved to: {output}")
+    if args.compare:
+        compare(report, args.compare)
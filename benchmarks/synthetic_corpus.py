@@ -0,0 +1,136 @@
+# Synthetic workload generator for the benchmarks.
+# Writes output/<org>/content.csv in the scraper's schema and an "SDG Question" folder
+# with sdg<N>_questions.csv files, at a configurable orgs x documents x pages scale.
+# Text is drawn from a fixed sustainability vocabulary with a seeded RNG, so the same
+# arguments always produce the same corpus.
+
+import os
+import sys
+import csv
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from page_store import CONTENT_COLUMNS
+
+QUESTION_COLUMNS = [
+    "Organization", "Country", "SDG Goal", "SDG Question", "Answer Options",
+    "SDG Goal ID", "SDG Ques ID", "Industry"
+]
+
+GOALS = {
+    "5": "Goal 5. Achieve gender equality and empower all women and girls",
+    "7": "Goal 7. Ensure access to affordable, reliable, sustainable and modern energy for all",
+    "12": "Goal 12. Ensure sustainable consumption and production patterns",
+    "17": "Goal 17. Strengthen the means of implementation and revitalize the Global Partnership for Sustainable Development",
+}
+
+TOPIC_WORDS = [
+    "renewable", "energy", "emissions", "recycling", "waste", "women", "leadership", "gender", "pay", "gap",
+    "solar", "electricity", "consumption", "packaging", "supplier", "partnership", "community", "investment",
+    "water", "carbon", "diversity", "board", "procurement", "landfill", "efficiency", "target", "reporting",
+]
+FILLER_WORDS = [
+    "the", "our", "company", "during", "year", "continued", "to", "improve", "across", "all", "sites",
+    "and", "we", "reported", "increase", "in", "with", "a", "new", "program", "for", "staff", "customers",
+    "operations", "Australia", "group", "total", "percent", "compared", "previous", "period",
+]
+
+QUESTION_TEMPLATES = [
+    "What percentage of {0} comes from {1} sources in your organization?",
+    "Does your organization report on {0} {1} targets?",
+    "How does your organization measure {0} and {1} across operations?",
+    "What is the {0} rate for {1} in your organization?",
+]
+
+
+def make_sentence(rng, min_words=8, max_words=24):
+    words = [rng.choice(FILLER_WORDS) for _ in range(rng.randint(min_words, max_words))]
+    for _ in range(rng.randint(0, 3)):
+        words.insert(rng.randrange(len(words)), rng.choice(TOPIC_WORDS))
+    if rng.random() < 0.3:
+        words.append(f"{rng.randint(1, 99)}%")
+    return " ".join(words).capitalize() + rng.choice([".", ".", ".", "!", "?"])
+
+
+def make_raw_content(rng, pages, sentences_per_page):
+    return "".join(
+        f" ===== PAGE {p} ===== " + " ".join(make_sentence(rng) for _ in range(sentences_per_page))
+        for p in range(1, pages + 1)
+    )
+
+
+def org_names(orgs):
+    return [f"Synthetic Org {i:04d} (synth{i:04d})" for i in range(orgs)]
+
+
+def write_corpus(base_dir, orgs=20, documents=5, pages=10, sentences_per_page=12, seed=0):
+    # Returns the list of organisation names written under base_dir/output
+    rng = random.Random(seed)
+    output_dir = os.path.join(base_dir, "output")
+    names = org_names(orgs)
+    for org in names:
+        org_dir = os.path.join(output_dir, org)
+        os.makedirs(org_dir, exist_ok=True)
+        with open(os.path.join(org_dir, "content.csv"), "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=CONTENT_COLUMNS, quoting=csv.QUOTE_ALL)
+            writer.writeheader()
+            for d in range(documents):
+                slug = org.split("(")[-1].rstrip(")")
+                writer.writerow({
+                    "URL": f"https://www.{slug}.com.au/reports/report-{d}.pdf",
+                    "Date Collected": f"2025-0{1 + d % 9}-15T10:00:00",
+                    "File Type": "PDF",
+                    "Page Count": str(pages),
+                    "Publication Date": str(2018 + d % 8),
+                    "Raw Content": make_raw_content(rng, pages, sentences_per_page),
+                })
+    return names
+
+
+def write_questions(base_dir, names, questions_per_goal=5, seed=0):
+    # Returns the list of sdg<N>_questions.csv paths written under base_dir/SDG Question
+    rng = random.Random(seed + 1)
+    question_dir = os.path.join(base_dir, "SDG Question")
+    os.makedirs(question_dir, exist_ok=True)
+    paths = []
+    for goal, goal_label in GOALS.items():
+        questions = []
+        for q in range(questions_per_goal):
+            template = QUESTION_TEMPLATES[q % len(QUESTION_TEMPLATES)]
+            text = template.format(*rng.sample(TOPIC_WORDS, 2))
+            questions.append((f"S{int(goal):03d}", f"Q{goal}{q:02d}", text))
+        path = os.path.join(question_dir, f"sdg{goal}_questions.csv")
+        with open(path, "w", encoding="utf-8", newline="") as f:
+            writer = csv.DictWriter(f, fieldnames=QUESTION_COLUMNS)
+            writer.writeheader()
+            for org in names:
+                for goal_id, ques_id, text in questions:
+                    writer.writerow({
+                        "Organization": org,
+                        "Country": "AU",
+                        "SDG Goal": goal_label,
+                        "SDG Question": text,
+                        "Answer Options": "1. I don't know. 2. Yes. 3. No.",
+                        "SDG Goal ID": goal_id,
+                        "SDG Ques ID": ques_id,
+                        "Industry": "Synthetic Industry",
+                    })
+        paths.append(path)
+    return paths
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write a synthetic output/ corpus and SDG question files")
+    parser.add_argument("base_dir")
+    parser.add_argument("--orgs", type=int, default=20)
+    parser.add_argument("--documents", type=int, default=5, help="Documents per organisation")
+    parser.add_argument("--pages", type=int, default=10, help="Pages per document")
+    parser.add_argument("--sentences-per-page", type=int, default=12)
+    parser.add_argument("--questions-per-goal", type=int, default=5)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+    names = write_corpus(args.base_dir, args.orgs, args.documents, args.pages, args.sentences_per_page, args.seed)
+    paths = write_questions(args.base_dir, names, args.questions_per_goal, args.seed)
+    print(f"✅ Wrote {len(names)} organisations and {len(paths)} question files to {args.base_dir}")
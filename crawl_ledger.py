@@ -0,0 +1,81 @@
+# Persistent crawl ledger shared by URL discovery and document fetching.
+# One row per (organisation, URL) records when it was last scraped and the hash of the
+# content fetched, so the Frequency window holds across runs and unchanged documents
+# can be skipped.
+
+import os
+import sqlite3
+import threading
+from datetime import datetime
+
+CRAWL_LEDGER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "crawl_ledger.sqlite")
+
+
+class CrawlLedger:
+    def __init__(self, path=CRAWL_LEDGER_PATH):
+        self.path = path
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._lock = threading.Lock()
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS crawl ("
+            " org TEXT NOT NULL, url TEXT NOT NULL, last_scraped TEXT NOT NULL, content_hash TEXT,"
+            " PRIMARY KEY (org, url))"
+        )
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, org, url):
+        # Return (last_scraped datetime, content_hash) or None
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT last_scraped, content_hash FROM crawl WHERE org=? AND url=?", (org, url)).fetchone()
+        if row is None:
+            return None
+        return datetime.fromisoformat(row[0]), row[1]
+
+    def last_scraped(self, org, url):
+        entry = self.get(org, url)
+        return entry[0] if entry else None
+
+    def content_hash(self, org, url):
+        entry = self.get(org, url)
+        return entry[1] if entry else None
+
+    def is_due(self, org, url, frequency_days, now=None):
+        last = self.last_scraped(org, url)
+        return last is None or ((now or datetime.now()) - last).days >= frequency_days
+
+    def mark_scraped(self, entries, scraped_at=None):
+        # entries: iterable of (org, url); keeps any stored content hash
+        scraped_at = (scraped_at or datetime.now()).isoformat()
+        with self._lock:
+            self._conn.executemany(
+                "INSERT INTO crawl (org, url, last_scraped) VALUES (?, ?, ?) "
+                "ON CONFLICT (org, url) DO UPDATE SET last_scraped=excluded.last_scraped",
+                [(org, url, scraped_at) for org, url in entries])
+            self._conn.commit()
+
+    def record_content(self, org, url, content_hash, scraped_at=None):
+        scraped_at = (scraped_at or datetime.now()).isoformat()
+        with self._lock:
+            self._conn.execute(
+                "INSERT INTO crawl (org, url, last_scraped, content_hash) VALUES (?, ?, ?, ?) "
+                "ON CONFLICT (org, url) DO UPDATE SET last_scraped=excluded.last_scraped, "
+                "content_hash=excluded.content_hash",
+                (org, url, scraped_at, content_hash))
+            self._conn.commit()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM crawl").fetchone()[0]
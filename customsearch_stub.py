@@ -0,0 +1,110 @@
+# Local stand-in for the Google Custom Search JSON API (customsearch/v1).
+# Returns deterministic `items` built from the query so discovery can be exercised and
+# benchmarked offline. It can inject 429/503 responses and latency to test the
+# client's backoff and concurrency.
+
+import re
+import json
+import time
+import hashlib
+import argparse
+import threading
+from http.server import ThreadingHTTPServer, BaseHTTPRequestHandler
+from urllib.parse import urlparse, parse_qs
+
+SEARCH_PATH = "/customsearch/v1"
+
+
+def _slug(text):
+    return re.sub(r"[^a-z0-9]+", "", text.lower())[:20] or "org"
+
+
+def fake_items(query, start, total_results=25):
+    # Deterministic mix of trusted PDFs, HTML pages and third-party links for a query
+    org_part = re.split(r"\s+(?:sustainability|ESG)\b", query, maxsplit=1)[0]
+    org_part = re.sub(r"\([^)]*\)", "", org_part)
+    domain = f"www.{_slug(org_part)}.com.au"
+    digest = hashlib.sha1(query.encode("utf-8")).hexdigest()[:6]
+    items = []
+    for n in range(start, min(start + 10, total_results + 1)):
+        if n % 5 == 0:
+            link = f"https://news.example.org/{digest}/article-{n}"
+        elif n % 2 == 0:
+            link = f"https://{domain}/reports/{digest}-sustainability-report-{n}.pdf"
+        else:
+            link = f"https://{domain}/about/{digest}-esg-{n}.html"
+        items.append({"kind": "customsearch#result", "title": f"Result {n}", "link": link})
+    return items
+
+
+class StubState:
+    def __init__(self, total_results=25, latency=0.0, fail_every=0, fail_status=429):
+        self.total_results = total_results
+        self.latency = latency
+        self.fail_every = fail_every
+        self.fail_status = fail_status
+        self.requests = 0
+        self.queries = []
+        self.lock = threading.Lock()
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body, headers=None):
+        payload = json.dumps(body).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        for key, value in (headers or {}).items():
+            self.send_header(key, value)
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        state = self.server.state
+        url = urlparse(self.path)
+        if url.path != SEARCH_PATH:
+            self._send(404, {"error": {"code": 404, "message": "Not found"}})
+            return
+        params = parse_qs(url.query)
+        query = params.get("q", [""])[0]
+        start = int(params.get("start", ["1"])[0])
+        with state.lock:
+            state.requests += 1
+            count = state.requests
+            state.queries.append((query, start))
+        if state.latency:
+            time.sleep(state.latency)
+        if state.fail_every and count % state.fail_every == 0:
+            self._send(state.fail_status, {"error": {"code": state.fail_status, "message": "Injected failure"}},
+                       {"Retry-After": "0"})
+            return
+        items = fake_items(query, start, state.total_results)
+        body = {"kind": "customsearch#search", "queries": {"request": [{"searchTerms": query, "startIndex": start}]}}
+        if items:
+            body["items"] = items
+        self._send(200, body)
+
+
+def start_stub_server(host="127.0.0.1", port=0, **state_kwargs):
+    # Start the stub in a daemon thread; returns (server, base_url) — call server.shutdown() when done
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.state = StubState(**state_kwargs)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}{SEARCH_PATH}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve a fake customsearch/v1 endpoint")
+    parser.add_argument("--port", type=int, default=8765)
+    parser.add_argument("--latency", type=float, default=0.0)
+    parser.add_argument("--fail-every", type=int, default=0)
+    args = parser.parse_args()
+    server, base_url = start_stub_server(port=args.port, latency=args.latency, fail_every=args.fail_every)
+    print(f"Custom Search stub listening on {base_url}")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
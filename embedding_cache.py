@@ -0,0 +1,166 @@
+# Persistent on-disk sentence embedding store shared by the SBERT filter scripts.
+# Vectors live in a flat float32 file that is memory-mapped on read; a sidecar
+# index.txt holds one sentence hash per row, in the same order as the vectors.
+# Several processes (the warm retrieval service, batch pipeline runs) may share one cache:
+# appends happen under an exclusive file lock after re-reading what others appended.
+
+import os
+import re
+import json
+import hashlib
+from contextlib import contextmanager
+import numpy as np
+
+try:
+    import fcntl
+except ImportError:  # Windows
+    fcntl = None
+    import msvcrt
+
+CACHE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "embeddings")
+
+
+def normalise_sentence(text):
+    # Whitespace differences never change the tokenised input, so they should not change the key
+    return re.sub(r"\s+", " ", str(text)).strip()
+
+
+def sentence_key(text):
+    return hashlib.sha1(normalise_sentence(text).encode("utf-8")).hexdigest()
+
+
+def _model_dir_name(model_name):
+    return re.sub(r"[^A-Za-z0-9._-]+", "_", model_name)
+
+
+@contextmanager
+def _file_lock(path):
+    # Exclusive inter-process lock held for the duration of the block
+    with open(path, "a+b") as f:
+        if fcntl is not None:
+            fcntl.flock(f, fcntl.LOCK_EX)
+        else:
+            f.seek(0)
+            msvcrt.locking(f.fileno(), msvcrt.LK_LOCK, 1)
+        try:
+            yield
+        finally:
+            if fcntl is not None:
+                fcntl.flock(f, fcntl.LOCK_UN)
+            else:
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_UNLCK, 1)
+
+
+class EmbeddingCache:
+    def __init__(self, model_name, cache_dir=CACHE_DIR):
+        self.model_name = model_name
+        self.path = os.path.join(cache_dir, _model_dir_name(model_name))
+        self.meta_path = os.path.join(self.path, "meta.json")
+        self.index_path = os.path.join(self.path, "index.txt")
+        self.vectors_path = os.path.join(self.path, "vectors.f32")
+        self.lock_path = os.path.join(self.path, "lock")
+        self.dim = None
+        self.index = {}
+        self.rows = 0
+        self.hits = 0
+        self.misses = 0
+        self._load()
+
+    def __len__(self):
+        return len(self.index)
+
+    def __contains__(self, text):
+        return sentence_key(text) in self.index
+
+    def _load(self):
+        if not os.path.exists(self.meta_path):
+            return
+        # Locked so a tail another process is still writing is not mistaken for a crashed append
+        with _file_lock(self.lock_path):
+            self._refresh()
+
+    def _refresh(self):
+        # Re-read the on-disk index (including rows other processes appended); caller holds the lock
+        if not os.path.exists(self.meta_path):
+            return
+        with open(self.meta_path, "r", encoding="utf-8") as f:
+            meta = json.load(f)
+        if meta.get("model") != self.model_name:
+            raise ValueError(f"Embedding cache at {self.path} belongs to {meta.get('model')!r}, not {self.model_name!r}")
+        self.dim = int(meta["dim"])
+
+        hashes = []
+        if os.path.exists(self.index_path):
+            with open(self.index_path, "r", encoding="ascii") as f:
+                hashes = f.read().split()
+        row_bytes = self.dim * 4
+        size = os.path.getsize(self.vectors_path) if os.path.exists(self.vectors_path) else 0
+        rows = min(len(hashes), size // row_bytes)
+
+        # A run killed mid-append can leave the two files out of step; keep only complete rows
+        if size != rows * row_bytes:
+            with open(self.vectors_path, "r+b") as f:
+                f.truncate(rows * row_bytes)
+        if len(hashes) != rows:
+            hashes = hashes[:rows]
+            with open(self.index_path, "w", encoding="ascii") as f:
+                f.write("".join(h + "\n" for h in hashes))
+
+        self.index = {h: i for i, h in enumerate(hashes)}
+        self.rows = rows
+
+    def vectors(self):
+        if not self.index:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        return np.memmap(self.vectors_path, dtype=np.float32, mode="r", shape=(self.rows, self.dim))
+
+    def add(self, keys, vectors):
+        vectors = np.ascontiguousarray(vectors, dtype=np.float32)
+        if vectors.ndim != 2 or len(keys) != vectors.shape[0]:
+            raise ValueError("keys and vectors must have the same number of rows")
+        os.makedirs(self.path, exist_ok=True)
+        with _file_lock(self.lock_path):
+            # Row numbers must come from the files as they are now, not from when this process loaded them
+            self._refresh()
+            if self.dim is None:
+                self.dim = vectors.shape[1]
+                with open(self.meta_path, "w", encoding="utf-8") as f:
+                    json.dump({"model": self.model_name, "dim": self.dim}, f)
+            elif vectors.shape[1] != self.dim:
+                raise ValueError(f"Expected {self.dim}-dim vectors, got {vectors.shape[1]}")
+
+            # Keys another process stored in the meantime keep their existing row
+            fresh = [i for i, key in enumerate(keys) if key not in self.index]
+            if not fresh:
+                return
+            keys = [keys[i] for i in fresh]
+            # _refresh trimmed any partial tail, so new rows start right after the last complete one
+            start = self.rows
+            # Vectors are written before the index so a partial write is dropped by _load
+            with open(self.vectors_path, "ab") as f:
+                f.write(vectors[fresh].tobytes())
+            with open(self.index_path, "a", encoding="ascii") as f:
+                f.write("".join(k + "\n" for k in keys))
+            for offset, key in enumerate(keys):
+                self.index[key] = start + offset
+            self.rows = start + len(keys)
+
+    def encode(self, model, sentences, **encode_kwargs):
+        # Return embeddings for every sentence, encoding only those not already stored
+        keys = [sentence_key(s) for s in sentences]
+        missing = {}
+        for key, sent in zip(keys, sentences):
+            if key not in self.index and key not in missing:
+                missing[key] = sent
+        self.misses += len(missing)
+        self.hits += len(keys) - sum(1 for k in keys if k in missing)
+
+        if missing:
+            new_vectors = model.encode(list(missing.values()), convert_to_numpy=True, **encode_kwargs)
+            self.add(list(missing.keys()), new_vectors)
+
+        if not keys:
+            return np.empty((0, self.dim or 0), dtype=np.float32)
+        rows = np.fromiter((self.index[k] for k in keys), dtype=np.int64, count=len(keys))
+        return np.asarray(self.vectors()[rows])
@@ -0,0 +1,177 @@
+# Selectable CPU encoding backends for the SBERT filter.
+# EncodingBackend wraps the same SentenceTransformer model as fp32 (the original path),
+# dynamically quantised int8 (torch quantize_dynamic on the Linear layers) or an ONNX
+# export, sorts sentences by length before batching to cut padding, can pick the batch
+# size from a timed sample and can spread encoding over a multi-process pool. It exposes
+# .encode() like the model itself, so EmbeddingCache and GroupedRetriever use it as-is.
+# Every backend gets its own embedding cache name, so vectors from different variants
+# are never mixed. Run this module to compare a variant's speed and retrieval quality
+# against fp32 on a sample of the corpus.
+
+import time
+import argparse
+import numpy as np
+
+from retrieval_engine import normalise_rows, top_k_rows, TOP_K
+
+BACKENDS = ("fp32", "int8", "onnx")
+DEFAULT_BATCH_SIZE = 32  # SentenceTransformer.encode default
+BATCH_SIZE_CANDIDATES = (16, 32, 64, 128, 256)
+TUNE_SAMPLE = 512
+
+
+class EncodingBackend:
+    def __init__(self, model_name, backend="fp32", batch_size=DEFAULT_BATCH_SIZE, workers=1):
+        if backend not in BACKENDS:
+            raise ValueError(f"Unknown encoding backend {backend!r}; expected one of {BACKENDS}")
+        self.model_name = model_name
+        self.backend = backend
+        self.batch_size = batch_size
+        self.workers = max(1, int(workers or 1))
+        self.model = None
+        self._pool = None
+
+    @property
+    def cache_name(self):
+        # fp32 keeps the plain model name so existing embedding caches stay valid
+        return self.model_name if self.backend == "fp32" else f"{self.model_name}@{self.backend}"
+
+    def __getstate__(self):
+        state = self.__dict__.copy()
+        state["model"] = None
+        state["_pool"] = None
+        return state
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def load(self):
+        if self.model is not None:
+            return self.model
+        from sentence_transformers import SentenceTransformer
+
+        if self.backend == "onnx":
+            try:
+                self.model = SentenceTransformer(self.model_name, device="cpu", backend="onnx")
+            except (TypeError, ImportError) as e:
+                raise RuntimeError("The onnx backend needs sentence-transformers>=3.2 with "
+                                   "'optimum[onnxruntime]' installed") from e
+        else:
+            self.model = SentenceTransformer(self.model_name, device="cpu")
+            if self.backend == "int8":
+                import torch
+                self.model = torch.quantization.quantize_dynamic(self.model, {torch.nn.Linear}, dtype=torch.qint8)
+        return self.model
+
+    def close(self):
+        if self._pool is not None:
+            self.model.stop_multi_process_pool(self._pool)
+            self._pool = None
+
+    def _encode_sorted(self, sentences, batch_size):
+        model = self.load()
+        if self.workers > 1 and len(sentences) >= batch_size * self.workers:
+            if self._pool is None:
+                self._pool = model.start_multi_process_pool(["cpu"] * self.workers)
+            # Contiguous chunks of length-sorted text keep every worker's batches evenly padded
+            chunk_size = max(batch_size, -(-len(sentences) // (self.workers * 4)))
+            return model.encode_multi_process(sentences, self._pool, batch_size=batch_size, chunk_size=chunk_size)
+        return model.encode(sentences, batch_size=batch_size, convert_to_numpy=True, show_progress_bar=False)
+
+    def encode(self, sentences, convert_to_numpy=True, batch_size=None, **kwargs):
+        # Same contract as SentenceTransformer.encode for a list of strings; rows come back in input order
+        sentences = [str(s) for s in sentences]
+        if not sentences:
+            return np.empty((0, 0), dtype=np.float32)
+        if self.batch_size == "auto":
+            self.batch_size = self.tune_batch_size(sentences)
+        batch_size = batch_size or self.batch_size
+        order = np.argsort([-len(s) for s in sentences], kind="stable")
+        encoded = np.asarray(self._encode_sorted([sentences[i] for i in order], batch_size), dtype=np.float32)
+        vectors = np.empty_like(encoded)
+        vectors[order] = encoded
+        return vectors
+
+    def tune_batch_size(self, sentences, candidates=BATCH_SIZE_CANDIDATES, sample_size=TUNE_SAMPLE):
+        # Time each candidate batch size on a fixed sample and keep the fastest
+        rng = np.random.default_rng(0)
+        idx = rng.choice(len(sentences), size=min(sample_size, len(sentences)), replace=False)
+        sample = sorted((sentences[i] for i in idx), key=len, reverse=True)
+        model = self.load()
+        model.encode(sample[:8], batch_size=8, show_progress_bar=False)  # warm-up
+        timings = {}
+        for size in candidates:
+            start = time.perf_counter()
+            model.encode(sample, batch_size=size, convert_to_numpy=True, show_progress_bar=False)
+            timings[size] = time.perf_counter() - start
+        best = min(timings, key=timings.get)
+        print(f"⚙️ Batch size {best} chosen ({', '.join(f'{k}: {v:.2f}s' for k, v in timings.items())})")
+        return best
+
+
+def compare_backends(model_name, sentences, queries, backends=BACKENDS, batch_size=DEFAULT_BATCH_SIZE, workers=1,
+                     top_k=TOP_K):
+    # Encode the same sample with each backend and score it against fp32:
+    # throughput, mean cosine to the fp32 vectors and top-k overlap of the retrieved sentences
+    results = {}
+    reference = None
+    for name in ["fp32"] + [b for b in backends if b != "fp32"]:
+        with EncodingBackend(model_name, name, batch_size, workers) as backend:
+            try:
+                backend.load()
+            except Exception as e:
+                results[name] = {"error": str(e)}
+                print(f"⚠️ {name}: {e}")
+                if name == "fp32":
+                    return results
+                continue
+            start = time.perf_counter()
+            sent_vecs = normalise_rows(backend.encode(sentences))
+            elapsed = time.perf_counter() - start
+            query_vecs = normalise_rows(backend.encode(queries))
+        hits = [set(i for _, i in row) for row in top_k_rows(query_vecs @ sent_vecs.T, top_k, -1.0)]
+        entry = {"seconds": round(elapsed, 3), "sentences_per_s": round(len(sentences) / elapsed, 1)}
+        if reference is None:
+            reference = (sent_vecs, hits)
+        else:
+            ref_vecs, ref_hits = reference
+            entry["mean_cosine_to_fp32"] = round(float(np.mean(np.sum(ref_vecs * sent_vecs, axis=1))), 4)
+            entry[f"top{top_k}_overlap_with_fp32"] = round(
+                float(np.mean([len(a & b) / max(1, len(a)) for a, b in zip(ref_hits, hits)])), 4)
+            entry["speedup_vs_fp32"] = round(results["fp32"]["seconds"] / elapsed, 2)
+        results[name] = entry
+        print(f"📏 {name}: {entry}")
+    return results
+
+
+if __name__ == "__main__":
+    import json
+    import pandas as pd
+    from sentence_corpus import SentenceCorpus
+    from filter_strategies import MODEL_NAME
+    from sdg_pipeline import ALL_GOALS_FILE
+
+    parser = argparse.ArgumentParser(description="Compare SBERT encoding backends against fp32 on the corpus")
+    parser.add_argument("--backends", nargs="*", choices=BACKENDS, default=list(BACKENDS))
+    parser.add_argument("--model", default=MODEL_NAME)
+    parser.add_argument("--sample", type=int, default=2000, help="Corpus sentences to encode")
+    parser.add_argument("--batch-size", default=str(DEFAULT_BATCH_SIZE), help="Batch size or 'auto'")
+    parser.add_argument("--workers", type=int, default=1, help="Encoding processes")
+    parser.add_argument("--questions", default=ALL_GOALS_FILE)
+    parser.add_argument("--output", help="Write the report as JSON")
+    args = parser.parse_args()
+
+    sentences = SentenceCorpus().load_sentences()["Sentence"]
+    if sentences.empty:
+        raise SystemExit("The sentence corpus is empty; run sentence_corpus.py first.")
+    sample = sentences.sample(min(args.sample, len(sentences)), random_state=0).tolist()
+    queries = pd.read_csv(args.questions)["SDG Question"].dropna().astype(str).unique().tolist()
+    batch_size = args.batch_size if args.batch_size == "auto" else int(args.batch_size)
+    report = compare_backends(args.model, sample, queries, args.backends, batch_size, args.workers)
+    if args.output:
+        with open(args.output, "w", encoding="utf-8") as f:
+            json.dump(report, f, indent=2)
+        print(f"✅ Backend report saved to: {args.output}")
@@ -0,0 +1,267 @@
+# Fetch-and-extract stage between URL discovery and the filter scripts.
+# Reads generated_urls.csv, downloads PDFs/HTML concurrently through one pooled session
+# (bodies are streamed to disk, never held in memory), extracts text page by page in a
+# process pool and writes output/<org>/content.csv in the existing schema. URLs scraped
+# within the Frequency window are not downloaded again, and URLs whose downloaded content
+# hash matches the crawl ledger are not re-extracted.
+
+import os
+import re
+import csv
+import sys
+import hashlib
+import argparse
+from datetime import datetime
+from html.parser import HTMLParser
+from concurrent.futures import ThreadPoolExecutor, ProcessPoolExecutor, as_completed
+
+import pandas as pd
+import requests
+from requests.adapters import HTTPAdapter
+
+from crawl_ledger import CrawlLedger, CRAWL_LEDGER_PATH
+from page_store import CONTENT_COLUMNS
+from url_general_adapter import detect_file_type
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(BASE_DIR, "output")
+DOWNLOAD_DIR = os.path.join(BASE_DIR, "cache", "downloads")
+CHUNK_SIZE = 1 << 16
+MAX_DOWNLOAD_BYTES = 200 * 1024 * 1024
+USER_AGENT = "Mozilla/5.0 (compatible; SWA-fetcher/1.0)"
+FREQUENCY_DAYS = 30  # generate_urls' default Frequency of one month
+
+
+def org_dir_name(org_name):
+    # Keep folder names identical to the org name except for characters Windows rejects
+    return re.sub(r'[<>:"/\\|?*]', "_", org_name).strip() or "Unknown"
+
+
+def make_session(pool_size):
+    session = requests.Session()
+    session.headers["User-Agent"] = USER_AGENT
+    adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size, max_retries=2)
+    session.mount("https://", adapter)
+    session.mount("http://", adapter)
+    return session
+
+
+def download(session, org, url, download_dir=DOWNLOAD_DIR, timeout=(10, 60), max_bytes=MAX_DOWNLOAD_BYTES):
+    # Stream the body to disk while hashing it; returns (path, sha1, content_type)
+    os.makedirs(download_dir, exist_ok=True)
+    path = os.path.join(download_dir, hashlib.sha1(f"{org}\n{url}".encode("utf-8")).hexdigest())
+    digest = hashlib.sha1()
+    size = 0
+    with session.get(url, stream=True, timeout=timeout) as response:
+        response.raise_for_status()
+        content_type = response.headers.get("Content-Type", "")
+        try:
+            with open(f"{path}.part", "wb") as f:
+                for chunk in response.iter_content(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > max_bytes:
+                        raise ValueError(f"Download exceeds {max_bytes} bytes")
+                    digest.update(chunk)
+                    f.write(chunk)
+        except BaseException:
+            # Oversized or interrupted download: don't leave the partial body behind
+            if os.path.exists(f"{path}.part"):
+                os.remove(f"{path}.part")
+            raise
+    os.replace(f"{path}.part", path)
+    return path, digest.hexdigest(), content_type
+
+
+class _TextExtractor(HTMLParser):
+    SKIP = {"script", "style", "noscript", "template", "svg"}
+
+    def __init__(self):
+        super().__init__()
+        self.parts = []
+        self.title = ""
+        self._skip = 0
+        self._in_title = False
+
+    def handle_starttag(self, tag, attrs):
+        if tag in self.SKIP:
+            self._skip += 1
+        elif tag == "title":
+            self._in_title = True
+
+    def handle_endtag(self, tag):
+        if tag in self.SKIP and self._skip:
+            self._skip -= 1
+        elif tag == "title":
+            self._in_title = False
+
+    def handle_data(self, data):
+        if self._in_title:
+            self.title += data
+        elif not self._skip:
+            self.parts.append(data)
+
+
+def _clean_text(text):
+    return re.sub(r"\s+", " ", text).strip()
+
+
+def extract_html_pages(path):
+    with open(path, "rb") as f:
+        html = f.read().decode("utf-8", errors="replace")
+    parser = _TextExtractor()
+    parser.feed(html)
+    return [_clean_text(" ".join(parser.parts))], None
+
+
+def extract_pdf_pages(path):
+    try:
+        from pypdf import PdfReader
+    except ImportError:
+        raise RuntimeError("PDF extraction needs the 'pypdf' package (pip install pypdf)")
+    reader = PdfReader(path)
+    pages = [_clean_text(page.extract_text() or "") for page in reader.pages]
+    created = None
+    try:
+        created = reader.metadata.creation_date if reader.metadata else None
+    except Exception:
+        pass
+    return pages, created.year if created else None
+
+
+def publication_year(url, metadata_year=None):
+    years = [int(y) for y in re.findall(r"(?<!\d)(20\d{2})(?!\d)", url) if int(y) <= datetime.now().year]
+    if years:
+        return str(max(years))
+    return str(metadata_year) if metadata_year else ""
+
+
+def extract_document(job):
+    # Runs in a worker process: turn one downloaded file into a content.csv row
+    org, url, file_type, path = job
+    try:
+        if file_type == "PDF":
+            pages, metadata_year = extract_pdf_pages(path)
+        else:
+            pages, metadata_year = extract_html_pages(path)
+    finally:
+        os.remove(path)
+    raw = "".join(f" ===== PAGE {i} ===== {text}" for i, text in enumerate(pages, start=1))
+    return org, {
+        "URL": url,
+        "Date Collected": datetime.now().isoformat(),
+        "File Type": file_type,
+        "Page Count": str(len(pages)),
+        "Publication Date": publication_year(url, metadata_year),
+        "Raw Content": raw,
+    }
+
+
+def write_content_csv(org, new_rows, output_dir=OUTPUT_DIR):
+    # Replace rows for refreshed URLs and keep everything else already collected for the org
+    org_dir = os.path.join(output_dir, org_dir_name(org))
+    os.makedirs(org_dir, exist_ok=True)
+    path = os.path.join(org_dir, "content.csv")
+    fresh_urls = {row["URL"] for row in new_rows}
+    rows = []
+    if os.path.exists(path):
+        csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+        with open(path, "r", encoding="utf-8", newline="") as f:
+            rows = [row for row in csv.DictReader(f) if row.get("URL") not in fresh_urls]
+    rows.extend(new_rows)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CONTENT_COLUMNS, quoting=csv.QUOTE_ALL, extrasaction="ignore")
+        writer.writeheader()
+        writer.writerows(rows)
+    os.replace(tmp_path, path)
+    return path
+
+
+def fetch_and_extract(urls_csv="generated_urls.csv", output_dir=OUTPUT_DIR, download_dir=DOWNLOAD_DIR,
+                      ledger_path=CRAWL_LEDGER_PATH, download_workers=8, extract_workers=None, force=False,
+                      frequency_days=FREQUENCY_DAYS):
+    urls_df = pd.read_csv(urls_csv)
+    stats = {"skipped": 0, "downloaded": 0, "unchanged": 0, "extracted": 0, "failed": 0}
+    ledger = CrawlLedger(ledger_path)
+    jobs = []
+    for org, url in urls_df[["Organization", "URL"]].drop_duplicates().itertuples(index=False):
+        file_type = detect_file_type(url)
+        if file_type not in ("PDF", "HTML"):
+            continue
+        # Scraped within the Frequency window: not due, so no request at all
+        if not force and not ledger.is_due(org, url, frequency_days):
+            stats["skipped"] += 1
+            continue
+        jobs.append((org, url, file_type))
+    if not jobs:
+        ledger.close()
+        print(f"No PDF/HTML URLs due for fetching ({stats['skipped']} scraped within the last {frequency_days} days).")
+        return stats
+
+    session = make_session(download_workers)
+    rows_by_org = {}
+    hashes = {}
+    try:
+        with ThreadPoolExecutor(max_workers=download_workers) as fetch_pool, \
+                ProcessPoolExecutor(max_workers=extract_workers) as extract_pool:
+            downloads = {fetch_pool.submit(download, session, job[0], job[1], download_dir): job for job in jobs}
+            extractions = []
+            # Each download is handed to the extraction pool as soon as it finishes
+            for future in as_completed(downloads):
+                org, url, file_type = downloads[future]
+                try:
+                    path, digest, content_type = future.result()
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"⚠️ Download failed for {url}: {e}")
+                    continue
+                stats["downloaded"] += 1
+                if not force and ledger.content_hash(org, url) == digest:
+                    stats["unchanged"] += 1
+                    print(f"⏩ Unchanged since last fetch: {url}")
+                    os.remove(path)
+                    # Still scraped now, so discovery's frequency window restarts from this fetch
+                    ledger.mark_scraped([(org, url)])
+                    continue
+                if file_type == "HTML" and "pdf" in content_type.lower():
+                    file_type = "PDF"
+                hashes[(org, url)] = digest
+                extractions.append((url, extract_pool.submit(extract_document, (org, url, file_type, path))))
+
+            for url, future in extractions:
+                try:
+                    org, row = future.result()
+                except Exception as e:
+                    stats["failed"] += 1
+                    print(f"⚠️ Extraction failed for {url}: {e}")
+                    continue
+                rows_by_org.setdefault(org, []).append(row)
+                stats["extracted"] += 1
+
+        for org, rows in rows_by_org.items():
+            path = write_content_csv(org, rows, output_dir)
+            for row in rows:
+                ledger.record_content(org, row["URL"], hashes[(org, row["URL"])])
+            print(f"✅ {org}: {len(rows)} documents written to {path}")
+    finally:
+        ledger.close()
+        session.close()
+
+    print(f"Fetch: {stats['skipped']} not due, {stats['downloaded']} downloaded, {stats['unchanged']} unchanged, "
+          f"{stats['extracted']} extracted, {stats['failed']} failed")
+    return stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Download URLs from generated_urls.csv into output/<org>/content.csv")
+    parser.add_argument("urls_csv", nargs="?", default="generated_urls.csv")
+    parser.add_argument("--output-dir", default=OUTPUT_DIR)
+    parser.add_argument("--download-workers", type=int, default=8)
+    parser.add_argument("--extract-workers", type=int, default=None)
+    parser.add_argument("--frequency-days", type=int, default=FREQUENCY_DAYS,
+                        help="Skip URLs scraped within this many days")
+    parser.add_argument("--force", action="store_true",
+                        help="Fetch and re-extract even if recently scraped or the content hash is unchanged")
+    args = parser.parse_args()
+    fetch_and_extract(args.urls_csv, output_dir=args.output_dir, download_workers=args.download_workers,
+                      extract_workers=args.extract_workers, force=args.force, frequency_days=args.frequency_days)
@@ -0,0 +1,295 @@
+# Matching strategies used by the SDG filtering pipeline.
+# prepare() runs once in the parent process (model loading, keyword extraction,
+# embedding); run_unit() scores one organisation's block of questions and is what
+# the pipeline hands to worker processes.
+
+import numpy as np
+import pandas as pd
+
+from keyword_matcher import compile_keywords
+from keyword_extraction import extract_keywords_cached
+from embedding_cache import EmbeddingCache, CACHE_DIR as EMBEDDING_CACHE_DIR
+from retrieval_engine import GroupedRetriever, normalise_rows, top_k_rows, SIMILARITY_THRESHOLD, TOP_K
+from lexical_index import BM25Index, tokenize, SHORTLIST_SIZE
+from encoding_backend import EncodingBackend, DEFAULT_BATCH_SIZE
+from sentence_dedup import source_pairs
+from sentence_corpus import publication_year
+from instrumentation import telemetry
+
+MODEL_NAME = "all-MiniLM-L6-v2"
+
+RESULT_COLUMNS = [
+    "Filtered Content", "URL", "Page number",
+    "Document Type", "Publication Date", "Last updated Date"
+]
+EMPTY_RESULT = ("", "", "", "", "", "")
+
+
+def parse_publication_dates(values):
+    # Full dates parse as-is; bare or float-formatted years ("2024", "2024.0") become 1 January of that year
+    dates = pd.to_datetime(values, errors="coerce", format="mixed")
+    years = values.map(publication_year)
+    missing = dates.isna() & years.notna()
+    if missing.any():
+        dates[missing] = pd.to_datetime(years[missing].astype(int).astype(str), format="%Y")
+    return dates
+
+
+def join_source_pairs(pairs):
+    # Deduplicated sentences list one aligned URL / page entry per (URL, Page) they appeared on
+    pairs = list(dict.fromkeys(pairs))
+    return " | ".join(u for u, _ in pairs), " | ".join(p for _, p in pairs)
+
+
+class MatchStrategy:
+    # Per-unit counters (sentences scanned/matched) travel back from worker processes via take_stats()
+    name = ""
+
+    def add_stat(self, key, n):
+        stats = self.__dict__.setdefault("stats", {})
+        stats[key] = stats.get(key, 0) + n
+
+    def take_stats(self):
+        return self.__dict__.pop("stats", {})
+
+    def signature(self):
+        # Settings that change the results; checkpointed results are only resumed under the same signature
+        return self.name
+
+
+class KeywordStrategy(MatchStrategy):
+    name = "keywords"
+
+    def prepare(self, questions, sentences):
+        from keybert import KeyBERT
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+        self.index_sentences(sentences)
+
+        # Extract keywords using KeyBERT, once per unique question text (cached across runs)
+        with telemetry.stage("keyword_extraction", questions=len(questions)):
+            kw_model = KeyBERT()
+            questions["Keywords"] = extract_keywords_cached(kw_model, questions["SDG Question"].tolist(),
+                                                            stop_words=list(ENGLISH_STOP_WORDS))
+        self.keywords = questions["Keywords"].tolist()
+
+    def index_sentences(self, sentences):
+        sentences = sentences.copy()
+        sentences["Publication Date"] = parse_publication_dates(sentences["Publication Date"])
+        sentences = sentences.dropna(subset=["Publication Date"])
+        self.sentences_by_org = {org: group for org, group in sentences.groupby("Organization", sort=False)}
+        self._lowered = {}
+
+    def match(self, org, keywords):
+        org_sentences = self.sentences_by_org.get(org)
+        if org_sentences is None or org_sentences.empty:
+            return EMPTY_RESULT
+
+        # Each org's sentences are lowercased once and reused for every question
+        if org not in self._lowered:
+            self._lowered[org] = [sent.lower() for sent in org_sentences["Sentence"]]
+        matcher = compile_keywords(keywords)
+        matched = org_sentences[[matcher.matches(sent) for sent in self._lowered[org]]]
+        self.add_stat("sentences_scanned", len(org_sentences))
+        self.add_stat("sentences_matched", len(matched))
+
+        doc_type, pub_date, last_date = "", "", ""
+        if not matched.empty:
+            first = matched.iloc[0]
+            doc_type = first["Document Type"]
+            pub_date = str(first["Publication Date"])
+            last_date = str(first["Last updated Date"])
+
+        if "Sources" in matched.columns:
+            url_text, page_text = join_source_pairs(source_pairs(matched))
+        else:
+            url_text, page_text = " | ".join(set(matched["URL"])), " | ".join(matched["Page"])
+        return (
+            " | ".join(matched["Sentence"]),
+            url_text,
+            page_text,
+            doc_type,
+            pub_date,
+            last_date
+        )
+
+    def run_unit(self, org, rows):
+        return [self.match(org, self.keywords[row]) for row in rows]
+
+
+class SbertStrategy(MatchStrategy):
+    name = "sbert"
+
+    def __init__(self, model_name=MODEL_NAME, top_k=TOP_K, threshold=SIMILARITY_THRESHOLD, cache_dir=EMBEDDING_CACHE_DIR,
+                 backend="fp32", batch_size=DEFAULT_BATCH_SIZE, encode_workers=1):
+        self.model_name = model_name
+        self.cache_dir = cache_dir
+        self.backend = backend
+        self.batch_size = batch_size
+        self.encode_workers = encode_workers
+        self.top_k = top_k
+        self.threshold = threshold
+        self.model = None
+
+    def signature(self):
+        return f"{self.name}:{self.model_name}@{self.backend}:top_k={self.top_k}:threshold={self.threshold}"
+
+    def __getstate__(self):
+        # Workers only need the precomputed embeddings, never the model itself
+        state = self.__dict__.copy()
+        state["model"] = None
+        return state
+
+    def prepare(self, questions, sentences):
+        cand_df = sentences.copy()
+        cand_df["Publication Date"] = parse_publication_dates(cand_df["Publication Date"])
+
+        # The backend is a drop-in for the model's encode(); each variant has its own cache
+        self.model = EncodingBackend(self.model_name, self.backend, self.batch_size, self.encode_workers)
+        embedding_cache = EmbeddingCache(self.model.cache_name, self.cache_dir)
+        with telemetry.stage("embed_sentences", sentences=len(cand_df)) as record:
+            embeddings = embedding_cache.encode(self.model, cand_df["Sentence"].tolist())
+            record.update(cached=embedding_cache.hits, encoded=embedding_cache.misses)
+        print(f"Embeddings: {embedding_cache.hits} cached, {embedding_cache.misses} newly encoded")
+        if embedding_cache.misses and record["wall_s"]:
+            telemetry.event("embedding_throughput", model=self.model.cache_name,
+                            sentences_per_s=round(embedding_cache.misses / record["wall_s"], 1))
+        self.retriever = GroupedRetriever(cand_df, embeddings)
+        self._embed_questions(questions)
+        self.model.close()
+
+    def _embed_questions(self, questions):
+        # Every question of every goal is encoded in one batch
+        question_texts = questions["SDG Question"].astype(str).tolist()
+        with telemetry.stage("embed_questions", questions=len(question_texts)):
+            self.query_embeddings = normalise_rows(self.model.encode(question_texts, convert_to_numpy=True)) \
+                if question_texts else None
+
+    def unit_hits(self, org, rows):
+        # [(score, row), ...] per question row, rows indexing self.retriever.cand_df
+        start, stop = self.retriever.slices.get(org, (0, 0))
+        self.add_stat("sentences_scanned", (stop - start) * len(rows))
+        return self.retriever.search_block(self.query_embeddings[list(rows)], org, self.top_k, self.threshold)
+
+    def run_unit(self, org, rows):
+        results = []
+        for hits in self.unit_hits(org, rows):
+            self.add_stat("sentences_matched", len(hits))
+            if not hits:
+                results.append(EMPTY_RESULT)
+                continue
+            sents, pages, urls, types, pubs, lasts = self.retriever.format_hits(hits)
+            if self.retriever.has_sources:
+                url_text, page_text = join_source_pairs(zip(urls, pages))
+            else:
+                url_text, page_text = " | ".join(set(urls)), " | ".join(set(pages))
+            results.append((
+                " | ".join(sents),
+                url_text,
+                page_text,
+                types[0] if types else "",
+                pubs[0] if pubs else "",
+                lasts[0] if lasts else ""
+            ))
+        return results
+
+
+class CascadeStrategy(SbertStrategy):
+    # BM25 shortlists a few hundred of the org's sentences per question and only those are
+    # embedded (memoised in the shared embedding cache) and reranked, so encoding work grows
+    # with the number of questions rather than with the corpus
+    name = "cascade"
+
+    def __init__(self, *args, shortlist_size=SHORTLIST_SIZE, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.shortlist_size = shortlist_size
+
+    def signature(self):
+        return f"{super().signature()}:shortlist={self.shortlist_size}"
+
+    def prepare(self, questions, sentences):
+        cand_df = sentences.copy()
+        cand_df["Publication Date"] = parse_publication_dates(cand_df["Publication Date"])
+        self.retriever = GroupedRetriever(cand_df)
+        texts = self.retriever.cand_df["Sentence"].to_numpy()
+
+        with telemetry.stage("bm25_index", sentences=len(texts)):
+            index = BM25Index(texts, self.retriever.slices)
+        with telemetry.stage("bm25_shortlist", questions=len(questions)) as record:
+            tokens = {}
+            self.shortlists = []
+            fallbacks = 0
+            for text, org in zip(questions["SDG Question"].astype(str), questions["Organization"]):
+                if text not in tokens:
+                    tokens[text] = tokenize(text)
+                shortlist = index.shortlist(org, tokens[text], self.shortlist_size)
+                if not len(shortlist) and org in self.retriever.slices:
+                    # No term overlap with the org: rerank its whole slice, as the full scan would,
+                    # so the question still gets its best-match fallback
+                    shortlist = np.arange(*self.retriever.slices[org])
+                    fallbacks += 1
+                self.shortlists.append(shortlist)
+            self.vector_rows = np.unique(np.concatenate(self.shortlists)) if self.shortlists \
+                else np.empty(0, dtype=np.int64)
+            record.update(candidates=len(self.vector_rows), full_slice_fallbacks=fallbacks)
+
+        self.model = EncodingBackend(self.model_name, self.backend, self.batch_size, self.encode_workers)
+        embedding_cache = EmbeddingCache(self.model.cache_name, self.cache_dir)
+        with telemetry.stage("embed_sentences", sentences=len(self.vector_rows), corpus=len(texts)) as record:
+            self.vectors = normalise_rows(embedding_cache.encode(self.model, texts[self.vector_rows].tolist())) \
+                if len(self.vector_rows) else np.empty((0, 0), dtype=np.float32)
+            record.update(cached=embedding_cache.hits, encoded=embedding_cache.misses)
+        print(f"Cascade: {len(self.vector_rows)} of {len(texts)} sentences shortlisted "
+              f"({fallbacks} questions fell back to their org's full slice); "
+              f"{embedding_cache.hits} cached, {embedding_cache.misses} newly encoded")
+        self._embed_questions(questions)
+        self.model.close()
+
+    def unit_hits(self, org, rows):
+        hits = []
+        for row in rows:
+            shortlist = self.shortlists[row]
+            self.add_stat("sentences_scanned", len(shortlist))
+            if not len(shortlist):
+                hits.append([])
+                continue
+            vectors = self.vectors[np.searchsorted(self.vector_rows, shortlist)]
+            scores = (vectors @ self.query_embeddings[row])[None, :]
+            hits.append([(s, int(shortlist[i])) for s, i in top_k_rows(scores, self.top_k, self.threshold)[0]])
+        return hits
+
+
+def cascade_recall(questions, sentences, full=None, cascade=None):
+    # Recall of the cascade's top-k against the full-scan top-k, per question, on the same corpus
+    full = full or SbertStrategy()
+    cascade = cascade or CascadeStrategy()
+    full.prepare(questions, sentences)
+    cascade.prepare(questions, sentences)
+    recalls, tie_recalls, exact = [], [], 0
+    for org, rows in questions.groupby("Organization", sort=False).indices.items():
+        for full_hits, cascade_hits in zip(full.unit_hits(org, rows), cascade.unit_hits(org, rows)):
+            expected = {i for _, i in full_hits}
+            found = {i for _, i in cascade_hits}
+            if expected:
+                recalls.append(len(expected & found) / len(expected))
+                # Equally similar sentences are interchangeable: count any hit scoring at least the full scan's k-th
+                cutoff = min(score for score, _ in full_hits) - 1e-6
+                tie_recalls.append(min(1.0, sum(score >= cutoff for score, _ in cascade_hits) / len(expected)))
+                # Questions the full scan finds nothing for would match trivially, so they don't count
+                exact += expected == found
+    return {
+        "questions": len(questions),
+        f"recall_at_{full.top_k}": round(float(np.mean(recalls)), 4) if recalls else None,
+        f"tie_aware_recall_at_{full.top_k}": round(float(np.mean(tie_recalls)), 4) if tie_recalls else None,
+        "identical_hit_sets": round(exact / len(recalls), 4) if recalls else None,
+        "sentences_in_corpus": len(full.retriever.cand_df),
+        "sentences_embedded_by_cascade": len(cascade.vector_rows),
+        "shortlist_size": cascade.shortlist_size,
+    }
+
+
+STRATEGIES = {
+    KeywordStrategy.name: KeywordStrategy,
+    SbertStrategy.name: SbertStrategy,
+    CascadeStrategy.name: CascadeStrategy,
+}
@@ -0,0 +1,180 @@
+# Shared instrumentation for discovery, reference loading, filtering and the UI.
+# stage() records wall time, CPU time and peak memory for a block of work, count()
+# keeps labelled counters (API calls per org, sentences scanned/matched, ...) and
+# every record is appended to a JSON-lines log. Raw API payloads are only logged when
+# verbose logging is switched on (SWA_VERBOSE=1 or configure(verbose=True)).
+#
+# Environment: SWA_TELEMETRY_LOG (log path, "" disables the log), SWA_VERBOSE,
+# SWA_TRACE_MEMORY (trace Python allocations for exact per-stage peaks).
+
+import os
+import json
+import time
+import threading
+import contextlib
+import tracemalloc
+from datetime import datetime
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+TELEMETRY_LOG = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "telemetry.jsonl")
+
+
+def _env_flag(name):
+    return os.environ.get(name, "").strip().lower() in ("1", "true", "yes", "on")
+
+
+def _max_rss_mb():
+    if resource is None:
+        return None
+    rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # ru_maxrss is kilobytes on Linux and bytes on macOS
+    return round(rss / (2 ** 20 if os.uname().sysname == "Darwin" else 2 ** 10), 1)
+
+
+class Telemetry:
+    def __init__(self, log_path=TELEMETRY_LOG, verbose=False, trace_memory=False):
+        self.log_path = log_path
+        self.verbose = verbose
+        self.trace_memory = trace_memory
+        self.run_id = f"{datetime.now():%Y%m%d-%H%M%S}-{os.getpid()}"
+        self.stages = {}
+        self.counters = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+
+    def _write(self, record):
+        if not self.log_path:
+            return
+        record = {"ts": datetime.now().isoformat(timespec="milliseconds"), "run": self.run_id, **record}
+        line = json.dumps(record, ensure_ascii=False, default=str)
+        with self._lock:
+            os.makedirs(os.path.dirname(os.path.abspath(self.log_path)), exist_ok=True)
+            with open(self.log_path, "a", encoding="utf-8") as f:
+                f.write(line + "\n")
+
+    def event(self, kind, **fields):
+        self._write({"type": kind, **fields})
+
+    def payload(self, kind, **fields):
+        # Full request/response bodies: large, so only logged in verbose mode
+        if self.verbose:
+            self._write({"type": kind, **fields})
+
+    def count(self, name, n=1, **labels):
+        key = (name, tuple(sorted(labels.items())))
+        with self._lock:
+            self.counters[key] = self.counters.get(key, 0) + n
+
+    def counter(self, name, **labels):
+        # Total for `name`, optionally restricted to counters carrying the given labels
+        wanted = set(labels.items())
+        with self._lock:
+            return sum(v for (n, l), v in self.counters.items() if n == name and wanted <= set(l))
+
+    @contextlib.contextmanager
+    def stage(self, name, **fields):
+        # Fields set on the yielded dict (e.g. item counts) are written with the timings
+        stack = getattr(self._local, "stack", None)
+        if stack is None:
+            stack = self._local.stack = []
+        started_tracing = False
+        if self.trace_memory and not tracemalloc.is_tracing():
+            tracemalloc.start()
+            started_tracing = True
+        # Peaks are only tracked when asked for, so an outside tracemalloc user's peak is left alone
+        tracing = self.trace_memory and tracemalloc.is_tracing()
+        if tracing:
+            if stack:
+                stack[-1]["peak"] = max(stack[-1]["peak"], tracemalloc.get_traced_memory()[1])
+            tracemalloc.reset_peak()
+        frame = {"peak": 0}
+        stack.append(frame)
+        record = dict(fields)
+        wall, cpu = time.perf_counter(), time.process_time()
+        status = "ok"
+        try:
+            yield record
+        except BaseException as e:
+            status = f"error: {type(e).__name__}"
+            raise
+        finally:
+            wall, cpu = time.perf_counter() - wall, time.process_time() - cpu
+            stack.pop()
+            peak_mb = None
+            if tracing:
+                frame["peak"] = max(frame["peak"], tracemalloc.get_traced_memory()[1])
+                peak_mb = round(frame["peak"] / 2 ** 20, 2)
+                if stack:
+                    stack[-1]["peak"] = max(stack[-1]["peak"], frame["peak"])
+                tracemalloc.reset_peak()
+            if started_tracing:
+                tracemalloc.stop()
+            record.update({"wall_s": round(wall, 4), "cpu_s": round(cpu, 4), "peak_mb": peak_mb,
+                           "max_rss_mb": _max_rss_mb(), "status": status})
+            with self._lock:
+                summary = self.stages.setdefault(name, {"calls": 0, "wall_s": 0.0, "cpu_s": 0.0, "peak_mb": None})
+                summary["calls"] += 1
+                summary["wall_s"] += wall
+                summary["cpu_s"] += cpu
+                if peak_mb is not None:
+                    summary["peak_mb"] = max(summary["peak_mb"] or 0, peak_mb)
+            self._write({"type": "stage", "stage": name, **record})
+
+    def summary(self):
+        lines = [f"{'stage':<28} {'calls':>6} {'wall s':>10} {'cpu s':>10} {'peak MB':>9}"]
+        with self._lock:
+            stages = dict(self.stages)
+            counters = dict(self.counters)
+        for name, s in stages.items():
+            peak = f"{s['peak_mb']:.1f}" if s["peak_mb"] is not None else "-"
+            lines.append(f"{name:<28} {s['calls']:>6} {s['wall_s']:>10.3f} {s['cpu_s']:>10.3f} {peak:>9}")
+        if counters:
+            totals = {}
+            for (name, _), value in counters.items():
+                totals[name] = totals.get(name, 0) + value
+            lines.append("")
+            lines.append(f"{'counter':<28} {'total':>10}")
+            lines.extend(f"{name:<28} {value:>10}" for name, value in totals.items())
+        rss = _max_rss_mb()
+        if rss is not None:
+            lines.append(f"\nmax RSS: {rss:.1f} MB")
+        return "\n".join(lines)
+
+    def flush_counters(self):
+        # Write the labelled counters to the log (e.g. at the end of a run)
+        with self._lock:
+            counters = dict(self.counters)
+        for (name, labels), value in counters.items():
+            self._write({"type": "counter", "name": name, "value": value, **dict(labels)})
+
+    def reset(self):
+        with self._lock:
+            self.stages = {}
+            self.counters = {}
+
+
+telemetry = Telemetry(
+    log_path=os.environ.get("SWA_TELEMETRY_LOG", TELEMETRY_LOG),
+    verbose=_env_flag("SWA_VERBOSE"),
+    trace_memory=_env_flag("SWA_TRACE_MEMORY"),
+)
+
+
+def configure(log_path=None, verbose=None, trace_memory=None):
+    if log_path is not None:
+        telemetry.log_path = log_path
+    if verbose is not None:
+        telemetry.verbose = verbose
+    if trace_memory is not None:
+        telemetry.trace_memory = trace_memory
+    return telemetry
+
+
+def print_summary():
+    telemetry.flush_counters()
+    print("📊 Run summary")
+    print(telemetry.summary())
@@ -0,0 +1,72 @@
+# Memoised, batched KeyBERT keyword extraction for SDG questions.
+# The same question text repeats for every organisation, so keywords are extracted
+# once per unique text in a single batched call and persisted in a JSON cache keyed
+# by the text and the extraction parameters.
+
+import os
+import json
+import hashlib
+
+KEYWORD_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "keywords.json")
+
+NGRAM_RANGE = (1, 3)
+USE_MMR = True
+DIVERSITY = 0.5
+TOP_N = 6
+
+
+def _params_key(ngram_range, use_mmr, diversity, top_n, stop_words):
+    stop_digest = hashlib.sha1("\n".join(sorted(stop_words or [])).encode("utf-8")).hexdigest()[:12]
+    return f"ngram={ngram_range[0]}-{ngram_range[1]}|mmr={int(use_mmr)}|diversity={diversity}|top_n={top_n}|stop={stop_digest}"
+
+
+def cache_key(text, params_key):
+    return hashlib.sha1(f"{params_key}\n{str(text).strip()}".encode("utf-8")).hexdigest()
+
+
+def load_keyword_cache(path=KEYWORD_CACHE_PATH):
+    if not os.path.exists(path):
+        return {}
+    try:
+        with open(path, "r", encoding="utf-8") as f:
+            return json.load(f)
+    except (OSError, ValueError) as e:
+        print(f"⚠️ Ignoring unreadable keyword cache {path}: {e}")
+        return {}
+
+
+def save_keyword_cache(cache, path=KEYWORD_CACHE_PATH):
+    os.makedirs(os.path.dirname(path), exist_ok=True)
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(cache, f, ensure_ascii=False)
+    os.replace(tmp_path, path)
+
+
+def extract_keywords_cached(kw_model, texts, stop_words=None, ngram_range=NGRAM_RANGE, use_mmr=USE_MMR,
+                            diversity=DIVERSITY, top_n=TOP_N, cache_path=KEYWORD_CACHE_PATH):
+    # Return one keyword list per input text, running KeyBERT only for texts not yet cached
+    texts = [str(t) for t in texts]
+    params_key = _params_key(ngram_range, use_mmr, diversity, top_n, stop_words)
+    cache = load_keyword_cache(cache_path)
+
+    keys = {t: cache_key(t, params_key) for t in dict.fromkeys(texts)}
+    missing = [t for t, k in keys.items() if k not in cache]
+    if missing:
+        extracted = kw_model.extract_keywords(
+            missing,
+            keyphrase_ngram_range=ngram_range,
+            stop_words=stop_words,
+            use_mmr=use_mmr,
+            diversity=diversity,
+            top_n=top_n
+        )
+        # KeyBERT unwraps the result when a single document is passed
+        if len(missing) == 1:
+            extracted = [extracted]
+        for text, keywords in zip(missing, extracted):
+            cache[keys[text]] = [kw[0] for kw in keywords]
+        save_keyword_cache(cache, cache_path)
+
+    print(f"Keywords: {len(keys) - len(missing)} cached, {len(missing)} extracted for {len(texts)} questions")
+    return [cache[keys[t]] for t in texts]
@@ -0,0 +1,57 @@
+# Compiled multi-keyword matcher for the keyword filter.
+# All keywords of a set are folded into one regex so each (already lowercased)
+# sentence is scanned once, instead of once per keyword with a fresh .lower().
+
+import re
+from functools import lru_cache
+
+
+class KeywordMatcher:
+    def __init__(self, keywords):
+        # Same semantics as `k.lower() in sentence.lower()`: plain substrings, no word boundaries
+        self.keywords = sorted({str(k).lower() for k in keywords if str(k).strip()}, key=lambda k: (-len(k), k))
+        if self.keywords:
+            alternation = "|".join(re.escape(k) for k in self.keywords)
+            self._any = re.compile(alternation)
+            # Zero-width lookahead so overlapping keywords at later offsets are still reported
+            self._all = re.compile(f"(?=({alternation}))")
+        else:
+            self._any = self._all = None
+        # Keywords that are prefixes of a longer keyword start at the same offset and would be
+        # shadowed by the longest alternative, so they are expanded from the longer hit
+        self._prefixes = {
+            k: [p for p in self.keywords if p != k and k.startswith(p)]
+            for k in self.keywords
+        }
+
+    def __bool__(self):
+        return bool(self.keywords)
+
+    def matches(self, sentence_lower):
+        return self._any is not None and self._any.search(sentence_lower) is not None
+
+    def find(self, sentence_lower):
+        # Return [(keyword, start, end), ...] for every keyword occurrence in the sentence
+        if self._all is None:
+            return []
+        hits = []
+        for m in self._all.finditer(sentence_lower):
+            start = m.start()
+            longest = m.group(1)
+            hits.append((longest, start, start + len(longest)))
+            for prefix in self._prefixes[longest]:
+                hits.append((prefix, start, start + len(prefix)))
+        return hits
+
+    def matched_keywords(self, sentence_lower):
+        return sorted({kw for kw, _, _ in self.find(sentence_lower)})
+
+
+@lru_cache(maxsize=1024)
+def _compile(keyword_set):
+    return KeywordMatcher(keyword_set)
+
+
+def compile_keywords(keywords):
+    # Questions repeat across organisations, so identical keyword sets share one compiled matcher
+    return _compile(frozenset(str(k).lower() for k in keywords))
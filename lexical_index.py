@@ -0,0 +1,88 @@
+# BM25 inverted index over the segmented sentences, used as the first stage of the
+# cascade retrieval mode. Sentences arrive in GroupedRetriever order (each organisation
+# is one contiguous row range), postings are kept sorted by row, so an org's slice of
+# any posting list is found with a binary search and scored with BM25 statistics
+# (document frequency, average length) of that organisation alone.
+
+import re
+import numpy as np
+
+TOKEN_PATTERN = re.compile(r"[a-z0-9]+")
+SHORTLIST_SIZE = 300
+BM25_K1 = 1.5
+BM25_B = 0.75
+
+# Common English function words; they carry no signal for shortlisting and have huge postings
+STOP_WORDS = frozenset("""
+a about above after again against all also am an and any are as at be because been before being below
+between both but by can could did do does doing down during each few for from further had has have having
+he her here hers him his how i if in into is it its itself just me more most my no nor not of off on once
+only or other our ours out over own same she should so some such than that the their theirs them then there
+these they this those through to too under until up very was we were what when where which while who whom
+why will with would you your yours
+""".split())
+
+
+def tokenize(text):
+    return [t for t in TOKEN_PATTERN.findall(str(text).lower()) if t not in STOP_WORDS and len(t) > 1]
+
+
+class BM25Index:
+    def __init__(self, texts, slices, k1=BM25_K1, b=BM25_B):
+        # texts: sentences in row order; slices: {group: (start, stop)} contiguous row ranges
+        self.k1 = k1
+        self.b = b
+        self.slices = slices
+        postings = {}
+        doc_len = np.zeros(len(texts), dtype=np.float32)
+        for row, text in enumerate(texts):
+            tokens = tokenize(text)
+            doc_len[row] = len(tokens)
+            counts = {}
+            for token in tokens:
+                counts[token] = counts.get(token, 0) + 1
+            for token, tf in counts.items():
+                postings.setdefault(token, []).append((row, tf))
+        self.doc_len = doc_len
+        self.postings = {}
+        for token, entries in postings.items():
+            entry_array = np.asarray(entries, dtype=np.int64)
+            self.postings[token] = (entry_array[:, 0], entry_array[:, 1].astype(np.float32))
+        self.avg_len = {g: float(doc_len[s:e].mean()) if e > s else 0.0 for g, (s, e) in slices.items()}
+
+    def __len__(self):
+        return len(self.doc_len)
+
+    def scores(self, group, query_tokens):
+        # BM25 scores for every row of the group, as (start, scores array)
+        start, stop = self.slices.get(group, (0, 0))
+        scores = np.zeros(stop - start, dtype=np.float32)
+        if stop == start:
+            return start, scores
+        n_docs = stop - start
+        avg_len = self.avg_len[group] or 1.0
+        for token in set(query_tokens):
+            posting = self.postings.get(token)
+            if posting is None:
+                continue
+            rows, tfs = posting
+            lo, hi = np.searchsorted(rows, (start, stop))
+            if lo == hi:
+                continue
+            local = rows[lo:hi] - start
+            tf = tfs[lo:hi]
+            df = hi - lo
+            idf = np.log1p((n_docs - df + 0.5) / (df + 0.5))
+            norm = self.k1 * (1 - self.b + self.b * self.doc_len[rows[lo:hi]] / avg_len)
+            scores[local] += idf * tf * (self.k1 + 1) / (tf + norm)
+        return start, scores
+
+    def shortlist(self, group, query, size=SHORTLIST_SIZE):
+        # Global row indices of the best `size` lexical matches in the group, best first
+        tokens = query if isinstance(query, list) else tokenize(query)
+        start, scores = self.scores(group, tokens)
+        candidates = np.flatnonzero(scores)
+        if len(candidates) > size:
+            candidates = candidates[np.argpartition(-scores[candidates], size - 1)[:size]]
+        candidates = candidates[np.argsort(-scores[candidates], kind="stable")]
+        return candidates + start
@@ -1,38 +1,171 @@
 import os
 import json
 import re
+from concurrent.futures import ProcessPoolExecutor
+
+from instrumentation import telemetry
+
+# Directories with more JSON files than this are parsed on a process pool
+PARALLEL_THRESHOLD = 64
+
+_NAME_SUFFIXES = {"group", "limited", "ltd", "pty", "inc", "plc", "co", "company", "corporation", "corp", "holdings"}
+
+
+def extract_industry(file_name):
+    match = re.search(r"ANZSIC_([A-Z])_(.+?)_2025", file_name)
+    if match:
+        division = f"Division {match.group(1)}"
+        industry = match.group(2).replace("_", " ").replace(",", "").replace("&", "and").title()
+        return division, industry
+    return "", "Unknown"
+
+
+def _load_org_file(path):
+    # Return [{"organisation_name", "division", "industry"}, ...] for one ANZSIC JSON file
+    with open(path, "r", encoding="utf-8") as f:
+        raw = f.read().strip()
+        raw = raw.removeprefix("```json").removesuffix("```").strip()
+
+    # strict=False tolerates raw newlines the generator sometimes leaves inside names
+    data = json.loads(raw, strict=False)
+    division, industry = extract_industry(os.path.basename(path))
+
+    orgs = []
+    for entry in data.get("data", []):
+        name = (entry.get("organisation_name") or "").strip()
+        if name:
+            orgs.append({
+                "organisation_name": name,
+                "division": division,
+                "industry": industry
+            })
+    return orgs
+
+
+def _safe_load_org_file(path):
+    try:
+        return _load_org_file(path), None
+    except Exception as e:
+        return [], f"⚠️ Skipping {os.path.basename(path)}: {e}"
+
 
 def extract_orgs_from_json(json_dir):
     org_data = []
 
-    def extract_industry(file_name):
-        match = re.search(r"ANZSIC_([A-Z])_(.+?)_2025", file_name)
-        if match:
-            division = f"Division {match.group(1)}"
-            industry = match.group(2).replace("_", " ").replace(",", "").replace("&", "and").title()
-            return division, industry
-        return "", "Unknown"
-
-    for file in os.listdir(json_dir):
-        if file.endswith(".json"):
-            try:
-                with open(os.path.join(json_dir, file), "r", encoding="utf-8") as f:
-                    raw = f.read().strip()
-                    raw = raw.removeprefix("```json").removesuffix("```").strip()
-
-                    data = json.loads(raw)
-                    division, industry = extract_industry(file)
-
-                    for entry in data.get("data", []):
-                        name = entry.get("organisation_name")
-                        if name:
-                            org_data.append({
-                                "organisation_name": name,
-                                "division": division,
-                                "industry": industry
-                            })
-            except Exception as e:
-                print(f"⚠️ Skipping {file}: {e}")
+    files = [os.path.join(json_dir, file) for file in os.listdir(json_dir) if file.endswith(".json")]
+    with telemetry.stage("load_org_json", files=len(files)) as record:
+        if len(files) > PARALLEL_THRESHOLD:
+            with ProcessPoolExecutor() as pool:
+                results = list(pool.map(_safe_load_org_file, files, chunksize=16))
+        else:
+            results = [_safe_load_org_file(path) for path in files]
+
+        for orgs, error in results:
+            if error:
+                print(error)
+                telemetry.count("org_json_errors")
+            org_data.extend(orgs)
+        record["orgs"] = len(org_data)
 
     return org_data
 
+
+def normalise_org_name(name):
+    # "BHP Group Limited", "BHP" and "bhp (bhp.com)" all normalise to "bhp"
+    text = re.sub(r"\([^)]*\)", " ", name.lower()).replace("&", " and ")
+    tokens = re.findall(r"[a-z0-9]+", text)
+    while len(tokens) > 1 and tokens[-1] in _NAME_SUFFIXES:
+        tokens.pop()
+    if len(tokens) > 1 and tokens[0] == "the":
+        tokens = tokens[1:]
+    return " ".join(tokens) or name.strip().lower()
+
+
+class OrgRecord:
+    __slots__ = ("organisation_name", "key", "aliases", "divisions", "industries")
+
+    def __init__(self, organisation_name, key):
+        self.organisation_name = organisation_name
+        self.key = key
+        self.aliases = [organisation_name]
+        self.divisions = []
+        self.industries = []
+
+    def __repr__(self):
+        return f"OrgRecord({self.organisation_name!r}, divisions={self.divisions})"
+
+    def to_dict(self, division=None):
+        # Shape expected by url_general_adapter.generate_urls; uses the requested division when given
+        i = self.divisions.index(division) if division in self.divisions else 0
+        return {
+            "organisation_name": self.organisation_name,
+            "division": self.divisions[i] if self.divisions else "",
+            "industry": self.industries[i] if self.industries else "",
+        }
+
+
+class OrgRegistry:
+    # Deduplicated organisations with precomputed division, industry and normalised-name indexes
+    def __init__(self, org_dicts=()):
+        self.records = []
+        self._by_name = {}
+        self._by_division = {}
+        self._by_industry = {}
+        for org in org_dicts:
+            self.add(org["organisation_name"], org.get("division", ""), org.get("industry", ""))
+
+    @classmethod
+    def from_json_dir(cls, json_dir):
+        return cls(extract_orgs_from_json(json_dir))
+
+    def add(self, name, division="", industry=""):
+        name = name.strip()
+        key = normalise_org_name(name)
+        record = self._by_name.get(key)
+        if record is None:
+            record = OrgRecord(name, key)
+            self._by_name[key] = record
+            self.records.append(record)
+        elif name not in record.aliases:
+            record.aliases.append(name)
+        if division not in record.divisions:
+            record.divisions.append(division)
+            record.industries.append(industry)
+            self._by_division.setdefault(division, []).append(record)
+            self._by_industry.setdefault(industry.lower(), []).append(record)
+        return record
+
+    def __len__(self):
+        return len(self.records)
+
+    def __iter__(self):
+        return iter(self.records)
+
+    def lookup(self, name):
+        return self._by_name.get(normalise_org_name(name))
+
+    def divisions(self):
+        return list(self._by_division)
+
+    def by_division(self, divisions):
+        if isinstance(divisions, str):
+            divisions = [divisions]
+        seen, matched = set(), []
+        for division in divisions:
+            for record in self._by_division.get(division, []):
+                if record.key not in seen:
+                    seen.add(record.key)
+                    matched.append(record)
+        return matched
+
+    def by_industry(self, industry):
+        return list(self._by_industry.get(industry.lower(), []))
+
+    def orgs_for_divisions(self, divisions):
+        # Plain dicts for generate_urls, each tagged with the first selected division it belongs to
+        if isinstance(divisions, str):
+            divisions = [divisions]
+        return [
+            record.to_dict(next(d for d in divisions if d in record.divisions))
+            for record in self.by_division(divisions)
+        ]
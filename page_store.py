@@ -0,0 +1,196 @@
+# Page-addressable compressed storage for scraped document content.
+# A content.pages file holds one zlib blob per page (plus any text before the first
+# page marker) followed by a compressed JSON offset index and a fixed-size footer.
+# Readers mmap the file and decompress only the pages they ask for, so fetching one
+# page of a 250-page report never touches the rest of the document.
+
+import os
+import re
+import csv
+import sys
+import json
+import mmap
+import zlib
+import struct
+import argparse
+
+OUTPUT_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "output")
+
+PAGE_PATTERN = re.compile(r"===== PAGE (\d+) =====")
+CONTENT_COLUMNS = ["URL", "Date Collected", "File Type", "Page Count", "Publication Date", "Raw Content"]
+
+STORE_NAME = "content.pages"
+MAGIC = b"SWAPAGE1"
+FOOTER = struct.Struct("<QQ8s")
+COMPRESSION_LEVEL = 6
+
+
+def split_pages(raw):
+    # Return (preamble, [(page_label, page_text), ...]) such that join_pages() restores raw exactly
+    markers = list(PAGE_PATTERN.finditer(raw))
+    if not markers:
+        return raw, []
+    pages = []
+    for i, m in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(raw)
+        pages.append((m.group(1), raw[m.end():end]))
+    return raw[:markers[0].start()], pages
+
+
+def join_pages(preamble, pages):
+    return preamble + "".join(f"===== PAGE {label} =====" + text for label, text in pages)
+
+
+def write_page_store(documents, path):
+    # documents: iterable of dicts with the content.csv columns
+    index = []
+    tmp_path = f"{path}.tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(MAGIC)
+
+        def put(text):
+            blob = zlib.compress(text.encode("utf-8"), COMPRESSION_LEVEL)
+            offset = f.tell()
+            f.write(blob)
+            return [offset, len(blob)]
+
+        for doc in documents:
+            preamble, pages = split_pages(str(doc.get("Raw Content", "")))
+            entry = {c: str(doc.get(c, "")) for c in CONTENT_COLUMNS if c != "Raw Content"}
+            entry["preamble"] = put(preamble)
+            entry["pages"] = [[label] + put(text) for label, text in pages]
+            index.append(entry)
+
+        index_blob = zlib.compress(json.dumps({"documents": index}, ensure_ascii=False).encode("utf-8"))
+        index_offset = f.tell()
+        f.write(index_blob)
+        f.write(FOOTER.pack(index_offset, len(index_blob), MAGIC))
+    os.replace(tmp_path, path)
+    return len(index)
+
+
+class PageStore:
+    def __init__(self, path):
+        self.path = path
+        self._file = open(path, "rb")
+        try:
+            self._map = mmap.mmap(self._file.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            self._file.close()
+            raise ValueError(f"{path} is empty, not a page store")
+        if self._map[:len(MAGIC)] != MAGIC or len(self._map) < len(MAGIC) + FOOTER.size:
+            self.close()
+            raise ValueError(f"{path} is not a page store")
+        index_offset, index_length, magic = FOOTER.unpack(self._map[-FOOTER.size:])
+        if magic != MAGIC:
+            self.close()
+            raise ValueError(f"{path} has a truncated footer")
+        index = json.loads(zlib.decompress(self._map[index_offset:index_offset + index_length]))
+        self.documents = index["documents"]
+        # Later rows win, matching how re-scrapes are appended to content.csv
+        self._by_url = {doc["URL"]: i for i, doc in enumerate(self.documents)}
+        self._pages = [{label: (off, length) for label, off, length in doc["pages"]} for doc in self.documents]
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def __len__(self):
+        return len(self.documents)
+
+    def close(self):
+        if getattr(self, "_map", None) is not None:
+            self._map.close()
+            self._map = None
+        self._file.close()
+
+    def _blob(self, offset, length):
+        return zlib.decompress(self._map[offset:offset + length]).decode("utf-8")
+
+    def _doc_index(self, doc):
+        if isinstance(doc, int):
+            return doc
+        if doc not in self._by_url:
+            raise KeyError(f"No document with URL {doc!r} in {self.path}")
+        return self._by_url[doc]
+
+    def page_numbers(self, doc):
+        return [label for label, _, _ in self.documents[self._doc_index(doc)]["pages"]]
+
+    def page(self, doc, page_number):
+        # doc is a URL or a document position; page_number is the label from the page marker
+        pages = self._pages[self._doc_index(doc)]
+        label = str(page_number)
+        if label not in pages:
+            raise KeyError(f"Page {page_number} not found in {doc!r}")
+        return self._blob(*pages[label])
+
+    def iter_pages(self, doc):
+        for label, offset, length in self.documents[self._doc_index(doc)]["pages"]:
+            yield label, self._blob(offset, length)
+
+    def raw_content(self, doc):
+        entry = self.documents[self._doc_index(doc)]
+        return join_pages(self._blob(*entry["preamble"]), self.iter_pages(doc))
+
+    def iter_documents(self, latest_only=False):
+        # Yield full content.csv-style rows, one document at a time
+        for i, entry in enumerate(self.documents):
+            if latest_only and self._by_url[entry["URL"]] != i:
+                continue
+            row = {c: entry.get(c, "") for c in CONTENT_COLUMNS if c != "Raw Content"}
+            row["Raw Content"] = self.raw_content(i)
+            yield row
+
+
+def read_content_csv(csv_path):
+    csv.field_size_limit(min(sys.maxsize, 2 ** 31 - 1))
+    with open(csv_path, "r", encoding="utf-8", newline="") as f:
+        reader = csv.DictReader(f)
+        reader.fieldnames = [c.strip() for c in reader.fieldnames or []]
+        for row in reader:
+            yield row
+
+
+def pack_content_csv(csv_path, store_path=None):
+    store_path = store_path or os.path.join(os.path.dirname(csv_path), STORE_NAME)
+    return write_page_store(read_content_csv(csv_path), store_path)
+
+
+def export_content_csv(store_path, csv_path=None):
+    # Write the store back out in the existing content.csv layout
+    csv_path = csv_path or os.path.join(os.path.dirname(store_path), "content.csv")
+    with PageStore(store_path) as store, open(csv_path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CONTENT_COLUMNS, quoting=csv.QUOTE_ALL)
+        writer.writeheader()
+        for row in store.iter_documents():
+            writer.writerow(row)
+    return csv_path
+
+
+def pack_output_dir(output_dir=OUTPUT_DIR):
+    for org in sorted(os.listdir(output_dir)):
+        csv_path = os.path.join(output_dir, org, "content.csv")
+        if os.path.isfile(csv_path):
+            count = pack_content_csv(csv_path)
+            print(f"📦 {org}: {count} documents packed into {STORE_NAME}")
+
+
+def export_output_dir(output_dir=OUTPUT_DIR):
+    for org in sorted(os.listdir(output_dir)):
+        store_path = os.path.join(output_dir, org, STORE_NAME)
+        if os.path.isfile(store_path):
+            print(f"📄 {org}: exported to {export_content_csv(store_path)}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Pack output/<org>/content.csv into page stores, or export them back")
+    parser.add_argument("command", choices=["pack", "export"])
+    parser.add_argument("output_dir", nargs="?", default=OUTPUT_DIR)
+    args = parser.parse_args()
+    if args.command == "pack":
+        pack_output_dir(args.output_dir)
+    else:
+        export_output_dir(args.output_dir)
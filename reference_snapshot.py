@@ -0,0 +1,96 @@
+# Compiled snapshot of the reference data SWA_UI needs at startup: every sheet of
+# options.xlsx as (Value, Label) pairs and the organisation list from the ANZSIC JSON
+# files. The snapshot is reused while source sizes/mtimes are unchanged; if only mtimes
+# moved, content hashes decide whether a rebuild is really needed.
+
+import os
+import json
+import hashlib
+
+from loadjson import extract_orgs_from_json
+
+SNAPSHOT_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "reference_snapshot.json")
+SNAPSHOT_VERSION = 2
+
+
+def _source_files(options_path, json_dir):
+    files = [options_path]
+    if os.path.isdir(json_dir):
+        files.extend(os.path.join(json_dir, f) for f in sorted(os.listdir(json_dir)) if f.endswith(".json"))
+    return files
+
+
+def _stat_fingerprint(files):
+    fingerprint = {}
+    for path in files:
+        st = os.stat(path)
+        fingerprint[os.path.basename(path)] = [st.st_size, st.st_mtime_ns]
+    return fingerprint
+
+
+def _hash_fingerprint(files):
+    hashes = {}
+    for path in files:
+        with open(path, "rb") as f:
+            hashes[os.path.basename(path)] = hashlib.sha1(f.read()).hexdigest()
+    return hashes
+
+
+def read_options(options_path):
+    import pandas as pd
+
+    options = {}
+    xls = pd.ExcelFile(options_path)
+    for sheet_name in xls.sheet_names:
+        df = pd.read_excel(xls, sheet_name=sheet_name)
+        df.columns = df.columns.str.strip()
+        if "Value" not in df.columns or "Label" not in df.columns:
+            continue
+        options[sheet_name] = [[str(v), str(l)] for v, l in zip(df["Value"], df["Label"])]
+    return options
+
+
+def build_snapshot(options_path, json_dir, files=None):
+    files = files or _source_files(options_path, json_dir)
+    return {
+        "version": SNAPSHOT_VERSION,
+        "stat": _stat_fingerprint(files),
+        "hashes": _hash_fingerprint(files),
+        "options": read_options(options_path),
+        "orgs": extract_orgs_from_json(json_dir),
+    }
+
+
+def _write_snapshot(snapshot, snapshot_path):
+    os.makedirs(os.path.dirname(snapshot_path), exist_ok=True)
+    tmp_path = f"{snapshot_path}.tmp"
+    with open(tmp_path, "w", encoding="utf-8") as f:
+        json.dump(snapshot, f, ensure_ascii=False, separators=(",", ":"))
+    os.replace(tmp_path, snapshot_path)
+
+
+def load_reference_data(options_path, json_dir, snapshot_path=SNAPSHOT_PATH):
+    # Return {"options": {sheet: [[value, label], ...]}, "orgs": [...]}, rebuilding only when sources changed
+    files = _source_files(options_path, json_dir)
+    snapshot = None
+    if os.path.exists(snapshot_path):
+        try:
+            with open(snapshot_path, "r", encoding="utf-8") as f:
+                snapshot = json.load(f)
+        except (OSError, ValueError):
+            snapshot = None
+
+    if snapshot and snapshot.get("version") == SNAPSHOT_VERSION:
+        stat = _stat_fingerprint(files)
+        if snapshot["stat"] == stat:
+            return snapshot
+        if snapshot["hashes"] == _hash_fingerprint(files):
+            # Touched but identical files: refresh the stat fingerprint and keep the compiled data
+            snapshot["stat"] = stat
+            _write_snapshot(snapshot, snapshot_path)
+            return snapshot
+
+    print("🔄 Rebuilding reference data snapshot")
+    snapshot = build_snapshot(options_path, json_dir, files)
+    _write_snapshot(snapshot, snapshot_path)
+    return snapshot
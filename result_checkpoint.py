@@ -0,0 +1,89 @@
+# Checkpointed result store for the SDG filtering pipeline.
+# Every (SDG goal, organisation) unit's result rows are committed to a SQLite file in
+# the output directory as soon as the unit finishes, keyed by (goal, Organization,
+# SDG Ques ID). A rerun after a crash skips the completed pairs and only filters the
+# rest. Only the main process writes, so parallel workers cannot interleave output.
+# When all of a goal's questions are in, its CSV is rebuilt in question order from the
+# store and swapped into place atomically; the checkpoint is removed after a full run.
+
+import os
+import json
+import sqlite3
+import hashlib
+import pandas as pd
+
+CHECKPOINT_NAME = "filter_checkpoint.sqlite"
+QUESTION_ID_COLUMN = "SDG Ques ID"
+
+
+def question_keys(questions, goal):
+    # (goal, organisation, question id) per row; the question text stands in when there is no id column
+    ids = questions[QUESTION_ID_COLUMN] if QUESTION_ID_COLUMN in questions else questions["SDG Question"]
+    return list(zip(goal.astype(str), questions["Organization"].astype(str), ids.astype(str)))
+
+
+def run_signature(strategy_signature, dedup, keys, recency="", corpus=""):
+    # Results are only resumed for the same strategy settings, corpus state and selection, and question list
+    digest = hashlib.sha1("\n".join("\t".join(k) for k in keys).encode("utf-8")).hexdigest()
+    return f"{strategy_signature}|dedup={dedup}|recency={recency}|corpus={corpus}|questions={digest}"
+
+
+class ResultCheckpoint:
+    def __init__(self, path, signature):
+        self.path = path
+        os.makedirs(os.path.dirname(os.path.abspath(path)), exist_ok=True)
+        self._conn = sqlite3.connect(path)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS meta (key TEXT PRIMARY KEY, value TEXT)")
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " position INTEGER PRIMARY KEY, goal TEXT NOT NULL, org TEXT NOT NULL, ques_id TEXT NOT NULL,"
+            " row TEXT NOT NULL)"
+        )
+        stored = self._conn.execute("SELECT value FROM meta WHERE key='signature'").fetchone()
+        if stored is not None and stored[0] != signature:
+            print("⚠️ Checkpoint belongs to a different run (strategy, dedup, corpus or questions changed); starting over")
+            self._conn.execute("DELETE FROM results")
+        self._conn.execute("INSERT OR REPLACE INTO meta VALUES ('signature', ?)", (signature,))
+        self._conn.commit()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        self._conn.close()
+
+    def clear(self):
+        self._conn.execute("DELETE FROM results")
+        self._conn.commit()
+
+    def completed(self):
+        return set(self._conn.execute("SELECT goal, org, ques_id FROM results"))
+
+    def __len__(self):
+        return self._conn.execute("SELECT COUNT(*) FROM results").fetchone()[0]
+
+    def record(self, positions, keys, rows):
+        # One transaction per unit: a crash leaves either all of the unit's rows or none
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR REPLACE INTO results VALUES (?, ?, ?, ?, ?)",
+                [(int(pos), *key, json.dumps(row, ensure_ascii=False, default=str))
+                 for pos, key, row in zip(positions, keys, rows)])
+
+    def goal_frame(self, goal):
+        rows = self._conn.execute("SELECT row FROM results WHERE goal=? ORDER BY position", (str(goal),))
+        return pd.DataFrame.from_records([json.loads(r) for r, in rows])
+
+    def write_goal(self, goal, path):
+        frame = self.goal_frame(goal)
+        tmp_path = path + ".tmp"
+        frame.to_csv(tmp_path, index=False)
+        os.replace(tmp_path, path)
+        return len(frame)
+
+    def discard(self):
+        self.close()
+        os.remove(self.path)
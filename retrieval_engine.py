@@ -0,0 +1,128 @@
+# Batched semantic retrieval over the candidate sentence table.
+# Candidates are reordered so each organisation's embeddings form one contiguous,
+# pre-normalised slice; every org's question block is then scored with one matrix
+# multiply and reduced with a partial top-k instead of a full sort.
+
+import numpy as np
+import pandas as pd
+
+SIMILARITY_THRESHOLD = 0.4
+TOP_K = 8
+
+RESULT_COLUMNS = ["Page", "Sentence", "URL", "Document Type", "Publication Date", "Last updated Date"]
+
+
+def normalise_rows(matrix):
+    matrix = np.asarray(matrix, dtype=np.float32)
+    norms = np.linalg.norm(matrix, axis=1, keepdims=True)
+    return matrix / np.maximum(norms, 1e-12)
+
+
+def top_k_rows(scores, top_k, threshold):
+    # For each query row return [(score, candidate_idx), ...] best first.
+    # Rows with nothing above threshold fall back to their single best candidate.
+    n_cands = scores.shape[1]
+    if n_cands == 0:
+        return [[] for _ in range(scores.shape[0])]
+    k = min(top_k, n_cands)
+    if k < n_cands:
+        part = np.argpartition(-scores, k - 1, axis=1)[:, :k]
+    else:
+        part = np.broadcast_to(np.arange(n_cands), scores.shape)
+    part_scores = np.take_along_axis(scores, part, axis=1)
+    order = np.argsort(-part_scores, axis=1, kind="stable")
+    best_idx = np.take_along_axis(part, order, axis=1)
+    best_scores = np.take_along_axis(part_scores, order, axis=1)
+
+    results = []
+    for idx_row, score_row in zip(best_idx, best_scores):
+        keep = score_row >= threshold
+        if keep.any():
+            results.append([(float(s), int(i)) for s, i in zip(score_row[keep], idx_row[keep])])
+        else:
+            results.append([(float(score_row[0]), int(idx_row[0]))])
+    return results
+
+
+class GroupedRetriever:
+    def __init__(self, cand_df, embeddings=None, group_col="Organization"):
+        # Without embeddings only the org slices and hit formatting are available (cascade mode)
+        codes, groups = pd.factorize(cand_df[group_col], sort=False)
+        order = np.argsort(codes, kind="stable")
+        self.cand_df = cand_df.iloc[order].reset_index(drop=True)
+        self.embeddings = None if embeddings is None else \
+            np.ascontiguousarray(normalise_rows(np.asarray(embeddings)[order]))
+
+        sorted_codes = codes[order]
+        bounds = np.searchsorted(sorted_codes, np.arange(len(groups) + 1))
+        self.slices = {g: (int(bounds[i]), int(bounds[i + 1])) for i, g in enumerate(groups)}
+        self._columns = {c: self.cand_df[c].to_numpy() for c in RESULT_COLUMNS + ["Sources"]
+                         if c in self.cand_df.columns}
+
+    @property
+    def has_sources(self):
+        return "Sources" in self._columns
+
+    def search_block(self, query_embeddings, org, top_k=TOP_K, threshold=SIMILARITY_THRESHOLD):
+        # Score a block of normalised query embeddings against one org; indices are global rows
+        if org not in self.slices:
+            return [[] for _ in range(len(query_embeddings))]
+        start, stop = self.slices[org]
+        scores = query_embeddings @ self.embeddings[start:stop].T
+        return [[(s, start + i) for s, i in row] for row in top_k_rows(scores, top_k, threshold)]
+
+    def format_hits(self, hits):
+        cols = self._columns
+        sentences, pages, urls, types, pubs, lasts = [], [], [], [], [], []
+        for _, idx in hits:
+            sentences.append(f"[Page {cols['Page'][idx]}] {cols['Sentence'][idx]}")
+            if "Sources" in cols:
+                # Deduplicated sentence: one aligned URL / page entry per place it appeared
+                for url, page in cols["Sources"][idx]:
+                    urls.append(url)
+                    pages.append(str(page))
+            else:
+                pages.append(str(cols["Page"][idx]))
+                urls.append(cols["URL"][idx])
+            types.append(cols["Document Type"][idx])
+            pubs.append(str(cols["Publication Date"][idx]))
+            lasts.append(str(cols["Last updated Date"][idx]))
+        return sentences, pages, urls, types, pubs, lasts
+
+    def hit_records(self, hits):
+        # One dict per hit (score, sentence, page, URLs, dates) for callers that want structured results
+        cols = self._columns
+        records = []
+        for score, idx in hits:
+            sources = list(cols["Sources"][idx]) if "Sources" in cols else [(cols["URL"][idx], cols["Page"][idx])]
+            urls = list(dict.fromkeys(url for url, _ in sources))
+            records.append({
+                "score": round(float(score), 4),
+                "sentence": str(cols["Sentence"][idx]),
+                "page": str(cols["Page"][idx]),
+                "url": urls[0] if urls else "",
+                "urls": urls,
+                "sources": [[url, str(page)] for url, page in sources],
+                "document_type": str(cols["Document Type"][idx]),
+                "publication_date": str(cols["Publication Date"][idx]),
+                "last_updated": str(cols["Last updated Date"][idx]),
+            })
+        return records
+
+    def retrieve(self, model, questions, orgs, top_k=TOP_K, threshold=SIMILARITY_THRESHOLD):
+        # Encode every question in one batch, then score each org's question block at once
+        questions = list(questions)
+        orgs = list(orgs)
+        if not questions:
+            return []
+        query_embeddings = normalise_rows(model.encode(questions, convert_to_numpy=True))
+
+        rows_by_org = {}
+        for row, org in enumerate(orgs):
+            rows_by_org.setdefault(org, []).append(row)
+
+        hits = [None] * len(questions)
+        for org, rows in rows_by_org.items():
+            for row, row_hits in zip(rows, self.search_block(query_embeddings[rows], org, top_k, threshold)):
+                hits[row] = row_hits
+        return [self.format_hits(h) for h in hits]
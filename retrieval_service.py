@@ -0,0 +1,196 @@
+# Long-lived retrieval service for interactive SDG question lookups.
+# Loads the segmented corpus, the SentenceTransformer and every sentence embedding once
+# (through the shared embedding cache) and keeps them in memory, so a lookup only
+# encodes the question and scores one organisation's slice. Recent queries are kept in
+# a small LRU cache. Nothing is loaded until load() or start() is called; a failed load
+# is only retried on the next explicit call. Used in-process by SWA_UI; run this module
+# to serve the same lookups over a local HTTP endpoint:
+#   GET /search?org=<organisation>&q=<question>[&k=<top k>]  -> top-k sentences as JSON
+#                                                               (503 until the index is ready)
+#   GET /orgs, GET /health
+
+import json
+import time
+import argparse
+import threading
+from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import urlparse, parse_qs
+
+from sentence_corpus import build_corpus, positive_int, OUTPUT_DIR, CORPUS_DIR
+from sentence_dedup import dedup_sentences, DEDUP_MODES
+from embedding_cache import EmbeddingCache, CACHE_DIR as EMBEDDING_CACHE_DIR
+from encoding_backend import EncodingBackend, BACKENDS
+from retrieval_engine import GroupedRetriever, normalise_rows, SIMILARITY_THRESHOLD, TOP_K
+from filter_strategies import MODEL_NAME
+from instrumentation import telemetry
+
+QUERY_CACHE_SIZE = 256
+SERVICE_PORT = 8770
+
+
+class RetrievalService:
+    def __init__(self, content_dir=OUTPUT_DIR, corpus_dir=CORPUS_DIR, model_name=MODEL_NAME, backend="fp32",
+                 dedup="near", top_k=TOP_K, threshold=SIMILARITY_THRESHOLD, cache_dir=EMBEDDING_CACHE_DIR,
+                 cache_size=QUERY_CACHE_SIZE, latest_years=None):
+        self.content_dir = content_dir
+        self.corpus_dir = corpus_dir
+        self.model_name = model_name
+        self.backend = backend
+        self.dedup = dedup
+        self.top_k = top_k
+        self.threshold = threshold
+        self.cache_dir = cache_dir
+        self.cache_size = cache_size
+        self.latest_years = latest_years
+        self.status = "Not loaded"
+        self.model = None
+        self.retriever = None
+        self._cache = OrderedDict()
+        self._load_lock = threading.Lock()
+        self._encode_lock = threading.Lock()
+        self._cache_lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._future = None
+
+    @property
+    def ready(self):
+        return self.retriever is not None
+
+    def load(self):
+        # Idempotent; concurrent callers wait for the first load
+        with self._load_lock:
+            if self.ready:
+                return self
+            self.status = "Loading"
+            try:
+                with telemetry.stage("retrieval_service_load") as record:
+                    corpus = build_corpus(self.content_dir, self.corpus_dir)
+                    sentences = corpus.load_sentences(latest_years=self.latest_years)
+                    sentences, _ = dedup_sentences(sentences, self.dedup)
+                    model = EncodingBackend(self.model_name, self.backend)
+                    embedding_cache = EmbeddingCache(model.cache_name, self.cache_dir)
+                    embeddings = embedding_cache.encode(model, sentences["Sentence"].tolist())
+                    self.retriever = GroupedRetriever(sentences, embeddings)
+                    self.model = model
+                    record.update(sentences=len(sentences), orgs=len(self.retriever.slices),
+                                  cached=embedding_cache.hits, encoded=embedding_cache.misses)
+            except Exception as e:
+                self.status = f"Failed: {e}"
+                raise
+            self.status = f"Ready: {len(sentences)} sentences from {len(self.retriever.slices)} organizations"
+            print(f"🔎 Retrieval service {self.status.lower()}")
+        return self
+
+    @property
+    def loading(self):
+        return self._future is not None and not self._future.done()
+
+    def start(self):
+        # Load in a background thread so a UI can come up straight away; calling again after a failed load retries it
+        with self._start_lock:
+            if self._future is None or (self._future.done() and not self.ready):
+                executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix="retrieval-load")
+                self._future = executor.submit(self.load)
+                executor.shutdown(wait=False)
+        return self._future
+
+    def orgs(self):
+        return sorted(self.retriever.slices) if self.ready else []
+
+    def query(self, org, question, top_k=None):
+        # Top-k sentences for one (organisation, question text); returns (hits, from_cache)
+        question = " ".join(str(question).split())
+        top_k = int(top_k or self.top_k)
+        key = (org, question, top_k)
+        with self._cache_lock:
+            if key in self._cache:
+                self._cache.move_to_end(key)
+                telemetry.count("retrieval_cache_hits")
+                return self._cache[key], True
+        if not self.ready:
+            raise RuntimeError(f"Evidence index is not loaded ({self.status})")
+        with self._encode_lock:
+            query_vec = normalise_rows(self.model.encode([question]))
+        hits = self.retriever.search_block(query_vec, org, top_k, self.threshold)[0]
+        records = self.retriever.hit_records(hits)
+        telemetry.count("retrieval_queries")
+        with self._cache_lock:
+            self._cache[key] = records
+            while len(self._cache) > self.cache_size:
+                self._cache.popitem(last=False)
+        return records, False
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def _send(self, status, body):
+        payload = json.dumps(body, ensure_ascii=False).encode("utf-8")
+        self.send_response(status)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def do_GET(self):
+        service = self.server.service
+        url = urlparse(self.path)
+        params = parse_qs(url.query)
+        if url.path == "/health":
+            self._send(200, {"ready": service.ready, "status": service.status})
+        elif url.path == "/orgs":
+            self._send(200, {"orgs": service.orgs()})
+        elif url.path == "/search":
+            org = params.get("org", [""])[0]
+            question = params.get("q", [""])[0]
+            if not org or not question:
+                self._send(400, {"error": "Both 'org' and 'q' are required"})
+                return
+            try:
+                top_k = int(params.get("k", [service.top_k])[0])
+            except ValueError:
+                self._send(400, {"error": "'k' must be an integer"})
+                return
+            if not service.ready:
+                self._send(503, {"error": "Evidence index is not ready", "status": service.status})
+                return
+            start = time.perf_counter()
+            try:
+                hits, cached = service.query(org, question, top_k)
+            except Exception as e:
+                self._send(500, {"error": str(e)})
+                return
+            self._send(200, {"org": org, "question": question, "cached": cached,
+                             "ms": round(1000 * (time.perf_counter() - start), 1), "hits": hits})
+        else:
+            self._send(404, {"error": "Not found"})
+
+
+def serve_http(service, host="127.0.0.1", port=SERVICE_PORT):
+    # Serve lookups in a daemon thread; returns (server, base_url) — call server.shutdown() when done
+    server = ThreadingHTTPServer((host, port), _Handler)
+    server.service = service
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    return server, f"http://{host}:{server.server_address[1]}"
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Serve warm SDG evidence lookups over local HTTP")
+    parser.add_argument("--port", type=int, default=SERVICE_PORT)
+    parser.add_argument("--backend", choices=BACKENDS, default="fp32", help="SBERT encoding backend")
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default="near")
+    parser.add_argument("--top-k", type=int, default=TOP_K)
+    parser.add_argument("--latest-years", type=positive_int, default=None,
+                        help="Only index documents from each organization's latest N publication years")
+    args = parser.parse_args()
+    service = RetrievalService(backend=args.backend, dedup=args.dedup, top_k=args.top_k,
+                               latest_years=args.latest_years).load()
+    server, base_url = serve_http(service, port=args.port)
+    print(f"Retrieval service listening on {base_url}/search?org=...&q=...")
+    try:
+        threading.Event().wait()
+    except KeyboardInterrupt:
+        server.shutdown()
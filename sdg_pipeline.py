@@ -0,0 +1,226 @@
+# Unified SDG filtering pipeline.
+# Loads the segmented corpus and the matching model once for any set of SDG question
+# files (or all 17 goals), spreads the (SDG goal, organisation) work units over a
+# process pool and writes one sdg<N>_questions_with_filtered_content.csv per goal.
+# Unit results are checkpointed as they arrive, so an interrupted run resumes where it stopped.
+
+import os
+import argparse
+import numpy as np
+import pandas as pd
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+from sentence_corpus import build_corpus, positive_int, OUTPUT_DIR, CORPUS_DIR
+from filter_strategies import STRATEGIES, RESULT_COLUMNS, SbertStrategy, CascadeStrategy, cascade_recall
+from lexical_index import SHORTLIST_SIZE
+from sentence_dedup import dedup_sentences, DEDUP_MODES
+from result_checkpoint import ResultCheckpoint, CHECKPOINT_NAME, question_keys, run_signature
+from encoding_backend import BACKENDS, DEFAULT_BATCH_SIZE
+from instrumentation import telemetry, configure, print_summary
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+QUESTION_DIR = os.path.join(BASE_DIR, "SDG Question")
+ALL_GOALS_FILE = os.path.join(QUESTION_DIR, "deduplicated_sdg_questions_by_organization.csv")
+ALL_GOALS = [str(g) for g in range(1, 18)]
+
+
+def output_file_name(goal):
+    return f"sdg{goal}_questions_with_filtered_content.csv"
+
+
+def load_questions(question_files, goals=None):
+    frames = [pd.read_csv(path) for path in question_files]
+    questions = pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+    if questions.empty:
+        return questions, pd.Series(dtype=str)
+    # Blank organisations stay in as "" so their (goal, org) units are not dropped by groupby
+    questions["Organization"] = questions["Organization"].fillna("")
+    goal = questions["SDG Goal"].astype(str).str.extract(r"Goal (\d+)", expand=False)
+    keep = goal.notna() if goals is None else goal.isin(goals)
+    return questions[keep].reset_index(drop=True), goal[keep].reset_index(drop=True)
+
+
+_worker_strategy = None
+
+
+def _init_worker(strategy):
+    global _worker_strategy
+    _worker_strategy = strategy
+
+
+def _run_unit(org, rows):
+    return rows, _worker_strategy.run_unit(org, rows), _worker_strategy.take_stats()
+
+
+def _record_stats(matcher, stats):
+    for key, value in stats.items():
+        telemetry.count(key, value, strategy=matcher.name)
+
+
+def collapse_duplicates(sentences, mode):
+    # Shrink the candidate table before matching/embedding; provenance stays in the Sources column
+    if mode == "off":
+        return sentences
+    with telemetry.stage("dedup", mode=mode) as record:
+        sentences, stats = dedup_sentences(sentences, mode)
+        record.update(stats)
+    print(f"Dedup ({mode}): {stats['sentences']} -> {stats['unique_sentences']} sentences, "
+          f"{stats['pages']} -> {stats['unique_pages']} pages")
+    return sentences
+
+
+def run_pipeline(question_files=None, strategy="keywords", workers=None, output_dir=BASE_DIR, goals=None,
+                 content_dir=OUTPUT_DIR, dedup="off", resume=True, latest_years=None, latest_per_type=False,
+                 corpus_dir=CORPUS_DIR):
+    if not question_files:
+        question_files = [ALL_GOALS_FILE]
+        goals = goals or ALL_GOALS
+    questions, goal = load_questions(question_files, goals)
+    if questions.empty:
+        print("No SDG questions to process.")
+        return []
+    matcher = STRATEGIES[strategy]() if isinstance(strategy, str) else strategy
+
+    # Load the corpus once for every goal; its state is part of the checkpoint signature
+    with telemetry.stage("build_corpus"):
+        corpus = build_corpus(content_dir, corpus_dir)
+
+    # Results stream into a checkpoint unit by unit; a rerun skips the (goal, org, question) pairs already done
+    os.makedirs(output_dir, exist_ok=True)
+    keys = question_keys(questions, goal)
+    checkpoint = ResultCheckpoint(os.path.join(output_dir, CHECKPOINT_NAME),
+                                  run_signature(matcher.signature(), dedup, keys,
+                                                recency=f"{latest_years}:{latest_per_type}",
+                                                corpus=corpus.fingerprint(set(questions["Organization"]))))
+    if not resume:
+        checkpoint.clear()
+    done = checkpoint.completed()
+    pending_mask = np.array([key not in done for key in keys], dtype=bool)
+    positions = np.flatnonzero(pending_mask)
+    if len(positions) < len(questions):
+        print(f"Resuming: {len(questions) - len(positions)} of {len(questions)} questions already filtered")
+    pending = questions[pending_mask].reset_index(drop=True)
+    pending_goal = goal[pending_mask].reset_index(drop=True)
+    remaining = pending_goal.value_counts().to_dict()
+
+    written = []
+
+    def write_goal(goal_id):
+        path = os.path.join(output_dir, output_file_name(goal_id))
+        with telemetry.stage("write_results", goal=goal_id) as record:
+            record["rows"] = checkpoint.write_goal(goal_id, path)
+        written.append(path)
+        print(f"SDG {goal_id} filtered content saved to: {path}")
+
+    def store(goal_id, rows, unit_results):
+        records = pending.iloc[rows].to_dict("records")
+        for record, result in zip(records, unit_results):
+            record.update(zip(RESULT_COLUMNS, result))
+        checkpoint.record(positions[rows], [keys[p] for p in positions[rows]], records)
+        telemetry.count("questions_answered", sum(1 for r in unit_results if r[0]), strategy=matcher.name)
+        remaining[goal_id] -= len(rows)
+        if remaining[goal_id] == 0:
+            write_goal(goal_id)
+
+    with checkpoint:
+        if not pending.empty:
+            with telemetry.stage("load_sentences") as record:
+                sentences = corpus.load_sentences(set(pending["Organization"]), latest_years, latest_per_type)
+                record.update(sentences=len(sentences), documents=sentences["URL"].nunique())
+            if latest_years is not None or latest_per_type:
+                print(f"Recency filter kept {record['documents']} documents ({len(sentences)} sentences)")
+            sentences = collapse_duplicates(sentences, dedup)
+            with telemetry.stage("prepare", strategy=matcher.name, questions=len(pending)):
+                matcher.prepare(pending, sentences)
+
+            units = pending.groupby([pending_goal, pending["Organization"]], sort=False).indices
+            workers = workers or min(os.cpu_count() or 1, len(units))
+            print(f"Filtering {len(pending)} questions over {len(units)} (SDG, organization) units "
+                  f"with {matcher.name} on {workers} worker(s)")
+
+            with telemetry.stage("filter", strategy=matcher.name, units=len(units), workers=workers):
+                if workers <= 1:
+                    for (goal_id, org), rows in units.items():
+                        store(goal_id, rows, matcher.run_unit(org, rows))
+                    _record_stats(matcher, matcher.take_stats())
+                else:
+                    with ProcessPoolExecutor(max_workers=workers, initializer=_init_worker,
+                                             initargs=(matcher,)) as pool:
+                        futures = {pool.submit(_run_unit, org, rows): goal_id
+                                   for (goal_id, org), rows in units.items()}
+                        for future in as_completed(futures):
+                            rows, unit_results, stats = future.result()
+                            store(futures[future], rows, unit_results)
+                            _record_stats(matcher, stats)
+
+        # Goals finished in an earlier run still get their output written
+        for goal_id in goal.unique():
+            if goal_id not in remaining:
+                write_goal(goal_id)
+    checkpoint.discard()
+    return written
+
+
+def report_cascade_recall(question_files=None, goals=None, content_dir=OUTPUT_DIR, dedup="off", latest_years=None,
+                          latest_per_type=False, corpus_dir=CORPUS_DIR, **strategy_kwargs):
+    # Run the full-scan and cascade SBERT modes on the same questions and compare their top-k hits
+    if not question_files:
+        question_files = [ALL_GOALS_FILE]
+        goals = goals or ALL_GOALS
+    questions, _ = load_questions(question_files, goals)
+    corpus = build_corpus(content_dir, corpus_dir)
+    sentences = corpus.load_sentences(set(questions["Organization"]), latest_years, latest_per_type)
+    sentences = collapse_duplicates(sentences, dedup)
+    shortlist_size = strategy_kwargs.pop("shortlist_size", SHORTLIST_SIZE)
+    report = cascade_recall(questions, sentences, SbertStrategy(**strategy_kwargs),
+                            CascadeStrategy(shortlist_size=shortlist_size, **strategy_kwargs))
+    print("📏 Cascade vs full scan: " + ", ".join(f"{k}={v}" for k, v in report.items()))
+    return report
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Filter scraped content for SDG questions across one or more goals")
+    parser.add_argument("question_files", nargs="*",
+                        help="SDG question CSVs, e.g. 'SDG Question/sdg5_questions.csv' (default: all 17 goals)")
+    parser.add_argument("--strategy", choices=sorted(STRATEGIES), default="keywords")
+    parser.add_argument("--goals", nargs="*", help="Only process these goal numbers")
+    parser.add_argument("--workers", type=int, default=None, help="Worker processes (default: one per CPU)")
+    parser.add_argument("--output-dir", default=BASE_DIR)
+    parser.add_argument("--content-dir", default=OUTPUT_DIR, help="Scraped output/<org>/content.csv folders")
+    parser.add_argument("--corpus-dir", default=CORPUS_DIR, help="Where the segmented sentence corpus is kept")
+    parser.add_argument("--backend", choices=BACKENDS, default="fp32", help="SBERT encoding backend")
+    parser.add_argument("--batch-size", default=str(DEFAULT_BATCH_SIZE), help="SBERT batch size or 'auto'")
+    parser.add_argument("--encode-workers", type=int, default=1, help="SBERT encoding processes")
+    parser.add_argument("--shortlist", type=int, default=SHORTLIST_SIZE, help="Cascade BM25 candidates per question")
+    parser.add_argument("--recall", action="store_true",
+                        help="Report cascade recall against the full SBERT scan instead of writing results")
+    parser.add_argument("--dedup", choices=DEDUP_MODES, default="off",
+                        help="Collapse repeated pages/sentences per organization before matching")
+    parser.add_argument("--latest-years", type=positive_int, default=None,
+                        help="Only use documents from each organization's latest N publication years")
+    parser.add_argument("--latest-per-type", action="store_true",
+                        help="Only use each organization's most recent document of every type")
+    parser.add_argument("--restart", action="store_true",
+                        help="Ignore results checkpointed by an interrupted run and filter everything again")
+    parser.add_argument("--summary", action="store_true", help="Print a per-stage timing and counter table")
+    parser.add_argument("--trace-memory", action="store_true", help="Record exact per-stage peak Python memory")
+    args = parser.parse_args()
+    configure(trace_memory=args.trace_memory or None)
+    strategy = args.strategy
+    batch_size = args.batch_size if args.batch_size == "auto" else int(args.batch_size)
+    sbert_options = {"backend": args.backend, "batch_size": batch_size, "encode_workers": args.encode_workers}
+    if args.recall:
+        report_cascade_recall(args.question_files, args.goals, content_dir=args.content_dir, dedup=args.dedup,
+                              latest_years=args.latest_years, latest_per_type=args.latest_per_type,
+                              corpus_dir=args.corpus_dir, shortlist_size=args.shortlist, **sbert_options)
+        raise SystemExit(0)
+    if strategy == SbertStrategy.name:
+        strategy = SbertStrategy(**sbert_options)
+    elif strategy == CascadeStrategy.name:
+        strategy = CascadeStrategy(shortlist_size=args.shortlist, **sbert_options)
+    run_pipeline(args.question_files, strategy=strategy, workers=args.workers,
+                 output_dir=args.output_dir, goals=args.goals, content_dir=args.content_dir, dedup=args.dedup,
+                 resume=not args.restart, latest_years=args.latest_years, latest_per_type=args.latest_per_type,
+                 corpus_dir=args.corpus_dir)
+    if args.summary:
+        print_summary()
@@ -0,0 +1,106 @@
+# Disk-backed cache of Custom Search responses, keyed by (query, start, year range).
+# Entries expire after a TTL (generate_urls ties it to the Frequency selection) and the
+# table is bounded by least-recently-used eviction, after expired entries are dropped.
+# Hit/miss counters feed the end-of-run report.
+
+import os
+import json
+import time
+import sqlite3
+import threading
+
+SEARCH_CACHE_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "search_cache.sqlite")
+DEFAULT_TTL_DAYS = 30
+DEFAULT_MAX_ENTRIES = 20000
+
+
+class SearchCache:
+    def __init__(self, path=SEARCH_CACHE_PATH, ttl_days=DEFAULT_TTL_DAYS, max_entries=DEFAULT_MAX_ENTRIES):
+        self.path = path
+        self.ttl_seconds = ttl_days * 86400
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.expired = 0
+        self.evicted = 0
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False)
+        self._conn.execute(
+            "CREATE TABLE IF NOT EXISTS responses ("
+            " query TEXT NOT NULL, start INTEGER NOT NULL, year_start INTEGER NOT NULL, year_end INTEGER NOT NULL,"
+            " body TEXT NOT NULL, created REAL NOT NULL, accessed REAL NOT NULL,"
+            " PRIMARY KEY (query, start, year_start, year_end))"
+        )
+        self._conn.execute("CREATE INDEX IF NOT EXISTS responses_accessed ON responses (accessed)")
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def get(self, query, start, year_start, year_end):
+        key = (query, start, year_start, year_end)
+        now = time.time()
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT body, created FROM responses WHERE query=? AND start=? AND year_start=? AND year_end=?", key
+            ).fetchone()
+            if row is None:
+                self.misses += 1
+                return None
+            body, created = row
+            if now - created > self.ttl_seconds:
+                self._conn.execute(
+                    "DELETE FROM responses WHERE query=? AND start=? AND year_start=? AND year_end=?", key)
+                self._conn.commit()
+                self.expired += 1
+                self.misses += 1
+                return None
+            self._conn.execute(
+                "UPDATE responses SET accessed=? WHERE query=? AND start=? AND year_start=? AND year_end=?",
+                (now,) + key)
+            self._conn.commit()
+            self.hits += 1
+        return json.loads(body)
+
+    def put(self, query, start, year_start, year_end, response):
+        now = time.time()
+        with self._lock:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO responses VALUES (?, ?, ?, ?, ?, ?, ?)",
+                (query, start, year_start, year_end, json.dumps(response), now, now))
+            count = self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+            if count > self.max_entries:
+                # Expired entries go first so they never push out live ones
+                count -= self._delete_expired(now)
+            if count > self.max_entries:
+                # Evict least recently used entries beyond the bound
+                cur = self._conn.execute(
+                    "DELETE FROM responses WHERE rowid IN "
+                    "(SELECT rowid FROM responses ORDER BY accessed ASC LIMIT ?)", (count - self.max_entries,))
+                self.evicted += cur.rowcount
+            self._conn.commit()
+
+    def _delete_expired(self, now):
+        # Caller holds the lock and commits
+        cur = self._conn.execute("DELETE FROM responses WHERE created < ?", (now - self.ttl_seconds,))
+        self.expired += cur.rowcount
+        return cur.rowcount
+
+    def purge_expired(self):
+        with self._lock:
+            purged = self._delete_expired(time.time())
+            self._conn.commit()
+            return purged
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute("SELECT COUNT(*) FROM responses").fetchone()[0]
+
+    def report(self):
+        lookups = self.hits + self.misses
+        rate = f"{100 * self.hits / lookups:.0f}%" if lookups else "n/a"
+        return (f"🗄️ Search cache: {self.hits} hits, {self.misses} misses ({rate} hit rate), "
+                f"{self.expired} expired, {self.evicted} evicted, {len(self)} entries stored")
@@ -0,0 +1,179 @@
+# Pooled, rate-limited client for the Google Custom Search JSON API used by url_general_adapter.
+# One requests.Session is shared by every discovery thread, calls are paced by a token
+# bucket sized to the Custom Search quota, and 429/5xx responses are retried with
+# exponential backoff (honouring Retry-After when the server sends it). An optional daily
+# cap is counted per calendar day in SQLite, so it holds across runs and processes.
+
+import os
+import time
+import random
+import sqlite3
+import threading
+from datetime import datetime, date
+
+import requests
+from requests.adapters import HTTPAdapter
+
+from instrumentation import telemetry
+
+CUSTOM_SEARCH_URL = "https://www.googleapis.com/customsearch/v1"
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+SEARCH_QUOTA_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "cache", "search_quota.sqlite")
+
+
+class QuotaExceeded(RuntimeError):
+    pass
+
+
+class DailyQuota:
+    # API calls per calendar day, shared through SQLite by every run and process using the same file
+    def __init__(self, limit, path=SEARCH_QUOTA_PATH):
+        self.limit = limit
+        self._lock = threading.Lock()
+        if path != ":memory:":
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+        self._conn = sqlite3.connect(path, check_same_thread=False, timeout=30)
+        self._conn.execute("CREATE TABLE IF NOT EXISTS quota (day TEXT PRIMARY KEY, calls INTEGER NOT NULL)")
+        self._conn.commit()
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+    def take(self, day=None):
+        # Count one call against `day` (default today); raises QuotaExceeded once the day's limit is used up
+        day = day or date.today().isoformat()
+        with self._lock, self._conn:
+            self._conn.execute("INSERT OR IGNORE INTO quota VALUES (?, 0)", (day,))
+            cur = self._conn.execute("UPDATE quota SET calls = calls + 1 WHERE day=? AND calls < ?", (day, self.limit))
+        if cur.rowcount == 0:
+            raise QuotaExceeded(f"Custom Search daily limit of {self.limit} queries reached for {day}")
+
+    def used(self, day=None):
+        day = day or date.today().isoformat()
+        with self._lock:
+            row = self._conn.execute("SELECT calls FROM quota WHERE day=?", (day,)).fetchone()
+        return row[0] if row else 0
+
+
+class RateLimiter:
+    # Token bucket: `per_minute` calls per minute with bursts up to `burst`, plus an optional daily cap
+    def __init__(self, per_minute=100, burst=10, daily_limit=None, quota_path=SEARCH_QUOTA_PATH):
+        self.rate = per_minute / 60.0
+        self.capacity = max(1, burst)
+        self.daily_limit = daily_limit
+        self.quota = DailyQuota(daily_limit, quota_path) if daily_limit is not None else None
+        self.tokens = float(self.capacity)
+        self.calls = 0
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def close(self):
+        if self.quota is not None:
+            self.quota.close()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = time.monotonic()
+                self.tokens = min(self.capacity, self.tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self.tokens >= 1:
+                    self.tokens -= 1
+                    self.calls += 1
+                    break
+                wait = (1 - self.tokens) / self.rate
+            time.sleep(wait)
+        if self.quota is not None:
+            self.quota.take()
+
+
+class SearchClient:
+    def __init__(self, api_key, cx, base_url=CUSTOM_SEARCH_URL, rate_limiter=None, max_retries=5,
+                 backoff=1.0, max_backoff=60.0, timeout=(5, 30), pool_size=16, session=None, cache=None):
+        self.api_key = api_key
+        self.cache = cache
+        self.cx = cx
+        self.base_url = base_url
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.max_retries = max_retries
+        self.backoff = backoff
+        self.max_backoff = max_backoff
+        self.timeout = timeout
+        self.session = session or requests.Session()
+        adapter = HTTPAdapter(pool_connections=pool_size, pool_maxsize=pool_size)
+        self.session.mount("https://", adapter)
+        self.session.mount("http://", adapter)
+        self.requests_sent = 0
+        self.retries = 0
+        self._lock = threading.Lock()
+
+    def close(self):
+        self.session.close()
+        self.rate_limiter.close()
+
+    def _delay(self, attempt, response=None):
+        retry_after = response.headers.get("Retry-After") if response is not None else None
+        if retry_after and retry_after.isdigit():
+            return min(self.max_backoff, float(retry_after))
+        return min(self.max_backoff, self.backoff * (2 ** attempt)) * (0.5 + random.random() / 2)
+
+    def search_page(self, query, start=1, org=""):
+        # Return the JSON body for one results page, retrying throttled and server errors
+        params = {"key": self.api_key, "cx": self.cx, "q": query, "start": start}
+        for attempt in range(self.max_retries + 1):
+            self.rate_limiter.acquire()
+            with self._lock:
+                self.requests_sent += 1
+            telemetry.count("api_calls", org=org)
+            response = None
+            try:
+                response = self.session.get(self.base_url, params=params, timeout=self.timeout)
+                if response.status_code not in RETRY_STATUSES:
+                    if response.status_code >= 400:
+                        # Bad key/cx or exhausted quota: report it and treat as no results, as before
+                        print(f"⚠️ Search request failed with HTTP {response.status_code} for {query!r}")
+                        telemetry.count("api_errors", org=org, status=response.status_code)
+                    try:
+                        return response.json()
+                    except ValueError:
+                        return {}
+                error = f"HTTP {response.status_code}"
+            except (requests.ConnectionError, requests.Timeout) as e:
+                error = str(e)
+            if attempt == self.max_retries:
+                raise RuntimeError(f"Search failed after {attempt + 1} attempts for {query!r}: {error}")
+            with self._lock:
+                self.retries += 1
+            telemetry.count("api_retries", org=org)
+            time.sleep(self._delay(attempt, response))
+
+    def cached_search_page(self, query, start, year_start, year_end, org=""):
+        if self.cache is not None:
+            response = self.cache.get(query, start, year_start, year_end)
+            if response is not None:
+                telemetry.count("api_cache_hits", org=org)
+                return response
+        response = self.search_page(query, start, org)
+        # Error bodies (bad key, quota exhausted) are never cached
+        if self.cache is not None and "error" not in response:
+            self.cache.put(query, start, year_start, year_end, response)
+        return response
+
+    def iter_pages(self, query, start_year, max_results=100, org=""):
+        # Yield each results page's links in turn, so callers can stop paginating once they have enough.
+        # Same query shape as the original google_search: year keywords appended as OR terms
+        end_year = datetime.now().year
+        year_keywords = " OR ".join(str(y) for y in range(start_year, end_year + 1))
+        full_query = f"{query} {year_keywords}"
+        for start in range(1, max_results, 10):
+            response = self.cached_search_page(full_query, start, start_year, end_year, org)
+            telemetry.payload("api_response", org=org, query=full_query, start=start, response=response)
+            items = response.get("items", [])
+            telemetry.count("api_results", len(items), org=org)
+            yield [item["link"] for item in items]
+            if len(items) < 10:
+                return
+
+    def search(self, query, start_year, max_results=10, org=""):
+        return [link for page in self.iter_pages(query, start_year, max_results, org) for link in page]
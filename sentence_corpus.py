@@ -0,0 +1,279 @@
+# Shared ingestion stage for the filter scripts.
+# Each output/<org>/content.csv document is segmented once into pages and sentences and
+# stored as a per-document columnar shard of (page, start, end) character offsets next to
+# the document text. A ledger keyed by organisation + URL records Date Collected and a
+# content hash, so later runs only re-segment new or changed documents.
+# Documents are also indexed by (organisation, publication year), derived from the ledger
+# whenever it is opened or saved, so loaders can ask for an org's latest N years or most
+# recent report per type and never open the shards of older partitions.
+
+import os
+import re
+import json
+import argparse
+import hashlib
+import numpy as np
+import pandas as pd
+
+from page_store import PAGE_PATTERN, CONTENT_COLUMNS, STORE_NAME, PageStore
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+OUTPUT_DIR = os.path.join(BASE_DIR, "output")
+CORPUS_DIR = os.path.join(BASE_DIR, "cache", "corpus")
+
+SENTENCE_SPLIT = re.compile(r"(?<=[.!?]) +")
+YEAR_PATTERN = re.compile(r"(?<!\d)(19|20)\d{2}(?!\d)")
+
+SENTENCE_COLUMNS = ["Organization", "URL", "Page", "Document Type", "Publication Date", "Last updated Date", "Sentence"]
+
+
+def _clean(value):
+    return "" if pd.isna(value) else str(value)
+
+
+def content_hash(raw):
+    return hashlib.sha1(raw.encode("utf-8")).hexdigest()
+
+
+def publication_year(value):
+    # Publication dates arrive as "2024", "2024.0", "2024-06-30" or blank; None when there is no year
+    match = YEAR_PATTERN.search(str(value))
+    return int(match.group(0)) if match else None
+
+
+def positive_int(value):
+    # argparse type for --latest-years: zero or negative would silently select nothing dated
+    number = int(value)
+    if number < 1:
+        raise argparse.ArgumentTypeError(f"must be at least 1, got {number}")
+    return number
+
+
+def document_id(org, url):
+    return hashlib.sha1(f"{org}\n{url}".encode("utf-8")).hexdigest()
+
+
+def iter_pages(raw):
+    # Yield (page_number, start, end) for the text following each page marker
+    markers = list(PAGE_PATTERN.finditer(raw))
+    for i, m in enumerate(markers):
+        end = markers[i + 1].start() if i + 1 < len(markers) else len(raw)
+        yield int(m.group(1)), m.end(), end
+
+
+def segment_document(raw):
+    # Same split as the filter scripts: pages on the marker, sentences on terminal punctuation
+    pages, starts, ends = [], [], []
+    for page, page_start, page_end in iter_pages(raw):
+        pos = page_start
+        bounds = [(m.start(), m.end()) for m in SENTENCE_SPLIT.finditer(raw, page_start, page_end)]
+        for split_start, split_end in bounds + [(page_end, page_end)]:
+            piece = raw[pos:split_start]
+            lead = len(piece) - len(piece.lstrip())
+            trail = len(piece) - len(piece.rstrip())
+            if lead < len(piece):
+                pages.append(page)
+                starts.append(pos + lead)
+                ends.append(split_start - trail)
+            pos = split_end
+    return (
+        np.asarray(pages, dtype=np.int32),
+        np.asarray(starts, dtype=np.int64),
+        np.asarray(ends, dtype=np.int64),
+    )
+
+
+def _iter_page_store(path):
+    with PageStore(path) as store:
+        yield from store.iter_documents(latest_only=True)
+
+
+def _iter_content_csv(path):
+    df = pd.read_csv(path, dtype=str, keep_default_na=False)
+    df.columns = [c.strip() for c in df.columns]
+    # Re-scrapes of the same URL are appended to content.csv; keep only the latest row
+    if "URL" in df.columns:
+        df = df[~df["URL"].duplicated(keep="last")]
+    yield from df.to_dict("records")
+
+
+def iter_documents(output_dir=OUTPUT_DIR, failed=None):
+    # Stream (organization, document) pairs one org at a time, from content.csv or its
+    # page store, whichever was written more recently. Orgs whose file could not be read
+    # (fully or partly) are added to `failed`
+    for org in sorted(os.listdir(output_dir)):
+        csv_path = os.path.join(output_dir, org, "content.csv")
+        store_path = os.path.join(output_dir, org, STORE_NAME)
+        sources = [p for p in (csv_path, store_path) if os.path.isfile(p)]
+        if not sources:
+            continue
+        path = max(sources, key=os.path.getmtime)
+        reader = _iter_page_store if path == store_path else _iter_content_csv
+        try:
+            for doc in reader(path):
+                yield org, {c: _clean(doc.get(c, "")) for c in CONTENT_COLUMNS}
+        except Exception as e:
+            print(f"⚠️ Skipping {path}: {e}")
+            if failed is not None:
+                failed.add(org)
+
+
+class SentenceCorpus:
+    def __init__(self, corpus_dir=CORPUS_DIR):
+        self.corpus_dir = corpus_dir
+        self.shard_dir = os.path.join(corpus_dir, "shards")
+        self.ledger_path = os.path.join(corpus_dir, "ledger.json")
+        self.ledger = {}
+        if os.path.exists(self.ledger_path):
+            with open(self.ledger_path, "r", encoding="utf-8") as f:
+                self.ledger = json.load(f)
+        self.partitions = self._build_partitions()
+
+    def _shard_paths(self, doc_id):
+        return os.path.join(self.shard_dir, f"{doc_id}.npz"), os.path.join(self.shard_dir, f"{doc_id}.txt")
+
+    def _build_partitions(self):
+        # {org: {year: [doc_id, ...]}}, undated documents under "undated"; years are kept as strings
+        partitions = {}
+        for doc_id, entry in self.ledger.items():
+            year = publication_year(entry.get("publication_date", ""))
+            key = str(year) if year is not None else "undated"
+            partitions.setdefault(entry["org"], {}).setdefault(key, []).append(doc_id)
+        return partitions
+
+    def _save_ledger(self):
+        self.partitions = self._build_partitions()
+        tmp_path = f"{self.ledger_path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(self.ledger, f, ensure_ascii=False)
+        os.replace(tmp_path, self.ledger_path)
+
+    def _write_shard(self, doc_id, raw):
+        pages, starts, ends = segment_document(raw)
+        spans_path, text_path = self._shard_paths(doc_id)
+        with open(text_path, "w", encoding="utf-8", newline="") as f:
+            f.write(raw)
+        np.savez(spans_path, page=pages, start=starts, end=ends)
+        return len(pages)
+
+    def ingest(self, documents, keep_orgs=()):
+        # Segment new/changed documents, keep unchanged shards, drop documents no longer present.
+        # Orgs in keep_orgs were not read completely, so their unseen documents are kept rather than dropped
+        os.makedirs(self.shard_dir, exist_ok=True)
+        stats = {"added": 0, "updated": 0, "unchanged": 0, "removed": 0}
+        ledger = {}
+        for org, doc in documents:
+            doc_id = document_id(org, doc["URL"])
+            if doc_id in ledger:
+                continue
+            raw = doc["Raw Content"]
+            digest = content_hash(raw)
+            entry = self.ledger.get(doc_id)
+            if (entry and entry["date_collected"] == doc["Date Collected"] and entry["content_hash"] == digest
+                    and os.path.exists(self._shard_paths(doc_id)[0])):
+                stats["unchanged"] += 1
+            else:
+                stats["updated" if entry else "added"] += 1
+                entry = {"sentences": self._write_shard(doc_id, raw)}
+            entry.update({
+                "org": org,
+                "url": doc["URL"],
+                "date_collected": doc["Date Collected"],
+                "content_hash": digest,
+                "file_type": doc["File Type"],
+                "page_count": doc["Page Count"],
+                "publication_date": doc["Publication Date"],
+            })
+            ledger[doc_id] = entry
+
+        for doc_id in set(self.ledger) - set(ledger):
+            if self.ledger[doc_id]["org"] in keep_orgs:
+                ledger[doc_id] = self.ledger[doc_id]
+                continue
+            for path in self._shard_paths(doc_id):
+                if os.path.exists(path):
+                    os.remove(path)
+            stats["removed"] += 1
+
+        self.ledger = ledger
+        self._save_ledger()
+        return stats
+
+    def fingerprint(self, orgs=None):
+        # Hash of the ledger entries (content hash, collection and publication dates) of the given orgs,
+        # so results derived from the corpus can tell when it changed underneath them
+        entries = sorted(
+            (doc_id, e["content_hash"], e["date_collected"], e["publication_date"])
+            for doc_id, e in self.ledger.items() if orgs is None or e["org"] in orgs)
+        return hashlib.sha1("\n".join("\t".join(e) for e in entries).encode("utf-8")).hexdigest()
+
+    def documents(self, orgs=None, latest_years=None, latest_per_type=False):
+        # Without a recency filter every document is returned. With one, an org's dated documents published in
+        # the `latest_years` years up to its newest publication year and/or its newest document per file type;
+        # undated documents are only used for orgs that have no dated ones
+        if latest_years is not None and latest_years < 1:
+            raise ValueError(f"latest_years must be at least 1, got {latest_years}")
+        if latest_years is None and not latest_per_type:
+            for doc_id, entry in self.ledger.items():
+                if orgs is None or entry["org"] in orgs:
+                    yield doc_id, entry
+            return
+        for org, years in self.partitions.items():
+            if orgs is not None and org not in orgs:
+                continue
+            dated = sorted((int(y) for y in years if y != "undated"), reverse=True)
+            if latest_years is not None and dated:
+                dated = [y for y in dated if y > dated[0] - latest_years]
+            partitions = [years[str(y)] for y in dated] if dated else [years.get("undated", [])]
+            if latest_per_type:
+                # Newest partition first; within a partition the most recently collected copy wins
+                newest = {}
+                for doc_ids in partitions:
+                    for doc_id in sorted(doc_ids, key=lambda d: self.ledger[d]["date_collected"], reverse=True):
+                        newest.setdefault(self.ledger[doc_id]["file_type"], doc_id)
+                selected = list(newest.values())
+            else:
+                selected = [d for doc_ids in partitions for d in doc_ids]
+            for doc_id in selected:
+                yield doc_id, self.ledger[doc_id]
+
+    def document_text(self, doc_id):
+        with open(self._shard_paths(doc_id)[1], "r", encoding="utf-8", newline="") as f:
+            return f.read()
+
+    def document_spans(self, doc_id):
+        with np.load(self._shard_paths(doc_id)[0]) as spans:
+            return spans["page"], spans["start"], spans["end"]
+
+    def load_sentences(self, orgs=None, latest_years=None, latest_per_type=False):
+        # Materialise the candidate sentence table used by both filter scripts
+        columns = {c: [] for c in SENTENCE_COLUMNS}
+        for doc_id, entry in self.documents(orgs, latest_years, latest_per_type):
+            pages, starts, ends = self.document_spans(doc_id)
+            n = len(pages)
+            if not n:
+                continue
+            raw = self.document_text(doc_id)
+            columns["Organization"].extend([entry["org"]] * n)
+            columns["URL"].extend([entry["url"]] * n)
+            columns["Page"].extend(pages.astype(str).tolist())
+            columns["Document Type"].extend([entry["file_type"]] * n)
+            columns["Publication Date"].extend([entry["publication_date"]] * n)
+            columns["Last updated Date"].extend([entry["date_collected"]] * n)
+            columns["Sentence"].extend(raw[s:e] for s, e in zip(starts.tolist(), ends.tolist()))
+        return pd.DataFrame(columns, columns=SENTENCE_COLUMNS)
+
+
+def build_corpus(output_dir=OUTPUT_DIR, corpus_dir=CORPUS_DIR):
+    corpus = SentenceCorpus(corpus_dir)
+    failed = set()
+    stats = corpus.ingest(iter_documents(output_dir, failed), keep_orgs=failed)
+    print(f"Corpus: {stats['added']} added, {stats['updated']} updated, "
+          f"{stats['unchanged']} unchanged, {stats['removed']} removed documents")
+    if failed:
+        print(f"⚠️ Kept the previously ingested documents of {len(failed)} organization(s) that could not be read")
+    return corpus
+
+
+if __name__ == "__main__":
+    build_corpus()
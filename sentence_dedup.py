@@ -0,0 +1,157 @@
+# Per-organisation collapsing of repeated boilerplate before matching or embedding.
+# Annual, sustainability and climate reports of the same organisation repeat whole pages
+# and paragraphs. Pages whose normalised text is identical are collapsed first, then
+# sentences with the same normalised text, then (in "near" mode) sentences whose 64-bit
+# SimHash fingerprints differ in at most a few bits. Each kept sentence carries a
+# Sources tuple with every (URL, Page) it appeared on, so no provenance is lost.
+
+import re
+import hashlib
+import numpy as np
+import pandas as pd
+
+from sentence_corpus import publication_year
+
+DEDUP_MODES = ("off", "exact", "near")
+MAX_HAMMING = 3
+MIN_NEAR_TOKENS = 6
+_BANDS = 4  # MAX_HAMMING + 1 bands of 16 bits: near pairs always share one band exactly
+_BIT_SHIFTS = np.arange(64, dtype=np.uint64)
+_NON_WORD = re.compile(r"[^a-z0-9]+")
+
+
+def normalise_text(text):
+    return _NON_WORD.sub(" ", str(text).lower()).strip()
+
+
+def _mix64(values):
+    # splitmix64 finaliser: spreads combined token hashes over all 64 bits
+    values = values ^ (values >> np.uint64(30))
+    values = values * np.uint64(0xBF58476D1CE4E5B9)
+    values = values ^ (values >> np.uint64(27))
+    values = values * np.uint64(0x94D049BB133111EB)
+    return values ^ (values >> np.uint64(31))
+
+
+class SimHasher:
+    # 64-bit SimHash over word bigrams. Tokens are hashed in bulk with pandas' fixed-key
+    # hash (stable across runs) and bigram hashes are derived from token hashes in numpy.
+    def fingerprints(self, token_lists):
+        # One fingerprint per token list; every list needs at least two tokens
+        if not token_lists:
+            return []
+        lengths = np.fromiter((len(t) for t in token_lists), dtype=np.int64, count=len(token_lists))
+        tokens = np.fromiter((tok for t in token_lists for tok in t), dtype=object, count=int(lengths.sum()))
+        flat = pd.util.hash_array(tokens, categorize=True)
+        ends = np.cumsum(lengths)
+        # Bigram (i, i+1) is valid unless token i is the last of its sentence
+        valid = np.ones(len(flat) - 1, dtype=bool)
+        valid[ends[:-1] - 1] = False
+        shingles = _mix64(flat[:-1][valid] * np.uint64(0x9E3779B97F4A7C15) ^ flat[1:][valid])
+        starts = np.concatenate(([0], np.cumsum(lengths - 1)[:-1]))
+        # A fingerprint bit is set when most of the sentence's shingles have that bit set
+        shingle_bits = np.unpackbits(shingles.view(np.uint8).reshape(-1, 8), axis=1, bitorder="little")
+        ones = np.add.reduceat(shingle_bits, starts, axis=0, dtype=np.int32)
+        bits = (ones * 2 > (lengths - 1)[:, None]).astype(np.uint64) << _BIT_SHIFTS
+        return [int(v) for v in np.bitwise_or.reduce(bits, axis=1)]
+
+
+def _find(parent, i):
+    while parent[i] != i:
+        parent[i] = parent[parent[i]]
+        i = parent[i]
+    return i
+
+
+def near_duplicate_groups(fingerprints, max_distance=MAX_HAMMING):
+    # Union-find over fingerprints that share a 16-bit band and are within max_distance bits
+    parent = list(range(len(fingerprints)))
+    for band in range(_BANDS):
+        buckets = {}
+        for i, fp in enumerate(fingerprints):
+            if fp is not None:
+                buckets.setdefault((fp >> (16 * band)) & 0xFFFF, []).append(i)
+        for members in buckets.values():
+            for x in range(len(members)):
+                for y in range(x + 1, len(members)):
+                    a, b = members[x], members[y]
+                    if bin(fingerprints[a] ^ fingerprints[b]).count("1") <= max_distance:
+                        ra, rb = _find(parent, a), _find(parent, b)
+                        if ra != rb:
+                            parent[max(ra, rb)] = min(ra, rb)
+    return [_find(parent, i) for i in range(len(fingerprints))]
+
+
+def _dedup_org(group, mode, max_distance, min_near_tokens, hasher, stats):
+    urls = group["URL"].to_numpy()
+    pages = group["Page"].to_numpy()
+    texts = group["Sentence"].to_numpy()
+    normalised = [normalise_text(t) for t in texts]
+
+    # Identical pages: keep the first copy's sentences, remember every (URL, Page) it came from
+    page_rows = {}
+    for i, key in enumerate(zip(urls, pages)):
+        page_rows.setdefault(key, []).append(i)
+    page_owner = {}
+    canonical_page = {}
+    for key, rows in page_rows.items():
+        digest = hashlib.sha1("\n".join(normalised[i] for i in rows).encode("utf-8")).digest()
+        page_owner[key] = canonical_page.setdefault(digest, key)
+    stats["pages"] += len(page_rows)
+    stats["unique_pages"] += len(canonical_page)
+    page_copies = {}
+    for key, owner in page_owner.items():
+        page_copies.setdefault(owner, []).append(key)
+
+    kept_rows = [i for i, key in enumerate(zip(urls, pages)) if page_owner[key] == key]
+
+    # Identical normalised sentences within the remaining pages
+    first_by_text = {}
+    sources = {}
+    for i in kept_rows:
+        rep = first_by_text.setdefault(normalised[i], i)
+        sources.setdefault(rep, []).extend(page_copies[(urls[i], pages[i])])
+    reps = list(first_by_text.values())
+
+    if mode == "near" and len(reps) > 1:
+        tokens = [normalised[i].split() for i in reps]
+        eligible = [j for j, t in enumerate(tokens) if len(t) >= max(2, min_near_tokens)]
+        fingerprints = [None] * len(reps)
+        for j, fp in zip(eligible, hasher.fingerprints([tokens[j] for j in eligible])):
+            fingerprints[j] = fp
+        roots = near_duplicate_groups(fingerprints, max_distance)
+        merged = {}
+        for rep, root in zip(reps, roots):
+            merged.setdefault(reps[root], []).extend(sources[rep])
+        sources = merged
+        reps = list(merged)
+
+    result = group.iloc[reps].copy()
+    result["Sources"] = [tuple(dict.fromkeys(sources[i])) for i in reps]
+    return result
+
+
+def dedup_sentences(sentences, mode="near", max_distance=MAX_HAMMING, min_near_tokens=MIN_NEAR_TOKENS):
+    # Return (collapsed sentence table with a Sources column, stats dict); mode is "exact" or "near"
+    if mode not in DEDUP_MODES:
+        raise ValueError(f"Unknown dedup mode {mode!r}; expected one of {DEDUP_MODES}")
+    stats = {"sentences": len(sentences), "pages": 0, "unique_pages": 0}
+    if mode == "off" or sentences.empty:
+        stats["unique_sentences"] = len(sentences)
+        return sentences, stats
+    hasher = SimHasher()
+    undated = sentences["Publication Date"].map(publication_year).isna().to_numpy()
+    parts = []
+    for rows in sentences.groupby("Organization", sort=False).indices.values():
+        # Dated copies come first, so a duplicate group keeps a dated representative whenever it has one
+        # (the keyword filter drops undated sentences, which would otherwise lose the dated copies too)
+        rows = rows[np.argsort(undated[rows], kind="stable")]
+        parts.append(_dedup_org(sentences.iloc[rows], mode, max_distance, min_near_tokens, hasher, stats))
+    result = pd.concat(parts, ignore_index=True)
+    stats["unique_sentences"] = len(result)
+    return result, stats
+
+
+def source_pairs(rows):
+    # Distinct (URL, Page) pairs of a block of deduplicated sentences, in first-seen order
+    return list(dict.fromkeys(pair for sources in rows["Sources"] for pair in sources))
@@ -0,0 +1,12 @@
+# The modules live at the repository root as top-level scripts; make them importable from tests/
+import os
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+for path in (ROOT, os.path.join(ROOT, "benchmarks")):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+from instrumentation import configure
+
+configure(log_path="")
@@ -0,0 +1,88 @@
+import multiprocessing
+import os
+
+import numpy as np
+import pytest
+
+from embedding_cache import EmbeddingCache, sentence_key
+
+MODEL = "test-model"
+
+
+class FakeModel:
+    # Each sentence encodes to a constant vector of its (float) value, so rows are easy to check
+    def __init__(self):
+        self.encoded = []
+
+    def encode(self, sentences, convert_to_numpy=True):
+        self.encoded.extend(sentences)
+        return np.array([[float(s)] * 3 for s in sentences], dtype=np.float32)
+
+
+def test_encode_only_embeds_missing_sentences_and_persists(tmp_path):
+    cache = EmbeddingCache(MODEL, str(tmp_path))
+    model = FakeModel()
+    assert cache.encode(model, ["1", "2", "1"])[:, 0].tolist() == [1.0, 2.0, 1.0]
+    assert model.encoded == ["1", "2"]
+
+    reopened = EmbeddingCache(MODEL, str(tmp_path))
+    model = FakeModel()
+    # Whitespace differences share a key
+    assert reopened.encode(model, [" 2 ", "3"])[:, 0].tolist() == [2.0, 3.0]
+    assert model.encoded == ["3"]
+    assert (reopened.hits, reopened.misses) == (1, 1)
+
+
+def test_other_model_cache_is_rejected(tmp_path):
+    EmbeddingCache(MODEL, str(tmp_path)).encode(FakeModel(), ["1"])
+    os.rename(tmp_path / MODEL, tmp_path / "other")
+    with pytest.raises(ValueError):
+        EmbeddingCache("other", str(tmp_path))
+
+
+def test_append_after_another_writer_keeps_rows_straight(tmp_path):
+    a = EmbeddingCache(MODEL, str(tmp_path))
+    a.encode(FakeModel(), ["1"])
+    b = EmbeddingCache(MODEL, str(tmp_path))
+    b.encode(FakeModel(), ["7"])
+    # a's in-memory index predates b's row
+    assert a.encode(FakeModel(), ["2"])[:, 0].tolist() == [2.0]
+    assert a.encode(FakeModel(), ["7", "1"])[:, 0].tolist() == [7.0, 1.0]
+    assert EmbeddingCache(MODEL, str(tmp_path)).encode(FakeModel(), ["1", "2", "7"])[:, 0].tolist() == [1.0, 2.0, 7.0]
+
+
+def _writer(cache_dir, values):
+    cache = EmbeddingCache(MODEL, cache_dir)
+    for value in values:
+        cache.encode(FakeModel(), [str(value)])
+
+
+def test_concurrent_writers(tmp_path):
+    # Four processes append interleaved, overlapping values at the same time
+    values = [list(range(w, 200, 4)) + list(range(0, 20)) for w in range(4)]
+    ctx = multiprocessing.get_context("fork")
+    workers = [ctx.Process(target=_writer, args=(str(tmp_path), v)) for v in values]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+        assert w.exitcode == 0
+    cache = EmbeddingCache(MODEL, str(tmp_path))
+    model = FakeModel()
+    sentences = [str(v) for v in range(200)]
+    assert cache.encode(model, sentences)[:, 0].tolist() == [float(v) for v in range(200)]
+    assert model.encoded == []
+
+
+def test_truncated_tail_is_dropped_on_open(tmp_path):
+    cache = EmbeddingCache(MODEL, str(tmp_path))
+    cache.encode(FakeModel(), ["1", "2"])
+    # Simulate a run killed mid-append: half a vector and no index line
+    with open(cache.vectors_path, "ab") as f:
+        f.write(np.float32(9).tobytes())
+    reopened = EmbeddingCache(MODEL, str(tmp_path))
+    assert len(reopened) == 2
+    assert os.path.getsize(reopened.vectors_path) == 2 * 3 * 4
+    # Appending continues from the last complete row
+    assert reopened.encode(FakeModel(), ["3", "1"])[:, 0].tolist() == [3.0, 1.0]
+    assert sentence_key("3") in EmbeddingCache(MODEL, str(tmp_path)).index
@@ -0,0 +1,99 @@
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+import pandas as pd
+import pytest
+
+from crawl_ledger import CrawlLedger
+from fetch_extract import download, fetch_and_extract, make_session
+from page_store import CONTENT_COLUMNS
+
+PAGES = {
+    "/report.html": b"<html><title>Report</title><body>We recycle 60% of waste. <script>x()</script>"
+                    b"Emissions fell.</body></html>",
+    "/about": b"<html><body>About the organisation.</body></html>",
+}
+
+
+class _Handler(BaseHTTPRequestHandler):
+    def log_message(self, format, *args):
+        pass
+
+    def do_GET(self):
+        self.server.requests += 1
+        body = PAGES.get(self.path)
+        if body is None:
+            self.send_response(404)
+            self.end_headers()
+            return
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+
+@pytest.fixture
+def site():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), _Handler)
+    server.requests = 0
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    yield server, f"http://127.0.0.1:{server.server_address[1]}"
+    server.shutdown()
+
+
+def write_urls(tmp_path, site, paths):
+    path = tmp_path / "generated_urls.csv"
+    pd.DataFrame({"Organization": "Org A", "URL": [site + p for p in paths]}).to_csv(path, index=False)
+    return str(path)
+
+
+def fetch_options(tmp_path, **extra):
+    return dict(output_dir=str(tmp_path / "output"), download_dir=str(tmp_path / "downloads"),
+                ledger_path=str(tmp_path / "ledger.sqlite"), download_workers=2, extract_workers=1, **extra)
+
+
+def test_fetch_writes_content_csv(tmp_path, site):
+    _, site = site
+    urls_csv = write_urls(tmp_path, site, ["/report.html", "/about", "/missing"])
+    stats = fetch_and_extract(urls_csv, **fetch_options(tmp_path))
+    assert stats == {"skipped": 0, "downloaded": 2, "unchanged": 0, "extracted": 2, "failed": 1}
+
+    content = pd.read_csv(tmp_path / "output" / "Org A" / "content.csv", dtype=str)
+    assert list(content.columns) == CONTENT_COLUMNS
+    report = content.set_index("URL").loc[site + "/report.html"]
+    assert report["Raw Content"] == " ===== PAGE 1 ===== We recycle 60% of waste. Emissions fell."
+    assert report["Page Count"] == "1"
+    # Downloads are streamed to a scratch file that is removed after extraction
+    assert list((tmp_path / "downloads").iterdir()) == []
+
+
+def test_download_removes_partial_file_on_failure(tmp_path, site):
+    _, site = site
+    with pytest.raises(ValueError):
+        download(make_session(1), "Org A", site + "/report.html", str(tmp_path), max_bytes=10)
+    assert list(tmp_path.iterdir()) == []
+
+
+def test_second_run_inside_frequency_window_makes_no_requests(tmp_path, site):
+    server, site = site
+    urls_csv = write_urls(tmp_path, site, ["/report.html", "/about"])
+    fetch_and_extract(urls_csv, **fetch_options(tmp_path))
+    with CrawlLedger(str(tmp_path / "ledger.sqlite")) as ledger:
+        assert ledger.last_scraped("Org A", site + "/report.html") is not None
+    requests_after_first_run = server.requests
+
+    stats = fetch_and_extract(urls_csv, **fetch_options(tmp_path, frequency_days=30))
+    assert stats["skipped"] == 2 and stats["downloaded"] == 0
+    assert server.requests == requests_after_first_run
+
+
+def test_due_urls_are_fetched_but_unchanged_bodies_not_re_extracted(tmp_path, site):
+    server, site = site
+    urls_csv = write_urls(tmp_path, site, ["/report.html", "/about"])
+    fetch_and_extract(urls_csv, **fetch_options(tmp_path))
+    stats = fetch_and_extract(urls_csv, **fetch_options(tmp_path, frequency_days=0))
+    assert stats["downloaded"] == 2 and stats["unchanged"] == 2 and stats["extracted"] == 0
+    # force ignores both the window and the content hash
+    stats = fetch_and_extract(urls_csv, **fetch_options(tmp_path, force=True))
+    assert stats["extracted"] == 2
@@ -0,0 +1,33 @@
+import types
+
+import pandas as pd
+
+from filter_strategies import cascade_recall
+
+
+class CannedStrategy:
+    # Returns fixed (score, row) hits per question row instead of scoring anything
+    top_k = 2
+    retriever = types.SimpleNamespace(cand_df=range(10))
+    vector_rows = range(4)
+    shortlist_size = 4
+
+    def __init__(self, hits):
+        self.hits = hits
+
+    def prepare(self, questions, sentences):
+        pass
+
+    def unit_hits(self, org, rows):
+        return [self.hits[row] for row in rows]
+
+
+def test_identical_hit_sets_ignore_questions_without_hits():
+    questions = pd.DataFrame({"Organization": ["A", "A", "B", "B"]})
+    full = CannedStrategy([[(0.9, 1), (0.8, 2)], [(0.7, 3)], [], []])
+    cascade = CannedStrategy([[(0.9, 1), (0.8, 2)], [(0.6, 4)], [], []])
+    report = cascade_recall(questions, None, full, cascade)
+    assert report["questions"] == 4
+    assert report["recall_at_2"] == 0.5
+    # Only the two questions the full scan found anything for are compared
+    assert report["identical_hit_sets"] == 0.5
@@ -0,0 +1,39 @@
+from keyword_matcher import KeywordMatcher, compile_keywords
+
+
+def naive_matches(keywords, sentence):
+    # The per-keyword substring check the matcher replaces
+    return sorted({k.lower() for k in keywords if k.strip() and k.lower() in sentence.lower()})
+
+
+def test_matched_keywords_agrees_with_substring_check():
+    keywords = ["water", "Waste water", "waste", "gender", "gen", "", "  "]
+    sentences = [
+        "We treat waste water on site.",
+        "Gender equality in the wastewater team.",
+        "Nothing relevant here.",
+        "regenerative farming",
+    ]
+    matcher = KeywordMatcher(keywords)
+    for sentence in sentences:
+        assert matcher.matched_keywords(sentence.lower()) == naive_matches(keywords, sentence)
+        assert matcher.matches(sentence.lower()) == bool(naive_matches(keywords, sentence))
+
+
+def test_find_reports_overlapping_and_prefix_hits_with_offsets():
+    matcher = KeywordMatcher(["waste water", "waste", "water"])
+    sentence = "waste water and water"
+    hits = sorted(matcher.find(sentence), key=lambda hit: (hit[1], hit[0]))
+    assert hits == [("waste", 0, 5), ("waste water", 0, 11), ("water", 6, 11), ("water", 16, 21)]
+    assert all(sentence[start:end] == kw for kw, start, end in hits)
+
+
+def test_empty_keyword_set_matches_nothing():
+    matcher = KeywordMatcher(["", " "])
+    assert not matcher
+    assert not matcher.matches("anything")
+    assert matcher.find("anything") == []
+
+
+def test_compile_keywords_shares_matchers_across_case_and_order():
+    assert compile_keywords(["Water", "waste"]) is compile_keywords(["waste", "water"])
@@ -0,0 +1,42 @@
+import json
+
+import pytest
+
+from loadjson import OrgRegistry, normalise_org_name
+
+
+@pytest.mark.parametrize("name, key", [
+    ("BHP Group Limited", "bhp"),
+    ("BHP", "bhp"),
+    ("bhp (bhp.com)", "bhp"),
+    ("The Star Entertainment Group", "star entertainment"),
+    ("Johnson & Johnson Pty Ltd", "johnson and johnson"),
+    # A lone suffix or article is the whole name, not something to strip
+    ("Holdings", "holdings"),
+    ("The", "the"),
+    ("(unknown)", "(unknown)"),
+])
+def test_normalise_org_name(name, key):
+    assert normalise_org_name(name) == key
+
+
+def write_division(json_dir, letter, industry, names):
+    path = json_dir / f"ANZSIC_{letter}_{industry}_2025.json"
+    path.write_text("```json\n" + json.dumps({"data": [{"organisation_name": n} for n in names]}) + "\n```")
+
+
+def test_same_org_across_divisions_is_merged(tmp_path):
+    write_division(tmp_path, "B", "Mining", ["BHP Group Limited", "Rio Tinto"])
+    write_division(tmp_path, "C", "Manufacturing", ["BHP", "BlueScope Steel"])
+    registry = OrgRegistry.from_json_dir(str(tmp_path))
+
+    assert len(registry) == 3
+    bhp = registry.lookup("bhp (bhp.com)")
+    assert sorted(bhp.aliases) == ["BHP", "BHP Group Limited"]
+    assert sorted(bhp.divisions) == ["Division B", "Division C"]
+    # Selecting both divisions lists BHP once, tagged with the first selected division it is in
+    orgs = registry.orgs_for_divisions(["Division C", "Division B"])
+    assert [o["organisation_name"] for o in orgs].count(bhp.organisation_name) == 1
+    assert next(o for o in orgs if o["organisation_name"] == bhp.organisation_name) == {
+        "organisation_name": bhp.organisation_name, "division": "Division C", "industry": "Manufacturing"}
+    assert [r.key for r in registry.by_industry("mining")] == ["bhp", "rio tinto"]
@@ -0,0 +1,49 @@
+import csv
+
+import pytest
+
+from page_store import CONTENT_COLUMNS, PageStore, export_content_csv, pack_content_csv, read_content_csv
+
+ROWS = [
+    {"URL": "https://a.com/report.pdf", "Date Collected": "2025-01-01", "File Type": "PDF", "Page Count": "3",
+     "Publication Date": "2024",
+     "Raw Content": "cover text ===== PAGE 1 ===== First page. ===== PAGE 2 =====  ===== PAGE 3 ===== Last “page”."},
+    {"URL": "https://a.com/about", "Date Collected": "2025-01-01", "File Type": "HTML", "Page Count": "1",
+     "Publication Date": "", "Raw Content": "No markers, \"quoted\",\nmultiline."},
+    # A later re-scrape of the same URL
+    {"URL": "https://a.com/report.pdf", "Date Collected": "2025-02-01", "File Type": "PDF", "Page Count": "1",
+     "Publication Date": "2025", "Raw Content": " ===== PAGE 1 ===== Updated."},
+]
+
+
+def write_csv(path, rows):
+    with open(path, "w", encoding="utf-8", newline="") as f:
+        writer = csv.DictWriter(f, fieldnames=CONTENT_COLUMNS, quoting=csv.QUOTE_ALL)
+        writer.writeheader()
+        writer.writerows(rows)
+
+
+def test_pack_and_export_round_trip(tmp_path):
+    write_csv(tmp_path / "content.csv", ROWS)
+    assert pack_content_csv(str(tmp_path / "content.csv")) == len(ROWS)
+    exported = export_content_csv(str(tmp_path / "content.pages"), str(tmp_path / "exported.csv"))
+    assert list(read_content_csv(exported)) == ROWS
+
+
+def test_single_pages_are_readable_without_the_rest(tmp_path):
+    write_csv(tmp_path / "content.csv", ROWS)
+    pack_content_csv(str(tmp_path / "content.csv"))
+    with PageStore(str(tmp_path / "content.pages")) as store:
+        assert store.page_numbers(0) == ["1", "2", "3"]
+        assert store.page(0, 3) == " Last “page”."
+        # URL lookups resolve to the latest row for that URL
+        assert store.page("https://a.com/report.pdf", 1) == " Updated."
+        assert [row["Date Collected"] for row in store.iter_documents(latest_only=True)] == ["2025-01-01", "2025-02-01"]
+        with pytest.raises(KeyError):
+            store.page(0, 4)
+
+
+def test_non_store_file_is_rejected(tmp_path):
+    write_csv(tmp_path / "content.csv", ROWS)
+    with pytest.raises(ValueError):
+        PageStore(str(tmp_path / "content.csv"))
@@ -0,0 +1,45 @@
+import pandas as pd
+
+from result_checkpoint import ResultCheckpoint, question_keys, run_signature
+
+
+def questions():
+    q = pd.DataFrame({"Organization": ["A", "A", "B"], "SDG Ques ID": ["q1", "q2", "q1"],
+                      "SDG Question": ["x?", "y?", "x?"], "SDG Goal": ["Goal 5"] * 3})
+    return q, pd.Series(["5", "5", "5"])
+
+
+def test_resume_skips_recorded_units_and_writes_goal_in_question_order(tmp_path):
+    q, goal = questions()
+    keys = question_keys(q, goal)
+    signature = run_signature("keywords", "off", keys, corpus="c1")
+    path = str(tmp_path / "checkpoint.sqlite")
+
+    with ResultCheckpoint(path, signature) as checkpoint:
+        checkpoint.record([2], [keys[2]], [{"Organization": "B", "Filtered Content": "b"}])
+    # Simulated restart: the same run picks up what was recorded
+    with ResultCheckpoint(path, signature) as checkpoint:
+        assert checkpoint.completed() == {keys[2]}
+        checkpoint.record([0, 1], keys[:2], [{"Organization": "A", "Filtered Content": "a1"},
+                                             {"Organization": "A", "Filtered Content": "a2"}])
+        out = str(tmp_path / "sdg5.csv")
+        assert checkpoint.write_goal("5", out) == 3
+    assert pd.read_csv(out)["Filtered Content"].tolist() == ["a1", "a2", "b"]
+
+
+def test_changed_signature_starts_over(tmp_path):
+    q, goal = questions()
+    keys = question_keys(q, goal)
+    path = str(tmp_path / "checkpoint.sqlite")
+    with ResultCheckpoint(path, run_signature("keywords", "off", keys, corpus="c1")) as checkpoint:
+        checkpoint.record([0], [keys[0]], [{"Organization": "A"}])
+    # A re-scraped corpus must not resume results computed on the old one
+    with ResultCheckpoint(path, run_signature("keywords", "off", keys, corpus="c2")) as checkpoint:
+        assert checkpoint.completed() == set()
+
+
+def test_discard_removes_the_file(tmp_path):
+    path = tmp_path / "checkpoint.sqlite"
+    checkpoint = ResultCheckpoint(str(path), "sig")
+    checkpoint.discard()
+    assert not path.exists()
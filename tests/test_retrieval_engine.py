@@ -0,0 +1,54 @@
+import numpy as np
+import pandas as pd
+
+from retrieval_engine import GroupedRetriever, top_k_rows
+
+
+def test_top_k_rows_keeps_scores_above_threshold_best_first():
+    scores = np.array([[0.1, 0.9, 0.5, 0.7], [0.2, 0.1, 0.3, 0.0]], dtype=np.float32)
+    hits = top_k_rows(scores, top_k=2, threshold=0.4)
+    assert [i for _, i in hits[0]] == [1, 3]
+    # Nothing above threshold: fall back to the single best candidate
+    assert [i for _, i in hits[1]] == [2]
+
+
+def test_top_k_rows_matches_full_sort():
+    rng = np.random.default_rng(0)
+    scores = rng.random((20, 50)).astype(np.float32)
+    for row, hits in zip(scores, top_k_rows(scores, top_k=8, threshold=0.0)):
+        assert [i for _, i in hits] == list(np.argsort(-row, kind="stable")[:8])
+
+
+def test_top_k_rows_handles_small_and_empty_candidate_sets():
+    assert top_k_rows(np.zeros((2, 0), dtype=np.float32), 8, 0.4) == [[], []]
+    hits = top_k_rows(np.array([[0.5, 0.6]], dtype=np.float32), 8, 0.4)
+    assert [i for _, i in hits[0]] == [1, 0]
+
+
+class FakeModel:
+    def __init__(self, vectors):
+        self.vectors = vectors
+
+    def encode(self, texts, convert_to_numpy=True):
+        return np.array([self.vectors[t] for t in texts], dtype=np.float32)
+
+
+def test_retrieve_scores_each_question_against_its_own_org():
+    cand = pd.DataFrame({"Organization": ["A", "B", "A"], "Page": ["1", "2", "3"],
+                         "Sentence": ["a one", "b two", "a three"], "URL": ["ua", "ub", "ua"],
+                         "Document Type": ["PDF"] * 3, "Publication Date": ["2024"] * 3,
+                         "Last updated Date": [""] * 3})
+    embeddings = np.array([[1, 0], [1, 0], [0, 1]], dtype=np.float32)
+    retriever = GroupedRetriever(cand, embeddings)
+    model = FakeModel({"q1": [0, 1], "q2": [1, 0]})
+    (sents_a, pages_a, *_), (sents_b, *_) = retriever.retrieve(model, ["q1", "q2"], ["A", "B"], top_k=1)
+    assert sents_a == ["[Page 3] a three"] and pages_a == ["3"]
+    assert sents_b == ["[Page 2] b two"]
+
+
+def test_format_hits_aligns_pages_with_source_urls():
+    cand = pd.DataFrame({"Organization": ["A"], "Page": ["7"], "Sentence": ["We recycle."], "URL": ["u2"],
+                         "Document Type": ["PDF"], "Publication Date": ["2024"], "Last updated Date": [""],
+                         "Sources": [(("u2", "7"), ("u1", "3"))]})
+    _, pages, urls, *_ = GroupedRetriever(cand).format_hits([(1.0, 0)])
+    assert list(zip(urls, pages)) == [("u2", "7"), ("u1", "3")]
@@ -0,0 +1,89 @@
+import json
+import os
+import sys
+import types
+import urllib.error
+import urllib.request
+import zlib
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from lexical_index import tokenize
+from retrieval_service import RetrievalService, serve_http
+
+RAW = (" ===== PAGE 1 ===== We recycled most of our waste this year. Women hold half of our board seats."
+       " ===== PAGE 2 ===== Scope one emissions fell by a tenth.")
+
+
+class FakeSentenceTransformer:
+    # Bag-of-words vectors, so related sentences still score above the threshold
+    encoded = 0
+
+    def __init__(self, name, device=None, backend=None):
+        pass
+
+    def encode(self, sentences, batch_size=32, convert_to_numpy=True, show_progress_bar=False, **kwargs):
+        FakeSentenceTransformer.encoded += len(sentences)
+        out = np.zeros((len(sentences), 64), np.float32)
+        for i, sentence in enumerate(sentences):
+            for token in tokenize(sentence):
+                out[i, zlib.crc32(token.encode()) % 64] += 1
+        return out
+
+
+@pytest.fixture
+def service(tmp_path, monkeypatch):
+    monkeypatch.setitem(sys.modules, "sentence_transformers",
+                        types.SimpleNamespace(SentenceTransformer=FakeSentenceTransformer))
+    os.makedirs(tmp_path / "output" / "Org A")
+    pd.DataFrame({"URL": ["https://a.com/r.pdf"], "Date Collected": "2025-01-01", "File Type": "PDF",
+                  "Page Count": "2", "Publication Date": "2024", "Raw Content": [RAW]}
+                 ).to_csv(tmp_path / "output" / "Org A" / "content.csv", index=False)
+    return RetrievalService(str(tmp_path / "output"), str(tmp_path / "corpus"), cache_dir=str(tmp_path / "emb"),
+                            threshold=0.1, cache_size=2)
+
+
+def get(base_url, path):
+    try:
+        with urllib.request.urlopen(base_url + path) as response:
+            return response.status, json.loads(response.read())
+    except urllib.error.HTTPError as e:
+        return e.code, json.loads(e.read())
+
+
+def test_search_answers_503_until_loaded(service):
+    server, base_url = serve_http(service, port=0)
+    try:
+        status, body = get(base_url, "/search?org=Org+A&q=waste")
+        assert status == 503 and body["status"] == "Not loaded"
+        assert get(base_url, "/search?org=Org+A")[0] == 400
+        # A request never triggers the load itself
+        assert not service.ready
+        service.start().result()
+        status, body = get(base_url, "/search?org=Org+A&q=recycled+waste&k=1")
+        assert status == 200
+        assert body["hits"][0]["page"] == "1"
+    finally:
+        server.shutdown()
+
+
+def test_query_before_load_raises(service):
+    with pytest.raises(RuntimeError):
+        service.query("Org A", "waste")
+
+
+def test_query_cache_hits_and_lru_eviction(service):
+    service.load()
+    first, cached = service.query("Org A", "recycled waste")
+    assert not cached and "recycled" in first[0]["sentence"]
+    encoded = FakeSentenceTransformer.encoded
+    # Whitespace is normalised before the cache lookup
+    assert service.query("Org A", "  recycled   waste ") == (first, True)
+    assert FakeSentenceTransformer.encoded == encoded
+    service.query("Org A", "board seats")
+    service.query("Org A", "emissions")
+    # cache_size=2: the oldest question was evicted and is encoded again
+    assert service.query("Org A", "recycled waste")[1] is False
+    assert service.query("Org A", "emissions")[1] is True
@@ -0,0 +1,38 @@
+import os
+
+import pandas as pd
+
+from filter_strategies import KeywordStrategy
+from sdg_pipeline import run_pipeline
+from sentence_corpus import CORPUS_DIR
+
+
+class FixedKeywordStrategy(KeywordStrategy):
+    # Skips KeyBERT: every question looks for "recycl"
+    def prepare(self, questions, sentences):
+        self.index_sentences(sentences)
+        self.keywords = [["recycl"]] * len(questions)
+
+
+def snapshot(path):
+    if not os.path.isdir(path):
+        return None
+    return sorted((f, os.path.getmtime(os.path.join(root, f))) for root, _, files in os.walk(path) for f in files)
+
+
+def test_run_pipeline_keeps_the_corpus_in_corpus_dir(tmp_path):
+    os.makedirs(tmp_path / "output" / "Org A")
+    pd.DataFrame({"URL": ["https://a.com/r.pdf"], "Date Collected": "2025-01-01", "File Type": "PDF",
+                  "Page Count": "1", "Publication Date": "2024",
+                  "Raw Content": [" ===== PAGE 1 ===== We recycle most waste. Nothing else."]}
+                 ).to_csv(tmp_path / "output" / "Org A" / "content.csv", index=False)
+    pd.DataFrame({"Organization": ["Org A"], "SDG Goal": ["Goal 12. Responsible consumption"],
+                  "SDG Question": ["What is your recycling rate?"]}).to_csv(tmp_path / "questions.csv", index=False)
+
+    before = snapshot(CORPUS_DIR)
+    written = run_pipeline([str(tmp_path / "questions.csv")], FixedKeywordStrategy(), workers=1,
+                           output_dir=str(tmp_path / "results"), content_dir=str(tmp_path / "output"),
+                           corpus_dir=str(tmp_path / "corpus"))
+    assert snapshot(CORPUS_DIR) == before
+    assert os.listdir(tmp_path / "corpus")
+    assert pd.read_csv(written[0])["Filtered Content"].tolist() == ["We recycle most waste."]
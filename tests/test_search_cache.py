@@ -0,0 +1,80 @@
+import pytest
+
+import search_cache
+from search_cache import SearchCache
+
+DAY = 86400
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    # Settable stand-in for time.time() inside search_cache
+    now = [1_000_000.0]
+    monkeypatch.setattr(search_cache.time, "time", lambda: now[0])
+    return now
+
+
+def put(cache, query):
+    cache.put(query, 1, 2020, 2025, {"items": [query]})
+
+
+def get(cache, query):
+    return cache.get(query, 1, 2020, 2025)
+
+
+def test_entries_expire_after_ttl(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"), ttl_days=1)
+    put(cache, "q")
+    clock[0] += DAY - 1
+    assert get(cache, "q") == {"items": ["q"]}
+    clock[0] += 2
+    assert get(cache, "q") is None
+    assert (cache.hits, cache.misses, cache.expired, len(cache)) == (1, 1, 1, 0)
+    cache.close()
+
+
+def test_cache_persists_across_reopen(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"))
+    put(cache, "q")
+    cache.close()
+    reopened = SearchCache(str(tmp_path / "cache.sqlite"))
+    assert get(reopened, "q") == {"items": ["q"]}
+    reopened.close()
+
+
+def test_least_recently_used_entry_is_evicted(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"), max_entries=2)
+    put(cache, "a")
+    clock[0] += 1
+    put(cache, "b")
+    clock[0] += 1
+    get(cache, "a")
+    clock[0] += 1
+    put(cache, "c")
+    assert get(cache, "b") is None
+    assert get(cache, "a") is not None and get(cache, "c") is not None
+    assert cache.evicted == 1
+    cache.close()
+
+
+def test_expired_entries_are_dropped_before_live_ones(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"), ttl_days=1, max_entries=2)
+    put(cache, "old")
+    clock[0] += DAY / 2
+    put(cache, "live")
+    clock[0] += DAY / 2 + 1
+    # "old" is expired and "live" is least recently used among live entries
+    put(cache, "new")
+    assert (cache.expired, cache.evicted) == (1, 0)
+    assert get(cache, "live") is not None and get(cache, "new") is not None
+    cache.close()
+
+
+def test_purge_expired(tmp_path, clock):
+    cache = SearchCache(str(tmp_path / "cache.sqlite"), ttl_days=1)
+    put(cache, "a")
+    clock[0] += 2 * DAY
+    put(cache, "b")
+    assert cache.purge_expired() == 1
+    assert len(cache) == 1
+    cache.close()
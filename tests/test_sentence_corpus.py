@@ -0,0 +1,95 @@
+import os
+
+import pandas as pd
+import pytest
+
+from sentence_corpus import build_corpus, segment_document, SentenceCorpus
+
+# (url, publication date, raw content) per org
+DOCUMENTS = {
+    "Org A": [
+        ("https://a.com/2024.pdf", "2024.0", " ===== PAGE 1 ===== New report. Two sentences."),
+        ("https://a.com/2023.pdf", "2023", " ===== PAGE 1 ===== Last year."),
+        ("https://a.com/2021.pdf", "2021", " ===== PAGE 1 ===== Old report."),
+        ("https://a.com/about", "", " ===== PAGE 1 ===== Undated page."),
+    ],
+    "Org B": [
+        ("https://b.com/about", "", " ===== PAGE 1 ===== Only undated."),
+    ],
+}
+
+
+def write_content(output_dir, documents=DOCUMENTS, collected="2025-01-01"):
+    for org, docs in documents.items():
+        os.makedirs(os.path.join(output_dir, org), exist_ok=True)
+        pd.DataFrame({
+            "URL": [d[0] for d in docs],
+            "Date Collected": collected,
+            "File Type": "PDF",
+            "Page Count": "1",
+            "Publication Date": [d[1] for d in docs],
+            "Raw Content": [d[2] for d in docs],
+        }).to_csv(os.path.join(output_dir, org, "content.csv"), index=False)
+
+
+@pytest.fixture
+def corpus(tmp_path):
+    write_content(str(tmp_path / "output"))
+    return build_corpus(str(tmp_path / "output"), str(tmp_path / "corpus"))
+
+
+def urls(corpus, **kwargs):
+    return sorted(entry["url"] for _, entry in corpus.documents(**kwargs))
+
+
+def test_segment_document_splits_pages_and_sentences():
+    raw = " ===== PAGE 1 ===== First one. Second!  ===== PAGE 2 ===== Third?"
+    pages, starts, ends = segment_document(raw)
+    assert pages.tolist() == [1, 1, 2]
+    assert [raw[s:e] for s, e in zip(starts, ends)] == ["First one.", "Second!", "Third?"]
+
+
+def test_rebuild_only_resegments_changed_documents(tmp_path, corpus):
+    assert len(urls(corpus)) == 5
+    documents = {"Org A": DOCUMENTS["Org A"][:2], "Org B": [("https://b.com/about", "", " ===== PAGE 1 ===== New.")]}
+    write_content(str(tmp_path / "output"), documents)
+    rebuilt = build_corpus(str(tmp_path / "output"), str(tmp_path / "corpus"))
+    assert len(urls(rebuilt)) == 3
+    assert rebuilt.load_sentences({"Org B"})["Sentence"].tolist() == ["New."]
+
+
+def test_unreadable_content_keeps_previous_documents(tmp_path, corpus):
+    with open(tmp_path / "output" / "Org A" / "content.csv", "wb") as f:
+        f.write(b"URL,Raw Content\n\xff\xfe broken")
+    rebuilt = build_corpus(str(tmp_path / "output"), str(tmp_path / "corpus"))
+    assert len(urls(rebuilt, orgs={"Org A"})) == 4
+    assert len(SentenceCorpus(str(tmp_path / "corpus")).load_sentences({"Org A"})) == 5
+
+
+def test_latest_years_keeps_recent_dated_documents(corpus):
+    assert urls(corpus, orgs={"Org A"}, latest_years=1) == ["https://a.com/2024.pdf"]
+    assert urls(corpus, orgs={"Org A"}, latest_years=2) == ["https://a.com/2023.pdf", "https://a.com/2024.pdf"]
+    # Orgs without dated documents fall back to their undated ones
+    assert urls(corpus, orgs={"Org B"}, latest_years=1) == ["https://b.com/about"]
+
+
+def test_latest_per_type_keeps_newest_document(corpus):
+    assert urls(corpus, orgs={"Org A"}, latest_per_type=True) == ["https://a.com/2024.pdf"]
+
+
+def test_latest_years_must_be_positive(corpus):
+    with pytest.raises(ValueError):
+        list(corpus.documents(latest_years=0))
+
+
+def test_load_sentences_applies_the_recency_filter(corpus):
+    sentences = corpus.load_sentences({"Org A"}, latest_years=1)
+    assert sentences["Sentence"].tolist() == ["New report.", "Two sentences."]
+
+
+def test_partitions_follow_the_ledger_on_reopen(tmp_path, corpus):
+    documents = {"Org A": DOCUMENTS["Org A"][1:], "Org B": DOCUMENTS["Org B"]}
+    write_content(str(tmp_path / "output"), documents)
+    build_corpus(str(tmp_path / "output"), str(tmp_path / "corpus"))
+    reopened = SentenceCorpus(str(tmp_path / "corpus"))
+    assert urls(reopened, orgs={"Org A"}, latest_years=1) == ["https://a.com/2023.pdf"]
@@ -0,0 +1,58 @@
+import pandas as pd
+
+from sentence_dedup import dedup_sentences, source_pairs
+
+LONG = ("Our total scope one and two emissions fell by twelve percent this year as we moved our data centres "
+        "and regional offices onto renewable electricity contracts and replaced older fleet vehicles with hybrids")
+
+
+def sentences(rows):
+    # rows: (org, url, page, publication date, sentence)
+    df = pd.DataFrame(rows, columns=["Organization", "URL", "Page", "Publication Date", "Sentence"])
+    df["Document Type"] = "PDF"
+    df["Last updated Date"] = ""
+    return df
+
+
+def test_off_mode_returns_input_unchanged():
+    df = sentences([("A", "u1", "1", "2024", "Hello there.")])
+    out, _ = dedup_sentences(df, "off")
+    assert out.equals(df)
+
+
+def test_exact_mode_collapses_repeats_per_org_and_keeps_sources():
+    df = sentences([
+        ("A", "u1", "1", "2024", "We recycle."),
+        ("A", "u2", "5", "2024", "We  recycle!"),
+        ("A", "u1", "2", "2024", "Something else."),
+        ("B", "u3", "1", "2024", "We recycle."),
+    ])
+    out, stats = dedup_sentences(df, "exact")
+    assert stats["unique_sentences"] == 3
+    a = out[out["Organization"] == "A"]
+    assert source_pairs(a[a["Sentence"] == "We recycle."]) == [("u1", "1"), ("u2", "5")]
+    assert (out["Organization"] == "B").sum() == 1
+
+
+def test_dated_copy_is_kept_as_representative():
+    df = sentences([
+        ("A", "u1", "1", "", "We recycle."),
+        ("A", "u2", "4", "2024.0", "We recycle."),
+    ])
+    out, _ = dedup_sentences(df, "exact")
+    assert out["URL"].tolist() == ["u2"]
+    assert out["Publication Date"].tolist() == ["2024.0"]
+    assert list(out["Sources"].iloc[0]) == [("u2", "4"), ("u1", "1")]
+
+
+def test_near_mode_collapses_small_edits_only():
+    df = sentences([
+        ("A", "u1", "1", "2024", LONG + "."),
+        # Fingerprint differs from LONG's in 3 bits (MAX_HAMMING)
+        ("A", "u2", "1", "2023", LONG + " this period."),
+        ("A", "u3", "1", "2023", "Board diversity improved with four new independent directors appointed"),
+    ])
+    exact, _ = dedup_sentences(df, "exact")
+    near, _ = dedup_sentences(df, "near")
+    assert len(exact) == 3
+    assert len(near) == 2
@@ -0,0 +1,143 @@
+import pandas as pd
+import pytest
+
+from crawl_ledger import CrawlLedger
+from customsearch_stub import start_stub_server
+from instrumentation import telemetry
+from search_client import DailyQuota, QuotaExceeded
+from url_general_adapter import build_query, generate_urls, make_search_client, search_org
+
+ORGS = [{"organisation_name": f"Org {i} (o{i})", "division": "D", "industry": "I"} for i in range(4)]
+
+
+class FakeClient:
+    # Serves canned result pages per query and remembers which queries were paged
+    requests_sent = 0
+    retries = 0
+    cache = None
+
+    def __init__(self, pages_for, fail_orgs=()):
+        self.pages_for = pages_for
+        self.fail_orgs = set(fail_orgs)
+        self.calls = []
+
+    def iter_pages(self, query, start_year, max_results=100, org=""):
+        if org in self.fail_orgs:
+            raise RuntimeError("quota exceeded")
+        for page in self.pages_for(query):
+            self.calls.append(query)
+            yield page
+
+
+def html_only(query):
+    return [[f"https://org.com.au/{abs(hash(query))}/page-{p}-{i}" for i in range(10)] for p in range(5)]
+
+
+def user_inputs(tmp_path, doc_labels=("PDF", "HTML"), **extra):
+    return {"year": "2021", "Frequency": "1", "doc_labels": list(doc_labels), "sdg_labels": ["Goal 5"],
+            "country": ["AU"], "output_path": str(tmp_path / "urls.csv"),
+            "crawl_ledger_path": str(tmp_path / "ledger.sqlite"), "use_search_cache": False,
+            "search_quota_path": str(tmp_path / "quota.sqlite"), **extra}
+
+
+@pytest.fixture
+def stub():
+    server, base_url = start_stub_server(total_results=25)
+    yield server, base_url
+    server.shutdown()
+
+
+def test_generate_urls_against_stub(tmp_path, stub):
+    server, base_url = stub
+    client = make_search_client(base_url=base_url, per_minute=10 ** 6)
+    df = generate_urls(user_inputs(tmp_path), ORGS, client=client)
+    assert server.state.requests == len(ORGS)
+    assert set(df["Organization"]) == {org["organisation_name"] for org in ORGS}
+    assert set(df["File Type"]) == {"PDF", "HTML"}
+    assert set(df.loc[df["URL"].str.contains("news.example.org"), "Flag"]) == {"Third-party"}
+    # Discovery alone does not mark anything as scraped; fetch_extract does
+    with CrawlLedger(str(tmp_path / "ledger.sqlite")) as ledger:
+        assert len(ledger) == 0
+    # A second run merges into the same CSV instead of replacing it
+    generate_urls(user_inputs(tmp_path, ["HTML"]), ORGS[:1], client=client)
+    assert len(pd.read_csv(tmp_path / "urls.csv")) == len(df)
+
+
+def test_generate_urls_continues_past_a_failed_org(tmp_path):
+    before = telemetry.counter("search_failures")
+    progress = []
+    client = FakeClient(html_only, fail_orgs={"Org 1 (o1)"})
+    df = generate_urls(user_inputs(tmp_path, ["HTML"]), ORGS, client=client,
+                       progress=lambda done, total, org, rows: progress.append((done, org)))
+    assert set(df["Organization"]) == {"Org 0 (o0)", "Org 2 (o2)", "Org 3 (o3)"}
+    assert [done for done, _ in progress] == [1, 2, 3, 4]
+    assert telemetry.counter("search_failures") == before + 1
+
+
+def test_daily_limit_holds_across_runs(tmp_path, stub):
+    server, base_url = stub
+    inputs = user_inputs(tmp_path, ["HTML"], search_url=base_url, search_per_minute=10 ** 6, search_daily_limit=3)
+    first = generate_urls(inputs, ORGS, max_workers=1)
+    assert server.state.requests == 3
+    assert first["Organization"].nunique() == 3
+    # Same day, new run and new client: the quota is already used up
+    generate_urls(inputs, ORGS, max_workers=1)
+    assert server.state.requests == 3
+
+
+def test_daily_quota_is_counted_per_calendar_day(tmp_path):
+    path = str(tmp_path / "quota.sqlite")
+    quota = DailyQuota(2, path)
+    quota.take("2025-01-01")
+    quota.take("2025-01-01")
+    with pytest.raises(QuotaExceeded):
+        quota.take("2025-01-01")
+    quota.take("2025-01-02")
+    quota.close()
+    reopened = DailyQuota(2, path)
+    assert reopened.used("2025-01-01") == 2
+    assert reopened.used("2025-01-02") == 1
+    reopened.close()
+
+
+def test_search_org_never_exceeds_one_page_per_doc_type():
+    client = FakeClient(html_only)
+    links, pages = search_org(client, "Org", ["PDF", "HTML"], 2021)
+    assert pages == 2
+    assert {file_type for _, file_type in links} == {"HTML"}
+
+
+def test_search_org_asks_the_pdf_query_when_pdfs_are_short():
+    pdf_query = build_query("Org", "pdf")
+
+    def pages_for(query):
+        if query == pdf_query:
+            return [[f"https://org.com.au/report-{i}.pdf" for i in range(10)]]
+        return html_only(query)
+
+    client = FakeClient(pages_for)
+    links, pages = search_org(client, "Org", ["PDF", "HTML"], 2021)
+    assert pages == 2
+    assert client.calls[1] == pdf_query
+    assert sum(file_type == "PDF" for _, file_type in links) == 10
+
+
+def test_search_org_pages_the_combined_query_for_other_short_types():
+    client = FakeClient(html_only)
+    _, pages = search_org(client, "Org", ["HTML", "Excel"], 2021)
+    assert pages == 2
+    assert client.calls[0] == client.calls[1]
+
+
+def test_search_org_stops_once_every_type_is_covered():
+    client = FakeClient(html_only)
+    _, pages = search_org(client, "Org", ["HTML", "Word"], 2021)
+    # Word is never detected, so it cannot keep paging going
+    assert pages == 1
+
+
+@pytest.mark.parametrize("doc_labels", [["PDF"], ["HTML"], ["PDF", "HTML", "Excel"]])
+def test_generate_urls_pages_stay_within_baseline(tmp_path, doc_labels):
+    client = FakeClient(html_only)
+    generate_urls(user_inputs(tmp_path, doc_labels), ORGS, client=client)
+    assert len(client.calls) <= len(ORGS) * len(doc_labels)
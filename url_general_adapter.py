@@ -1,60 +1,164 @@
 # This cell wraps the core functionality of Url General.ipynb to be compatible with SWA_UI.py
 # It replaces the original urlscrapper.generate_urls(user_inputs, matched_orgs)
 
-def generate_urls(user_inputs: dict, matched_orgs: list):
-    import pandas as pd
-    import requests
-    import os
-    import re
-    from urllib.parse import urlparse, urljoin
-    from datetime import datetime, timedelta
-
-    API_KEY ="API_KEY"
-    CX = 'CX'
-    MAX_RESULTS = 10
-
-    def google_search(query, start_year, max_results=10):
-        results = []
-        year_keywords = " OR ".join(str(y) for y in range(start_year, datetime.now().year + 1))
-        query = f"{query} {year_keywords}"
-        for start in range(1, max_results, 10):
-            url = f'https://www.googleapis.com/customsearch/v1?key={API_KEY}&cx={CX}&q={query}&start={start}'
-            response = requests.get(url).json()
-            print("🧪 Google API Raw Response:", response)
-            items = response.get('items', [])
-            results.extend([item['link'] for item in items])
-            if len(items) < 10:
-                break
-        return results
-
-    def detect_file_type(url):
-        path = urlparse(url).path.lower()
-        if path.endswith(".pdf"):
-            return "PDF"
-        elif path.endswith(".xls") or path.endswith(".xlsx"):
-            return "Excel"
-        elif path.endswith(".html") or path.endswith(".htm") or not "." in path:
-            return "HTML"
-        return "Other"
-
-    def is_trusted_link(link, org_name):
-        netloc = urlparse(link).netloc.lower()
-
-        # clean organization name
-        base_name = re.sub(r'\s+|\([^)]*\)', '', org_name.lower())
-        if base_name and base_name in netloc:
-            return True
-        
-        abbrev_match = re.search(r'\(([^)]+)\)', org_name)
-        if abbrev_match and abbrev_match.group(1).lower() in netloc:
-            return True
-        
-        return False
+import os
+import re
+import threading
+from datetime import datetime
+from urllib.parse import urlparse
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from search_client import SearchClient, RateLimiter, CUSTOM_SEARCH_URL, SEARCH_QUOTA_PATH
+from search_cache import SearchCache, SEARCH_CACHE_PATH
+from crawl_ledger import CrawlLedger, CRAWL_LEDGER_PATH
+from instrumentation import telemetry
+
+API_KEY = os.environ.get("GOOGLE_API_KEY", "API_KEY")
+CX = os.environ.get("GOOGLE_CX", "CX")
+MAX_WORKERS = 8
+# Custom Search pacing; override per run with user_inputs["search_per_minute"] / ["search_daily_limit"]
+SEARCH_PER_MINUTE = int(os.environ.get("GOOGLE_SEARCH_PER_MINUTE", "100"))
+SEARCH_DAILY_LIMIT = int(os.environ["GOOGLE_SEARCH_DAILY_LIMIT"]) if os.environ.get("GOOGLE_SEARCH_DAILY_LIMIT") else None
+# Query planner: one combined query per org, further pages only while a requested type is short.
+# An org never gets more pages than requested doc types, i.e. never costs more than the old
+# one-query-per-type scheme, so there is no separate page limit.
+MIN_RESULTS_PER_TYPE = 3
+# File types detect_file_type can report; only these can be counted towards MIN_RESULTS_PER_TYPE
+DETECTED_TYPES = {"pdf", "excel", "html"}
+
+# Runs in the same process (e.g. several UI sessions) merge into the output CSV one at a time
+OUTPUT_LOCK = threading.Lock()
+
+URL_COLUMNS = [
+    "Organization", "Division", "Industry", "Country", "SDG_Goals", "Year Range Start",
+    "URL", "File Type", "Flag", "Last Scraped"
+]
+
+
+def detect_file_type(url):
+    path = urlparse(url).path.lower()
+    if path.endswith(".pdf"):
+        return "PDF"
+    elif path.endswith(".xls") or path.endswith(".xlsx"):
+        return "Excel"
+    elif path.endswith(".html") or path.endswith(".htm") or not "." in path:
+        return "HTML"
+    return "Other"
+
+
+def is_trusted_link(link, org_name):
+    netloc = urlparse(link).netloc.lower()
+
+    # clean organization name
+    base_name = re.sub(r'\s+|\([^)]*\)', '', org_name.lower())
+    if base_name and base_name in netloc:
+        return True
+
+    abbrev_match = re.search(r'\(([^)]+)\)', org_name)
+    if abbrev_match and abbrev_match.group(1).lower() in netloc:
+        return True
+
+    return False
+
+
+def build_query(org_name, doc_type):
+    if doc_type.lower() == "pdf":
+        #filetype:pdf
+        return f"{org_name} sustainability OR ESG filetype:pdf Annual Report"
+    # non-PDF keep keywords
+    return f"{org_name} sustainability OR ESG Australia OR Annual Report"
+
+
+def build_combined_query(org_name, doc_types):
+    # One query for all requested types: PDF-only runs keep filetype:pdf, anything else needs the open query
+    if all(t.lower() == "pdf" for t in doc_types):
+        return build_query(org_name, "pdf")
+    return build_query(org_name, next(t for t in doc_types if t.lower() != "pdf"))
+
+
+def search_org(client, org_name, doc_types, start_year, min_per_type=MIN_RESULTS_PER_TYPE):
+    # Start with one combined query and classify every link against all requested types with
+    # detect_file_type. Further pages only go to a type that is still short: PDFs come from the
+    # dedicated filetype:pdf query (the open query rarely ranks them), other types from the next
+    # combined page. Types detect_file_type never emits cannot extend paging, and an org never
+    # costs more pages than the one-query-per-type scheme did.
+    # Returns ([(link, file_type), ...] for links of a requested type, pages fetched)
+    wanted = {t.lower(): t for t in doc_types}
+    counts = dict.fromkeys(wanted, 0)
+    tracked = [t for t in wanted if t in DETECTED_TYPES]
+    combined = build_combined_query(org_name, doc_types)
+    pdf_query = build_query(org_name, "pdf")
+    budget = len(doc_types)
+    queries = {q: client.iter_pages(q, start_year, budget * 10, org_name)
+               for q in dict.fromkeys([combined] + ([pdf_query] if "pdf" in wanted else []))}
+    links, seen, pages = [], set(), 0
+    while pages < budget:
+        short = [t for t in tracked if counts[t] < min_per_type]
+        if pages and not short:
+            break
+        if pages and "pdf" in short and pdf_query in queries:
+            query = pdf_query
+        elif combined in queries:
+            query = combined
+        else:
+            break
+        page = next(queries[query], None)
+        if page is None:
+            # Results ran out for this query
+            del queries[query]
+            continue
+        pages += 1
+        for link in page:
+            file_type = detect_file_type(link)
+            if file_type.lower() in wanted and link not in seen:
+                seen.add(link)
+                counts[file_type.lower()] += 1
+                links.append((link, file_type))
+    return links, pages
+
+
+def make_search_client(base_url=CUSTOM_SEARCH_URL, per_minute=SEARCH_PER_MINUTE, daily_limit=SEARCH_DAILY_LIMIT,
+                       max_workers=MAX_WORKERS, cache=None, quota_path=SEARCH_QUOTA_PATH):
+    return SearchClient(API_KEY, CX, base_url=base_url, pool_size=max_workers, cache=cache,
+                        rate_limiter=RateLimiter(per_minute=per_minute, burst=max_workers, daily_limit=daily_limit,
+                                                 quota_path=quota_path))
+
+
+def generate_urls(user_inputs: dict, matched_orgs: list, client=None, max_workers=None, progress=None,
+                  cancel_event=None):
+    with telemetry.stage("generate_urls", orgs=len(matched_orgs)) as record:
+        df = _generate_urls(user_inputs, matched_orgs, client, max_workers, progress, cancel_event)
+        record["urls"] = len(df)
+    return df
+
+
+def _generate_urls(user_inputs, matched_orgs, client, max_workers, progress, cancel_event):
+    # Searches for every org x doc type run concurrently on a bounded thread pool sharing one
+    # pooled, rate-limited client; results are then processed in the original serial order.
+    # progress(done, total, org_name, new_rows) is called after each org's search; setting
+    # cancel_event stops the run and keeps whatever was collected so far.
+    max_workers = max_workers or int(user_inputs.get("max_workers", MAX_WORKERS))
 
     # Extract fields from user_inputs
     start_year = int(user_inputs["year"])
     frequency_months = int(user_inputs.get("Frequency", "1"))
     frequency_days = frequency_months * 30
+
+    # Cached responses live as long as the Frequency window, so re-runs inside it cost no quota
+    own_client = client is None
+    if own_client:
+        cache = None
+        if user_inputs.get("use_search_cache", True):
+            cache = SearchCache(user_inputs.get("search_cache_path", SEARCH_CACHE_PATH), ttl_days=frequency_days)
+        daily_limit = user_inputs.get("search_daily_limit", SEARCH_DAILY_LIMIT)
+        client = make_search_client(base_url=user_inputs.get("search_url", CUSTOM_SEARCH_URL),
+                                    per_minute=int(user_inputs.get("search_per_minute", SEARCH_PER_MINUTE)),
+                                    daily_limit=int(daily_limit) if daily_limit is not None else None,
+                                    max_workers=max_workers, cache=cache,
+                                    quota_path=user_inputs.get("search_quota_path", SEARCH_QUOTA_PATH))
+
     SDG_Goals = ", ".join(user_inputs.get("sdg_labels", []))
     country = ", ".join(user_inputs.get("country", []))
     #industry_input = ", ".join(user_inputs.get("industry", []))
@@ -62,56 +166,112 @@ def generate_urls(user_inputs: dict, matched_orgs: list):
 
     rows = []
     current_date = datetime.now()
-    seen_links = {}  # key: (org, url), value: last_scraped datetime
-
-    for org in matched_orgs:
-        org_name = org["organisation_name"]
-        industry = org.get("industry", "")
-        division = org.get("division", "")
-
-        for doc_type in doc_types:
-            if doc_type.lower() == "pdf":
-                #filetype:pdf
-                query = f"{org_name} sustainability OR ESG filetype:pdf Annual Report"
-            else:
-                # non-PDF keep keywords
-                query = f"{org_name} sustainability OR ESG Australia OR Annual Report"
-            print(f"🔎 Searching for: {query} from {start_year} to {datetime.now().year}")
-            links = google_search(query, start_year)
-
-            for link in links:
-                key = (org_name, link)
-                if key in seen_links:
-                    last_scraped = seen_links[key]
-                    if (current_date - last_scraped).days < frequency_days:
-                        print(f"⏩ Skipped (duplicate within frequency window): {link}")
-                        continue
-
-                file_type = detect_file_type(link)
-                trusted = is_trusted_link(link, org_name)
-
-                print(f"Link: {link}")
-                print(f"Detected File Type: {file_type} | Expected: one of {doc_types}")
-
-                if file_type.lower() != doc_type.lower():
+    # Persistent (org, url) -> last_scraped ledger, so the frequency window holds across runs;
+    # fetch_extract records a URL there once it has actually been downloaded
+    ledger = CrawlLedger(user_inputs.get("crawl_ledger_path", CRAWL_LEDGER_PATH))
+    seen_links = {}  # links emitted during this run: key: (org, url), value: last_scraped datetime
+
+    # One combined query per org instead of one per doc type; results are classified client-side
+    tasks = []
+    for org in matched_orgs if doc_types else []:
+        query = build_combined_query(org["organisation_name"], doc_types)
+        print(f"🔎 Searching for: {query} ({', '.join(doc_types)}) from {start_year} to {datetime.now().year}")
+        tasks.append((org, query))
+    pages_fetched = 0
+    failed_orgs = []
+    requests_before = client.requests_sent
+    min_per_type = int(user_inputs.get("min_results_per_type", MIN_RESULTS_PER_TYPE))
+
+    try:
+        with ThreadPoolExecutor(max_workers=max_workers) as pool:
+            futures = [pool.submit(search_org, client, org["organisation_name"], doc_types, start_year,
+                                   min_per_type)
+                       for org, _ in tasks]
+
+            for done, ((org, _), future) in enumerate(zip(tasks, futures), start=1):
+                if cancel_event is not None and cancel_event.is_set():
+                    for pending in futures:
+                        pending.cancel()
+                    print(f"🛑 URL discovery cancelled after {done - 1} of {len(tasks)} organizations")
+                    break
+                org_name = org["organisation_name"]
+                industry = org.get("industry", "")
+                division = org.get("division", "")
+                first_new_row = len(rows)
+                try:
+                    links, pages = future.result()
+                except Exception as e:
+                    # One org's failed search (quota, network, bad response) must not lose the others
+                    print(f"⚠️ Search failed for {org_name}: {e}")
+                    telemetry.count("search_failures", org=org_name)
+                    failed_orgs.append(org_name)
+                    if progress is not None:
+                        progress(done, len(tasks), org_name, [])
                     continue
+                pages_fetched += pages
+
+                for link, file_type in links:
+                    key = (org_name, link)
+                    last_scraped = seen_links.get(key) or ledger.last_scraped(org_name, link)
+                    if last_scraped is not None:
+                        if (current_date - last_scraped).days < frequency_days:
+                            print(f"⏩ Skipped (duplicate within frequency window): {link}")
+                            continue
+
+                    trusted = is_trusted_link(link, org_name)
+
+                    print(f"Link: {link}")
+                    print(f"Detected File Type: {file_type} | Expected: one of {doc_types}")
+
+                    rows.append({
+                        "Organization": org_name,
+                        "Division": division,
+                        "Industry": industry,
+                        "Country": country,
+                        "SDG_Goals": SDG_Goals if SDG_Goals else "None selected",
+                        "Year Range Start": start_year,
+                        "URL": link,
+                        "File Type": file_type,
+                        "Flag": "Trusted" if trusted else "Third-party",
+                        "Last Scraped": current_date.strftime("%Y-%m-%d")
+                    })
+
+                    seen_links[key] = current_date
+
+                telemetry.count("urls_kept", len(rows) - first_new_row, org=org_name)
+                telemetry.event("search", org=org_name, doc_types=doc_types, pages=pages, results=len(links),
+                                kept=len(rows) - first_new_row)
+                if progress is not None:
+                    progress(done, len(tasks), org_name, rows[first_new_row:])
+    finally:
+        ledger.close()
+        if own_client:
+            client.close()
 
-                rows.append({
-                    "Organization": org_name,
-                    "Division": division,
-                    "Industry": industry,
-                    "Country": country,
-                    "SDG_Goals": SDG_Goals if SDG_Goals else "None selected",
-                    "Year Range Start": start_year,
-                    "URL": link,
-                    "File Type": file_type,
-                    "Flag": "Trusted" if trusted else "Third-party",
-                    "Last Scraped": current_date.strftime("%Y-%m-%d")
-                })
-
-                seen_links[key] = current_date
-
-    df = pd.DataFrame(rows)
-    output_path = os.path.abspath("generated_urls.csv")
-    df.to_csv(output_path, index=False)
-    print("✅ URL results saved to:", output_path)
+    # One page per org is the plan; short types add pages, capped at the per-doc-type scheme's cost
+    planned = len(tasks)
+    baseline = len(tasks) * len(doc_types)
+    issued = client.requests_sent - requests_before
+    telemetry.count("search_calls_planned", planned)
+    telemetry.count("search_pages_fetched", pages_fetched)
+    telemetry.event("query_plan", orgs=len(tasks), doc_types=doc_types, planned=planned, pages=pages_fetched,
+                    issued=issued, per_type_baseline=baseline, failed_orgs=len(failed_orgs))
+    print(f"📡 {pages_fetched} search pages fetched for {len(tasks)} organizations ({issued} API requests issued, "
+          f"{client.retries} retried) vs {baseline} with one query per document type")
+    if failed_orgs:
+        print(f"⚠️ Search failed for {len(failed_orgs)} organization(s): {', '.join(failed_orgs)}")
+    if client.cache is not None:
+        print(client.cache.report())
+        if own_client:
+            client.cache.close()
+    # Merge into the existing CSV instead of replacing it; newer rows win per (org, url)
+    df = pd.DataFrame(rows, columns=URL_COLUMNS)
+    output_path = os.path.abspath(user_inputs.get("output_path", "generated_urls.csv"))
+    with OUTPUT_LOCK, telemetry.stage("write_generated_urls", new_rows=len(rows)):
+        if os.path.exists(output_path) and os.path.getsize(output_path) > 0:
+            previous = pd.read_csv(output_path)
+            df = pd.concat([previous, df], ignore_index=True)
+            df = df.drop_duplicates(subset=["Organization", "URL"], keep="last")
+        df.to_csv(output_path, index=False)
+    print(f"✅ URL results saved to: {output_path} ({len(rows)} new or refreshed, {len(df)} total)")
+    return df